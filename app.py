@@ -1,6 +1,6 @@
 ﻿import pandas as pd
 from math import radians, sin, cos, sqrt, asin
-from flask import Flask, request, render_template, redirect, url_for, jsonify, send_from_directory, make_response, session, flash
+from flask import Flask, request, render_template, redirect, url_for, jsonify, send_from_directory, make_response, session, flash, Response, stream_with_context
 from flask_cors import CORS
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 import os
@@ -8,14 +8,31 @@ import openpyxl
 from fpdf import FPDF, XPos, YPos
 from datetime import datetime, timedelta
 import bcrypt
-from functools import wraps
-from recommendations import determine_category, calculate_structure_dimensions, estimate_costs_and_payback, get_purification_recommendations, calculate_harvesting_potential
+from functools import wraps, partial
+from recommendations import determine_category, calculate_structure_dimensions, estimate_costs_and_payback, get_purification_recommendations, calculate_harvesting_potential, RecommendationCategory
 import requests
 from database import db
-from models import AquiferMaterial # Add other models as you create them
+from enrichment import run_enrichment_tasks, PrefetchRegistry, SingleFlight, BackgroundRefresher
+from weather_client import WeatherClient
+from http_client import http_client
+from circuit_breaker import CircuitOpenError
+from raster_sampler import sample_soil_properties, raster_stats
+from rainfall_climatology import rainfall_climatology
+import location_cache
+from spatial_index import GeoPointIndex
+from geo_distance import haversine, nearest_within, bounding_box
+from memory_cache import MemoryLRUCache
+from dataset_versions import DatasetVersions, DATASET_VERSIONS_DDL
+from geometry_simplification import select_tolerance, tolerance_for_zoom, simplified_table_name
+from geography_indexes import GEOGRAPHY_INDEXED_TABLES, geography_index_ddl, as_geography
+from polygon_index import PolygonIndex
+from models import AquiferMaterial, MajorAquifer # Add other models as you create them
 from geoalchemy2 import WKTElement
 from sqlalchemy import func
 import json
+import hashlib
+import threading
+import time
 
 # --- Validation Functions ---
 def validate_name(name):
@@ -120,6 +137,7 @@ def restore_property_session(entry_id):
     session['latitude'] = user_data.user_lat
     session['longitude'] = user_data.user_lon
     session['address'] = user_data.location_name
+    prefetch_location_data(user_data.user_lat, user_data.user_lon)
     return redirect(url_for('individual_input_page'))
 
 # Initialize the database with the app
@@ -127,7 +145,7 @@ db.init_app(app)
 
 # --- One-time lightweight schema guard for newly added fields ---
 def _ensure_user_input_new_columns():
-    """Safely add newly introduced columns to user_input table if they don't exist.
+    """Safely add newly introduced columns to user_input and geo_data tables if they don't exist.
 
     This avoids immediate migration tooling overhead. For production
     replace with proper Alembic migration.
@@ -137,7 +155,23 @@ def _ensure_user_input_new_columns():
         "ALTER TABLE user_input ADD COLUMN IF NOT EXISTS building_age VARCHAR(30)",
         "ALTER TABLE user_input ADD COLUMN IF NOT EXISTS occupancy INTEGER",
         # Safe attempt to drop legacy column if present
-        "DO $$ BEGIN IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='user_input' AND column_name='budget_preference') THEN ALTER TABLE user_input DROP COLUMN budget_preference; END IF; END $$;"
+        "DO $$ BEGIN IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='user_input' AND column_name='budget_preference') THEN ALTER TABLE user_input DROP COLUMN budget_preference; END IF; END $$;",
+        # Grid-snapped location cache on geo_data
+        "ALTER TABLE geo_data ADD COLUMN IF NOT EXISTS cell_key VARCHAR(64)",
+        "ALTER TABLE geo_data ADD COLUMN IF NOT EXISTS rainfall_updated_at TIMESTAMP",
+        "ALTER TABLE geo_data ADD COLUMN IF NOT EXISTS soil_updated_at TIMESTAMP",
+        "ALTER TABLE geo_data ADD COLUMN IF NOT EXISTS groundwater_updated_at TIMESTAMP",
+        # One row per cell: drop duplicates left by concurrent inserts (keeping the oldest),
+        # replace the earlier non-unique index, then enforce uniqueness for ON CONFLICT upserts
+        "DELETE FROM geo_data a USING geo_data b WHERE a.cell_key = b.cell_key AND a.id > b.id",
+        "DO $$ BEGIN IF EXISTS (SELECT 1 FROM pg_indexes WHERE indexname='ix_geo_data_cell_key' AND indexdef NOT LIKE 'CREATE UNIQUE%') THEN DROP INDEX ix_geo_data_cell_key; END IF; END $$;",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_geo_data_cell_key ON geo_data (cell_key)",
+        # Per-entry analysis snapshots shared by the /results pages
+        "CREATE TABLE IF NOT EXISTS analysis_snapshot (id SERIAL PRIMARY KEY, entry_id INTEGER NOT NULL UNIQUE REFERENCES user_input(id) ON DELETE CASCADE, engine_version VARCHAR(20) NOT NULL, input_hash VARCHAR(64) NOT NULL, location_data TEXT NOT NULL, analysis TEXT NOT NULL, created_at TIMESTAMP NOT NULL DEFAULT now())",
+        # Version counters bumped by the loader scripts, used to invalidate tile caches
+        DATASET_VERSIONS_DDL,
+        # Geography expression indexes serving the station radius filters
+        *[geography_index_ddl(table) for table in GEOGRAPHY_INDEXED_TABLES]
     ]
     for ddl in ddl_statements:
         try:
@@ -285,11 +319,31 @@ class GeoData(db.Model):
     soil_permability_class = db.Column(db.String(50))
     water_quality = db.Column(db.String(80))
     water_cost_per_liter = db.Column(db.Float, default=0.16)
+    # Location cache: grid cell key and per field group refresh times (see location_cache.py)
+    cell_key = db.Column(db.String(64), index=True, unique=True)
+    rainfall_updated_at = db.Column(db.DateTime)
+    soil_updated_at = db.Column(db.DateTime)
+    groundwater_updated_at = db.Column(db.DateTime)
 
     def to_dict(self):
         """Converts the object to a dictionary."""
         return {c.name: getattr(self, c.name) for c in self.__table__.columns}
 
+# --- Persisted Analysis Snapshot ---
+# Bump whenever calculate_comprehensive_feasibility, recommendations.py or the
+# location data format changes, so stored snapshots are recomputed.
+ANALYSIS_ENGINE_VERSION = '1'
+
+class AnalysisSnapshot(db.Model):
+    """Location data and feasibility result computed once per UserInput entry."""
+    id = db.Column(db.Integer, primary_key=True)
+    entry_id = db.Column(db.Integer, db.ForeignKey('user_input.id', ondelete='CASCADE'), unique=True, nullable=False)
+    engine_version = db.Column(db.String(20), nullable=False)
+    input_hash = db.Column(db.String(64), nullable=False)  # SHA-256 of the entry fields used by the analysis
+    location_data = db.Column(db.Text, nullable=False)  # JSON
+    analysis = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
 # Flask-Login user loader
 @login_manager.user_loader
 def load_user(user_id):
@@ -306,48 +360,52 @@ def admin_required(f):
 
 # --- Core Calculation Functions ---
 
-def haversine(lat1, lon1, lat2, lon2):
-    """Calculate the distance between two points on Earth using the Haversine formula."""
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
-    r = 6371  # Radius of Earth in kilometers
-    return c * r
+# The <-> KNN ordering on SRID 4326 is planar (degrees), so east-west distances are
+# overstated by up to 1/cos(lat). Over-fetch a candidate pool from the GIST index and
+# re-rank it by exact great-circle distance before taking the top k.
+NEAREST_STATION_CANDIDATES = int(os.environ.get('NEAREST_STATION_CANDIDATES', 32))
+
+def get_nearest_stations(user_lat, user_lon, k=1):
+    """
+    Find the k groundwater level stations nearest to a point, closest first.
+    Each result carries its great-circle distance in km.
+    """
+    from models import GroundWaterLevelStation
+    from sqlalchemy import func
+
+    point = func.ST_SetSRID(func.ST_MakePoint(user_lon, user_lat), 4326)
+    candidates = GroundWaterLevelStation.query.filter(
+        GroundWaterLevelStation.lat.isnot(None),
+        GroundWaterLevelStation.long.isnot(None)
+    ).order_by(
+        GroundWaterLevelStation.geometry.distance_centroid(point)  # <-> operator, index-assisted
+    ).limit(max(k * 4, NEAREST_STATION_CANDIDATES)).all()
+
+    order, distances = nearest_within(
+        user_lat, user_lon,
+        [station.lat for station in candidates], [station.long for station in candidates], k=k
+    )
+    ranked = [(float(distance), candidates[i]) for i, distance in zip(order, distances)]
+
+    return [{
+        'Region_Name': station.station_na or 'Unknown',
+        'State': station.state_name or 'Unknown',
+        'Latitude': station.lat,
+        'Longitude': station.long,
+        'distance': distance,
+        'station_code': station.station_co,
+        'agency': station.agency_nam,
+        'district': station.district_n,
+        'basin': station.basin_name
+    } for distance, station in ranked]
 
 def get_nearest_location(user_lat, user_lon):
     """Find the nearest location from the database based on user's GPS coordinates."""
     try:
         # Query ground water level stations for nearest location
-        from models import GroundWaterLevelStation
-        stations = GroundWaterLevelStation.query.all()
-
-        if not stations:
-            return None
-
-        min_distance = float('inf')
-        nearest_station = None
-
-        for station in stations:
-            if station.lat and station.long:
-                distance = haversine(user_lat, user_lon, station.lat, station.long)
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_station = station
-
-        if nearest_station:
-            return {
-                'Region_Name': nearest_station.station_na or 'Unknown',
-                'State': nearest_station.state_name or 'Unknown',
-                'Latitude': nearest_station.lat,
-                'Longitude': nearest_station.long,
-                'distance': min_distance,
-                'station_code': nearest_station.station_co,
-                'agency': nearest_station.agency_nam,
-                'district': nearest_station.district_n,
-                'basin': nearest_station.basin_name
-            }
+        stations = get_nearest_stations(user_lat, user_lon, k=1)
+        if stations:
+            return stations[0]
     except Exception as e:
         print(f"Error finding nearest location: {e}")
 
@@ -575,6 +633,66 @@ def calculate_comprehensive_feasibility(location_data, user_input):
         'feasibility_status': feasibility_status
     }
 
+def _analysis_input_hash(user_input):
+    """Fingerprint of the entry fields that feed the location lookup and the analysis."""
+    fields = [
+        user_input.user_lat, user_input.user_lon, user_input.household_size,
+        user_input.rooftop_area, user_input.open_space_area, user_input.roof_type,
+        user_input.property_type, user_input.existing_water_sources,
+        user_input.intended_use, user_input.building_age, user_input.occupancy
+    ]
+    return hashlib.sha256(json.dumps(fields, default=str).encode('utf-8')).hexdigest()
+
+def _snapshot_json_default(obj):
+    """Serialize recommendation categories without their criteria functions."""
+    if isinstance(obj, RecommendationCategory):
+        return {
+            'category_id': obj.category_id,
+            'name': obj.name,
+            'description': obj.description,
+            'recommended_structures': obj.recommended_structures,
+            'recharge_feasible': obj.recharge_feasible
+        }
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def get_analysis_snapshot(user_data):
+    """
+    Return (location_data, analysis) for a UserInput entry.
+
+    The result is computed and stored the first time an entry is viewed; later
+    /results pages and the PDF report read it back. A snapshot is recomputed when
+    ANALYSIS_ENGINE_VERSION or the entry's inputs change.
+    Returns (None, None) if location data could not be retrieved.
+    """
+    input_hash = _analysis_input_hash(user_data)
+    snapshot = AnalysisSnapshot.query.filter_by(entry_id=user_data.id).first()
+    if snapshot and snapshot.engine_version == ANALYSIS_ENGINE_VERSION and snapshot.input_hash == input_hash:
+        return json.loads(snapshot.location_data), json.loads(snapshot.analysis)
+
+    location_data = get_api_data(user_data.user_lat, user_data.user_lon)
+    if not location_data:
+        return None, None
+    analysis = calculate_comprehensive_feasibility(location_data, user_data)
+
+    location_json = json.dumps(location_data, default=_snapshot_json_default)
+    analysis_json = json.dumps(analysis, default=_snapshot_json_default)
+    try:
+        if snapshot is None:
+            snapshot = AnalysisSnapshot(entry_id=user_data.id)
+            db.session.add(snapshot)
+        snapshot.engine_version = ANALYSIS_ENGINE_VERSION
+        snapshot.input_hash = input_hash
+        snapshot.location_data = location_json
+        snapshot.analysis = analysis_json
+        snapshot.created_at = datetime.utcnow()
+        db.session.commit()
+    except Exception as e:
+        print(f"Error saving analysis snapshot for entry {user_data.id}: {e}")
+        db.session.rollback()
+
+    # Always hand back the decoded snapshot so first and repeat views see the same data
+    return json.loads(location_json), json.loads(analysis_json)
+
 # --- Flask Routes ---
 
 @app.route('/')
@@ -616,7 +734,10 @@ def submit_location():
     session['latitude'] = lat
     session['longitude'] = lon
     session['address'] = address
-    
+
+    # Start enriching the location while the user fills in the assessment forms
+    prefetch_location_data(lat, lon)
+
     # Instead of redirecting, we'll confirm success and let the frontend handle the redirect
     return jsonify({'message': 'Location received, proceed to assessment type selection.', 'redirect_url': url_for('select_assessment_page')})
 
@@ -829,7 +950,7 @@ def property_details():
     user_data = UserInput.query.get_or_404(entry_id)
     
     try:
-        location_analysis_data = get_api_data(user_data.user_lat, user_data.user_lon)
+        location_analysis_data, comprehensive_analysis = get_analysis_snapshot(user_data)
         if not location_analysis_data:
             flash("Unable to retrieve location data. Please check your coordinates and try again.", "error")
             return redirect(url_for('results_page', entry_id=entry_id))
@@ -838,7 +959,6 @@ def property_details():
         flash("An error occurred while analyzing your location. Please try again later.", "error")
         return redirect(url_for('results_page', entry_id=entry_id))
     
-    comprehensive_analysis = calculate_comprehensive_feasibility(location_analysis_data, user_data)
     return render_template('property_details.html', user_data=user_data, location_data=location_analysis_data, analysis=comprehensive_analysis)
 
 @app.route('/results/location')
@@ -847,7 +967,7 @@ def location_analysis():
     user_data = UserInput.query.get_or_404(entry_id)
     
     try:
-        location_analysis_data = get_api_data(user_data.user_lat, user_data.user_lon)
+        location_analysis_data, comprehensive_analysis = get_analysis_snapshot(user_data)
         if not location_analysis_data:
             flash("Unable to retrieve location data. Please check your coordinates and try again.", "error")
             return redirect(url_for('results_page', entry_id=entry_id))
@@ -856,7 +976,6 @@ def location_analysis():
         flash("An error occurred while analyzing your location. Please try again later.", "error")
         return redirect(url_for('results_page', entry_id=entry_id))
     
-    comprehensive_analysis = calculate_comprehensive_feasibility(location_analysis_data, user_data)
     return render_template('location_analysis.html', user_data=user_data, location_data=location_analysis_data, analysis=comprehensive_analysis)
 
 @app.route('/results/hydrogeology')
@@ -865,7 +984,7 @@ def hydrogeological_profile():
     user_data = UserInput.query.get_or_404(entry_id)
     
     try:
-        location_analysis_data = get_api_data(user_data.user_lat, user_data.user_lon)
+        location_analysis_data, comprehensive_analysis = get_analysis_snapshot(user_data)
         if not location_analysis_data:
             flash("Unable to retrieve location data. Please check your coordinates and try again.", "error")
             return redirect(url_for('results_page', entry_id=entry_id))
@@ -874,7 +993,6 @@ def hydrogeological_profile():
         flash("An error occurred while analyzing your location. Please try again later.", "error")
         return redirect(url_for('results_page', entry_id=entry_id))
     
-    comprehensive_analysis = calculate_comprehensive_feasibility(location_analysis_data, user_data)
     return render_template('hydrogeological_profile.html', user_data=user_data, location_data=location_analysis_data, analysis=comprehensive_analysis)
 
 @app.route('/results/feasibility')
@@ -883,7 +1001,7 @@ def feasibility_assessment():
     user_data = UserInput.query.get_or_404(entry_id)
     
     try:
-        location_analysis_data = get_api_data(user_data.user_lat, user_data.user_lon)
+        location_analysis_data, comprehensive_analysis = get_analysis_snapshot(user_data)
         if not location_analysis_data:
             flash("Unable to retrieve location data. Please check your coordinates and try again.", "error")
             return redirect(url_for('results_page', entry_id=entry_id))
@@ -892,7 +1010,6 @@ def feasibility_assessment():
         flash("An error occurred while analyzing your location. Please try again later.", "error")
         return redirect(url_for('results_page', entry_id=entry_id))
     
-    comprehensive_analysis = calculate_comprehensive_feasibility(location_analysis_data, user_data)
     return render_template('feasibility_assessment.html', user_data=user_data, location_data=location_analysis_data, analysis=comprehensive_analysis)
 
 @app.route('/results/recommendations')
@@ -901,7 +1018,7 @@ def recommendations():
     user_data = UserInput.query.get_or_404(entry_id)
     
     try:
-        location_analysis_data = get_api_data(user_data.user_lat, user_data.user_lon)
+        location_analysis_data, comprehensive_analysis = get_analysis_snapshot(user_data)
         if not location_analysis_data:
             flash("Unable to retrieve location data. Please check your coordinates and try again.", "error")
             return redirect(url_for('results_page', entry_id=entry_id))
@@ -910,7 +1027,6 @@ def recommendations():
         flash("An error occurred while analyzing your location. Please try again later.", "error")
         return redirect(url_for('results_page', entry_id=entry_id))
     
-    comprehensive_analysis = calculate_comprehensive_feasibility(location_analysis_data, user_data)
     return render_template('recommendations.html', user_data=user_data, location_data=location_analysis_data, analysis=comprehensive_analysis)
 
 @app.route('/results/financials')
@@ -919,7 +1035,7 @@ def financial_analysis():
     user_data = UserInput.query.get_or_404(entry_id)
     
     try:
-        location_analysis_data = get_api_data(user_data.user_lat, user_data.user_lon)
+        location_analysis_data, comprehensive_analysis = get_analysis_snapshot(user_data)
         if not location_analysis_data:
             flash("Unable to retrieve location data. Please check your coordinates and try again.", "error")
             return redirect(url_for('results_page', entry_id=entry_id))
@@ -928,7 +1044,6 @@ def financial_analysis():
         flash("An error occurred while analyzing your location. Please try again later.", "error")
         return redirect(url_for('results_page', entry_id=entry_id))
     
-    comprehensive_analysis = calculate_comprehensive_feasibility(location_analysis_data, user_data)
     
     # Get detailed cost analysis using the category from comprehensive analysis
     cost_data = estimate_costs_and_payback(
@@ -946,7 +1061,7 @@ def financial_analysis():
 def measurement_purification_page(entry_id):
     user_data = UserInput.query.get_or_404(entry_id)
     try:
-        location_analysis_data = get_api_data(user_data.user_lat, user_data.user_lon)
+        location_analysis_data, comprehensive_analysis = get_analysis_snapshot(user_data)
         if not location_analysis_data:
             flash("Unable to retrieve location data. Please check your coordinates and try again.", "error")
             return redirect(url_for('results_page', entry_id=entry_id))
@@ -955,7 +1070,6 @@ def measurement_purification_page(entry_id):
         flash("An error occurred while analyzing your location. Please try again later.", "error")
         return redirect(url_for('results_page', entry_id=entry_id))
 
-    comprehensive_analysis = calculate_comprehensive_feasibility(location_analysis_data, user_data)
     return render_template('measurement_purification.html', user_data=user_data, location_data=location_analysis_data, analysis=comprehensive_analysis)
 
 @app.route('/results/awareness')
@@ -967,7 +1081,7 @@ def results_overview(entry_id):
     user_data = UserInput.query.get_or_404(entry_id)
     
     try:
-        location_analysis_data = get_api_data(user_data.user_lat, user_data.user_lon)
+        location_analysis_data, comprehensive_analysis = get_analysis_snapshot(user_data)
         if not location_analysis_data:
             flash("Unable to retrieve location data. Please check your coordinates and try again.", "error")
             return redirect(url_for('results_page', entry_id=entry_id))
@@ -976,7 +1090,6 @@ def results_overview(entry_id):
         flash("An error occurred while analyzing your location. Please try again later.", "error")
         return redirect(url_for('results_page', entry_id=entry_id))
     
-    comprehensive_analysis = calculate_comprehensive_feasibility(location_analysis_data, user_data)
     return render_template('results_overview.html', user_data=user_data, location_data=location_analysis_data, analysis=comprehensive_analysis)
 
 @app.route('/download_report/<int:entry_id>')
@@ -988,16 +1101,14 @@ def download_report(entry_id):
         return "Error: GPS coordinates are required for API-based analysis.", 400
 
     try:
-        # Fetch combined data from all APIs using user's GPS
-        location_data = get_api_data(user_data.user_lat, user_data.user_lon)
+        # Reuse the analysis snapshot shown on the results pages (computed on first use)
+        location_data, analysis = get_analysis_snapshot(user_data)
     except Exception as e:
         return f"Error during API data retrieval: {e}", 500
 
     if not location_data:
         return "Error: Could not find data for your location from APIs.", 404
 
-    analysis = calculate_comprehensive_feasibility(location_data, user_data)
-
     # --- PDF Translation Setup ---
     lang = request.args.get('lang', 'en')
     translations_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'translations')
@@ -1360,6 +1471,24 @@ def admin_analytics():
     analytics_data = get_analytics_data()
     return render_template('admin/analytics.html', analytics=analytics_data)
 
+@app.route('/admin/metrics')
+@admin_required
+def admin_metrics():
+    """Runtime counters for tuning caches and upstream integrations."""
+    return jsonify({
+        'location_cache': location_cache.cache_stats.snapshot(),
+        'upstream_http': http_client.stats_snapshot(),
+        'circuit_breakers': http_client.breaker_snapshot(),
+        'rasters': raster_stats(),
+        'location_prefetch': location_prefetch.snapshot(),
+        'location_single_flight': location_flight.snapshot(),
+        'location_refresh': location_refresher.snapshot(),
+        'polygon_indexes': {name: source[0].snapshot() for name, source in POLYGON_INDEX_SOURCES.items()},
+        'tile_cache': tile_cache.snapshot(),
+        'geo_response_cache': geo_response_cache.snapshot(),
+        'dataset_versions': dataset_versions.snapshot()
+    })
+
 @app.route('/interactive-map')
 @app.route('/interactive-map/<int:entry_id>')
 def interactive_map_page(entry_id=None):
@@ -1424,16 +1553,58 @@ def admin_export_users():
 OPENWEATHERMAP_API_KEY = os.environ.get('OPENWEATHERMAP_API_KEY', '32dc29dca01bde623300f501d45e42dd')
 SOILGRIDS_API_ENDPOINT = "https://rest.isric.org/soilgrids/v2.0/properties/query"
 
-def get_monthly_rainfall_data(lat, lon, api_key):
+# Typical share of annual rainfall falling in each month, used to spread a regional average
+MONTHLY_RAINFALL_DISTRIBUTION = {
+    '01': 0.08, '02': 0.07, '03': 0.07, '04': 0.06, '05': 0.08, '06': 0.10,  # Dry season
+    '07': 0.15, '08': 0.15, '09': 0.12, '10': 0.08, '11': 0.03, '12': 0.01   # Monsoon season
+}
+
+# Defaults returned when live weather or soil data cannot be fetched
+DEFAULT_LIVE_WEATHER = {
+    'temperature': 25,
+    'humidity': 60,
+    'pressure': 1013,
+    'current_rain': 0,
+    'weather_description': 'Data unavailable',
+    'wind_speed': 5,
+    'location_name': 'Unknown'
+}
+
+DEFAULT_SOIL_DATA = {
+    "Soil_Type": "Loamy",
+    "Infiltration_Rate_mm_per_hr": 15,
+    "Soil_Permability_Class": "Medium"
+}
+
+def get_rainfall_normals(lat, lon):
+    """Annual and monthly rainfall normals from the offline climatology grid, or None if unavailable."""
+    if not rainfall_climatology.available:
+        return None
+    try:
+        return rainfall_climatology.lookup(lat, lon)
+    except Exception as e:
+        print(f"Rainfall climatology lookup failed for ({lat}, {lon}): {e}")
+        return None
+
+def get_default_monthly_rainfall(lat, lon):
+    """Spread the regional average rainfall over the months using the typical distribution."""
+    regional_avg = get_location_specific_rainfall_fallback(lat, lon)
+    return {month: regional_avg * frac for month, frac in MONTHLY_RAINFALL_DISTRIBUTION.items()}
+
+def get_monthly_rainfall_data(lat, lon, api_key, weather=None):
     """
-    Fetches monthly rainfall breakdown from OpenWeatherMap 5-day forecast.
+    Fetches monthly rainfall breakdown, from the offline climatology grid when it covers
+    the location, otherwise from the OpenWeatherMap 5-day forecast.
     Returns a dictionary with monthly estimates.
+    Pass a shared WeatherClient to reuse a forecast already downloaded for this location.
     """
+    normals = get_rainfall_normals(lat, lon)
+    if normals is not None:
+        return normals['monthly']
+
+    weather = weather or WeatherClient(lat, lon, api_key)
     try:
-        forecast_url = f"https://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={lon}&appid={api_key}&units=metric"
-        response = requests.get(forecast_url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = weather.forecast()
 
         # Group rainfall by month
         monthly_rain = {}
@@ -1446,38 +1617,21 @@ def get_monthly_rainfall_data(lat, lon, api_key):
 
         # Convert 3-hour data to monthly estimates (rough approximation)
         # Since we only have 5 days, we'll use regional patterns to estimate full months
-        regional_avg = get_location_specific_rainfall_fallback(lat, lon)
-
-        # Estimate monthly distribution based on regional patterns
-        monthly_distribution = {
-            '01': 0.08, '02': 0.07, '03': 0.07, '04': 0.06, '05': 0.08, '06': 0.10,  # Dry season
-            '07': 0.15, '08': 0.15, '09': 0.12, '10': 0.08, '11': 0.03, '12': 0.01   # Monsoon season
-        }
-
-        monthly_breakdown = {}
-        for month, fraction in monthly_distribution.items():
-            monthly_breakdown[month] = regional_avg * fraction
-
-        return monthly_breakdown
+        return get_default_monthly_rainfall(lat, lon)
 
     except Exception as e:
         print(f"Error fetching monthly rainfall data: {e}")
         # Return default monthly distribution
-        regional_avg = get_location_specific_rainfall_fallback(lat, lon)
-        return {month: regional_avg * frac for month, frac in {
-            '01': 0.08, '02': 0.07, '03': 0.07, '04': 0.06, '05': 0.08, '06': 0.10,
-            '07': 0.15, '08': 0.15, '09': 0.12, '10': 0.08, '11': 0.03, '12': 0.01
-        }.items()}
+        return get_default_monthly_rainfall(lat, lon)
 
-def get_live_weather_data(lat, lon, api_key):
+def get_live_weather_data(lat, lon, api_key, weather=None):
     """
     Fetches current weather conditions including temperature, humidity, and current rain.
+    Pass a shared WeatherClient to reuse current conditions already downloaded for this location.
     """
+    weather = weather or WeatherClient(lat, lon, api_key)
     try:
-        current_url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={api_key}&units=metric"
-        response = requests.get(current_url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = weather.current_weather()
 
         return {
             'temperature': data.get('main', {}).get('temp'),
@@ -1491,15 +1645,7 @@ def get_live_weather_data(lat, lon, api_key):
 
     except Exception as e:
         print(f"Error fetching live weather data: {e}")
-        return {
-            'temperature': 25,
-            'humidity': 60,
-            'pressure': 1013,
-            'current_rain': 0,
-            'weather_description': 'Data unavailable',
-            'wind_speed': 5,
-            'location_name': 'Unknown'
-        }
+        return dict(DEFAULT_LIVE_WEATHER)
     """
     Returns location-specific rainfall fallback values based on regional climate patterns in India.
     Uses latitude/longitude to determine the region and return appropriate average rainfall.
@@ -1576,17 +1722,22 @@ def get_location_specific_rainfall_fallback(lat, lon):
     print(f"Location ({lat:.2f}, {lon:.2f}) not matched to specific region - using 1000mm default")
     return 1000
 
-def get_rainfall_from_api(lat, lon, api_key):
+def get_rainfall_from_api(lat, lon, api_key, weather=None):
     """
-    Fetches rainfall data from OpenWeatherMap APIs.
-    Uses multiple approaches: 5-day forecast, current weather, and regional fallbacks.
+    Fetches annual rainfall for a location.
+    Uses the offline climatology grid first, then OpenWeatherMap (5-day forecast,
+    current weather) and regional fallbacks.
+    Pass a shared WeatherClient so the forecast and current weather are fetched once per location.
     """
+    normals = get_rainfall_normals(lat, lon)
+    if normals is not None:
+        return normals['annual']
+
+    weather = weather or WeatherClient(lat, lon, api_key)
+
     # First, try to get rainfall from 5-day forecast (free tier)
     try:
-        forecast_url = f"https://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={lon}&appid={api_key}&units=metric"
-        response = requests.get(forecast_url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = weather.forecast()
 
         # Extract rainfall from forecast (3-hourly data for 5 days = 40 entries)
         total_rainfall = 0
@@ -1611,10 +1762,7 @@ def get_rainfall_from_api(lat, lon, api_key):
 
     # Fallback: Try current weather for any rain information
     try:
-        current_url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={api_key}&units=metric"
-        response = requests.get(current_url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = weather.current_weather()
 
         # Check for current rain
         rain = data.get('rain', {}).get('1h', 0) or data.get('rain', {}).get('3h', 0)
@@ -1640,7 +1788,7 @@ def get_soil_data_from_api(lat, lon):
         "depths": "0-5cm", # Focus on topsoil
     }
     try:
-        response = requests.get(SOILGRIDS_API_ENDPOINT, params=params, timeout=10)
+        response = http_client.get(SOILGRIDS_API_ENDPOINT, params=params)
         response.raise_for_status()
         data = response.json()
         
@@ -1667,163 +1815,348 @@ def get_soil_data_from_api(lat, lon):
             "Infiltration_Rate_mm_per_hr": infiltration_rate,
             "Soil_Permability_Class": "High" if infiltration_rate > 15 else "Medium"
         }
+    except CircuitOpenError:
+        print(f"SoilGrids circuit open - using default soil data for location ({lat}, {lon})")
+        return dict(DEFAULT_SOIL_DATA)
     except requests.exceptions.Timeout:
         print(f"Timeout error fetching soil data from ISRIC for location ({lat}, {lon})")
-        return {
-            "Soil_Type": "Loamy",
-            "Infiltration_Rate_mm_per_hr": 15,
-            "Soil_Permability_Class": "Medium"
-        }
+        return dict(DEFAULT_SOIL_DATA)
     except requests.exceptions.ConnectionError:
         print(f"Connection error fetching soil data from ISRIC for location ({lat}, {lon})")
-        return {
-            "Soil_Type": "Loamy",
-            "Infiltration_Rate_mm_per_hr": 15,
-            "Soil_Permability_Class": "Medium"
-        }
+        return dict(DEFAULT_SOIL_DATA)
     except requests.exceptions.HTTPError as e:
         print(f"HTTP error fetching soil data from ISRIC: {e}")
-        return {
-            "Soil_Type": "Loamy",
-            "Infiltration_Rate_mm_per_hr": 15,
-            "Soil_Permability_Class": "Medium"
-        }
+        return dict(DEFAULT_SOIL_DATA)
     except Exception as e:
         print(f"Unexpected error fetching soil data from ISRIC: {e}")
-        return {
+        return dict(DEFAULT_SOIL_DATA)
 
-            "Soil_Type": "Loamy",
-            "Infiltration_Rate_mm_per_hr": 15,
-            "Soil_Permability_Class": "Medium"
-        }
-
-def get_api_data(lat, lon):
+def get_soil_data(lat, lon):
     """
-    Main function to fetch and combine data from all external APIs.
-    Checks database first, fetches from APIs if not found, then stores for future use.
+    Soil properties for a location, sampled from the local soil texture raster.
+    Falls back to the SoilGrids API where the raster is missing or has no data.
     """
-    # First, check if we already have data for this location in the database
-    existing_data = GeoData.query.filter_by(latitude=lat, longitude=lon).first()
-    if existing_data:
-        print(f"Using cached API data for location ({lat}, {lon})")
-        # Convert database record to the expected format
-        return {
-            "Rainfall_mm": existing_data.rainfall_mm,
-            "Monthly_Rainfall_mm": {},  # Not cached, will be fetched fresh
-            "Live_Weather": {},  # Not cached, will be fetched fresh
-            "Soil_Type": existing_data.soil_type,
-            "Infiltration_Rate_mm_per_hr": existing_data.infiltration_rate_mm_per_hr,
-            "Soil_Permability_Class": existing_data.soil_permability_class,
-            "Groundwater_Depth_m": existing_data.groundwater_depth_m,
-            "Aquifer_Type": existing_data.aquifer_type,
-            "Aquifer_Depth_Min_m": existing_data.aquifer_depth_min_m,
-            "Aquifer_Depth_Max_m": existing_data.aquifer_depth_max_m,
-            "Aquifer_Thickness_m": existing_data.aquifer_thickness_m,
-            "Water_Quality": existing_data.water_quality,
-            "Remarks": existing_data.remarks,
-            "Region_Name": existing_data.region_name,
-            "distance": 0,  # Not stored in DB
-            "Runoff_Coefficient": 0.85,
-            "Water_Cost_per_Liter": existing_data.water_cost_per_liter,
-            "Aquifer_Material_State": "India",  # Default fallback
-            "Aquifer_Material_Type": "Alluvial",
-            "Aquifer_Material_Area": 10000000,
-        }
+    try:
+        soil_data = sample_soil_properties([(lat, lon)])[0]
+        if soil_data is not None:
+            return soil_data
+    except Exception as e:
+        print(f"Local soil raster lookup failed for ({lat}, {lon}): {e}")
+    return get_soil_data_from_api(lat, lon)
+
+def _in_app_context(func, *args, **kwargs):
+    """Wrap a database lookup so it runs inside its own app context on an enrichment thread."""
+    def runner():
+        with app.app_context():
+            return func(*args, **kwargs)
+    return runner
+
+# GeoData columns cached per field group, mapped to the keys used in location data
+LOCATION_CACHE_FIELDS = {
+    'rainfall': {
+        'rainfall_mm': 'Rainfall_mm',
+    },
+    'soil': {
+        'soil_type': 'Soil_Type',
+        'infiltration_rate_mm_per_hr': 'Infiltration_Rate_mm_per_hr',
+        'soil_permability_class': 'Soil_Permability_Class',
+    },
+    'groundwater': {
+        'groundwater_depth_m': 'Groundwater_Depth_m',
+        'aquifer_type': 'Aquifer_Type',
+        'aquifer_depth_min_m': 'Aquifer_Depth_Min_m',
+        'aquifer_depth_max_m': 'Aquifer_Depth_Max_m',
+        'aquifer_thickness_m': 'Aquifer_Thickness_m',
+        'water_quality': 'Water_Quality',
+        'remarks': 'Remarks',
+        'region_name': 'Region_Name',
+        'water_cost_per_liter': 'Water_Cost_per_Liter',
+    },
+}
+
+def _aquifer_material_fields(aquifer_data):
+    """Location data fields for a get_aquifer_material_at_location result."""
+    found = aquifer_data.get('found')
+    return {
+        "Aquifer_Material_State": aquifer_data.get('state_name', 'India') if found else 'India',
+        "Aquifer_Material_Type": aquifer_data.get('aquifer_type', 'Alluvial') if found else 'Alluvial',
+        "Aquifer_Material_Area": aquifer_data.get('area', 10000000) if found else 10000000,
+    }
 
-    print(f"Fetching fresh API data for location ({lat}, {lon})")
+def _geo_data_to_location_data(existing_data, lat, lon):
+    """
+    Convert a cached GeoData row to the location data format used by the analysis.
+    The aquifer material is not cached per cell; it is looked up for the exact point
+    (an in-memory point-in-polygon test once the polygon index is loaded).
+    """
+    location_data = {
+        "Rainfall_mm": existing_data.rainfall_mm,
+        "Monthly_Rainfall_mm": {},  # Not cached, will be fetched fresh
+        "Live_Weather": {},  # Not cached, will be fetched fresh
+        "Soil_Type": existing_data.soil_type,
+        "Infiltration_Rate_mm_per_hr": existing_data.infiltration_rate_mm_per_hr,
+        "Soil_Permability_Class": existing_data.soil_permability_class,
+        "Groundwater_Depth_m": existing_data.groundwater_depth_m,
+        "Aquifer_Type": existing_data.aquifer_type,
+        "Aquifer_Depth_Min_m": existing_data.aquifer_depth_min_m,
+        "Aquifer_Depth_Max_m": existing_data.aquifer_depth_max_m,
+        "Aquifer_Thickness_m": existing_data.aquifer_thickness_m,
+        "Water_Quality": existing_data.water_quality,
+        "Remarks": existing_data.remarks,
+        "Region_Name": existing_data.region_name,
+        "distance": 0,  # Not stored in DB
+        "Runoff_Coefficient": 0.85,
+        "Water_Cost_per_Liter": existing_data.water_cost_per_liter,
+    }
+    location_data.update(_aquifer_material_fields(get_aquifer_material_at_location(lat, lon)))
+    return location_data
 
-    # 1. Get live rainfall data
-    rainfall = get_rainfall_from_api(lat, lon, OPENWEATHERMAP_API_KEY)
+def _fetch_location_groups(lat, lon, groups):
+    """
+    Fetch fresh data for the given field groups and return the combined location fields.
+    Only the external calls and database lookups needed by those groups are made.
+    """
+    # One weather client per lookup: the forecast and current weather payloads are
+    # downloaded once and shared by all rainfall and live-weather computations.
+    weather = WeatherClient(lat, lon, OPENWEATHERMAP_API_KEY)
+
+    # Run the external API calls and the database lookups in parallel under one
+    # deadline. Each field falls back independently if its task fails or overruns.
+    tasks = {}
+    if 'rainfall' in groups:
+        tasks['rainfall'] = (
+            partial(get_rainfall_from_api, lat, lon, OPENWEATHERMAP_API_KEY, weather=weather),
+            partial(get_location_specific_rainfall_fallback, lat, lon)
+        )
+        tasks['monthly_rainfall'] = (
+            partial(get_monthly_rainfall_data, lat, lon, OPENWEATHERMAP_API_KEY, weather=weather),
+            partial(get_default_monthly_rainfall, lat, lon)
+        )
+        tasks['live_weather'] = (
+            partial(get_live_weather_data, lat, lon, OPENWEATHERMAP_API_KEY, weather=weather),
+            lambda: dict(DEFAULT_LIVE_WEATHER)
+        )
+    if 'soil' in groups:
+        tasks['soil_data'] = (
+            partial(get_soil_data, lat, lon),
+            lambda: dict(DEFAULT_SOIL_DATA)
+        )
+    if 'groundwater' in groups:
+        tasks['fallback_data'] = (
+            _in_app_context(get_nearest_geo_data_from_db, lat, lon),
+            lambda: None
+        )
+        tasks['nearby_stations_count'] = (
+            _in_app_context(check_nearby_groundwater_stations, lat, lon, radius_km=200),
+            lambda: 0
+        )
+        tasks['aquifer_data'] = (
+            _in_app_context(get_aquifer_material_at_location, lat, lon),
+            lambda: {'found': False, 'message': 'Aquifer material lookup did not complete'}
+        )
+    enriched = run_enrichment_tasks(tasks)
 
-    # 2. Get monthly rainfall breakdown
-    monthly_rainfall = get_monthly_rainfall_data(lat, lon, OPENWEATHERMAP_API_KEY)
+    combined_data = {}
 
-    # 3. Get live weather conditions
-    live_weather = get_live_weather_data(lat, lon, OPENWEATHERMAP_API_KEY)
+    if 'rainfall' in groups:
+        combined_data.update({
+            "Rainfall_mm": enriched['rainfall'],
+            "Monthly_Rainfall_mm": enriched['monthly_rainfall'],
+            "Live_Weather": enriched['live_weather'],
+        })
 
-    # 4. Get live soil data
-    soil_data = get_soil_data_from_api(lat, lon)
+    if 'soil' in groups:
+        soil_data = enriched['soil_data']
+        combined_data.update({
+            "Soil_Type": soil_data["Soil_Type"],
+            "Infiltration_Rate_mm_per_hr": soil_data["Infiltration_Rate_mm_per_hr"],
+            "Soil_Permability_Class": soil_data["Soil_Permability_Class"],
+        })
 
-    # 3. Get fallback data from the database for groundwater, aquifer, etc.
-    fallback_data = get_nearest_geo_data_from_db(lat, lon)
-    
-    # Check if there are nearby groundwater stations
-    nearby_stations_count = check_nearby_groundwater_stations(lat, lon, radius_km=200)
-    
-    if not fallback_data:
-        # If DB lookup fails, create a default fallback structure
-        remarks_msg = f'API data - {nearby_stations_count} nearby groundwater stations found' if nearby_stations_count > 0 else 'API data - no nearby station data'
-        fallback_data = {
-            'groundwater_depth_m': 10, 'aquifer_type': 'Unconfined', 'aquifer_depth_min_m': 10,
-            'aquifer_depth_max_m': 30, 'aquifer_thickness_m': 20, 'water_quality': 'Good',
-            'remarks': remarks_msg, 'region_name': f'Location ({lat:.4f}, {lon:.4f})', 'distance': 0,
-            'water_cost_per_liter': 0.16
-        }
-    else:
-        # Update remarks to reflect actual station availability
-        if nearby_stations_count > 0:
-            fallback_data['remarks'] = f'Database data - {nearby_stations_count} nearby groundwater stations found'
+    if 'groundwater' in groups:
+        fallback_data = enriched['fallback_data']
+        nearby_stations_count = enriched['nearby_stations_count']
+        aquifer_data = enriched['aquifer_data']
+
+        if not fallback_data:
+            # If DB lookup fails, create a default fallback structure
+            remarks_msg = f'API data - {nearby_stations_count} nearby groundwater stations found' if nearby_stations_count > 0 else 'API data - no nearby station data'
+            fallback_data = {
+                'groundwater_depth_m': 10, 'aquifer_type': 'Unconfined', 'aquifer_depth_min_m': 10,
+                'aquifer_depth_max_m': 30, 'aquifer_thickness_m': 20, 'water_quality': 'Good',
+                'remarks': remarks_msg, 'region_name': f'Location ({lat:.4f}, {lon:.4f})', 'distance': 0,
+                'water_cost_per_liter': 0.16
+            }
         else:
-            fallback_data['remarks'] = 'Database data - no nearby groundwater stations'
-
-    # 4. Get aquifer material data from PostGIS
-    aquifer_data = get_aquifer_material_at_location(lat, lon)
-
-    # 5. Combine all data into a single dictionary
-    combined_data = {
-        "Rainfall_mm": rainfall,
-        "Monthly_Rainfall_mm": monthly_rainfall,
-        "Live_Weather": live_weather,
-        "Soil_Type": soil_data["Soil_Type"],
-        "Infiltration_Rate_mm_per_hr": soil_data["Infiltration_Rate_mm_per_hr"],
-        "Soil_Permability_Class": soil_data["Soil_Permability_Class"],
-        # --- Fields from database fallback ---
-        "Groundwater_Depth_m": fallback_data.get('groundwater_depth_m', 10),
-        "Aquifer_Type": fallback_data.get('aquifer_type', 'Unconfined'),
-        "Aquifer_Depth_Min_m": fallback_data.get('aquifer_depth_min_m', 10),
-        "Aquifer_Depth_Max_m": fallback_data.get('aquifer_depth_max_m', 30),
-        "Aquifer_Thickness_m": fallback_data.get('aquifer_thickness_m', 20),
-        "Water_Quality": fallback_data.get('water_quality', 'Good'),
-        "Remarks": fallback_data.get('remarks', 'Data from APIs and nearest station'),
-        "Region_Name": fallback_data.get('region_name', f'Location ({lat:.4f}, {lon:.4f})'),
-        "distance": fallback_data.get('distance', 0),
-        "Runoff_Coefficient": 0.85, # Default, can be adjusted based on roof type later
-        "Water_Cost_per_Liter": fallback_data.get('water_cost_per_liter', 0.16),
-        # --- New PostGIS aquifer data ---
-        "Aquifer_Material_State": aquifer_data.get('state_name', 'India') if aquifer_data.get('found') else 'India',
-        "Aquifer_Material_Type": aquifer_data.get('aquifer_type', 'Alluvial') if aquifer_data.get('found') else 'Alluvial',
-        "Aquifer_Material_Area": aquifer_data.get('area', 10000000) if aquifer_data.get('found') else 10000000,
-    }
+            # Update remarks to reflect actual station availability
+            if nearby_stations_count > 0:
+                fallback_data['remarks'] = f'Database data - {nearby_stations_count} nearby groundwater stations found'
+            else:
+                fallback_data['remarks'] = 'Database data - no nearby groundwater stations'
+
+        combined_data.update({
+            # --- Fields from database fallback ---
+            "Groundwater_Depth_m": fallback_data.get('groundwater_depth_m', 10),
+            "Aquifer_Type": fallback_data.get('aquifer_type', 'Unconfined'),
+            "Aquifer_Depth_Min_m": fallback_data.get('aquifer_depth_min_m', 10),
+            "Aquifer_Depth_Max_m": fallback_data.get('aquifer_depth_max_m', 30),
+            "Aquifer_Thickness_m": fallback_data.get('aquifer_thickness_m', 20),
+            "Water_Quality": fallback_data.get('water_quality', 'Good'),
+            "Remarks": fallback_data.get('remarks', 'Data from APIs and nearest station'),
+            "Region_Name": fallback_data.get('region_name', f'Location ({lat:.4f}, {lon:.4f})'),
+            "distance": fallback_data.get('distance', 0),
+            "Water_Cost_per_Liter": fallback_data.get('water_cost_per_liter', 0.16),
+            # --- New PostGIS aquifer data ---
+            **_aquifer_material_fields(aquifer_data),
+        })
 
-    # 6. Save the API data to database for future use
+    return combined_data
+
+def _save_location_cache(cache_key, lat, lon, combined_data, groups):
+    """
+    Insert or update the cached GeoData row for a cell, stamping the refreshed groups.
+    A single INSERT ... ON CONFLICT (cell_key) DO UPDATE, so concurrent workers filling
+    the same cell converge on one row.
+    """
+    from sqlalchemy.dialects.postgresql import insert
+    now = datetime.utcnow()
     try:
-        geo_entry = GeoData(
-            region_name=combined_data["Region_Name"],
+        refreshed = {}
+        for group in groups:
+            for column, key in LOCATION_CACHE_FIELDS[group].items():
+                refreshed[column] = combined_data[key]
+            refreshed[f'{group}_updated_at'] = now
+
+        statement = insert(GeoData).values(
+            region_name=combined_data.get("Region_Name", f'Location ({lat:.4f}, {lon:.4f})'),
             state="Unknown",  # We don't get state from APIs
             latitude=lat,
             longitude=lon,
-            rainfall_mm=combined_data["Rainfall_mm"],
-            groundwater_depth_m=combined_data["Groundwater_Depth_m"],
-            aquifer_type=combined_data["Aquifer_Type"],
-            aquifer_depth_min_m=combined_data["Aquifer_Depth_Min_m"],
-            aquifer_depth_max_m=combined_data["Aquifer_Depth_Max_m"],
-            aquifer_thickness_m=combined_data["Aquifer_Thickness_m"],
-            remarks=combined_data["Remarks"],
-            soil_type=combined_data["Soil_Type"],
-            infiltration_rate_mm_per_hr=combined_data["Infiltration_Rate_mm_per_hr"],
-            soil_permability_class=combined_data["Soil_Permability_Class"],
-            water_quality=combined_data["Water_Quality"],
-            water_cost_per_liter=combined_data["Water_Cost_per_Liter"]
+            cell_key=cache_key,
+            **refreshed
+        ).on_conflict_do_update(
+            index_elements=[GeoData.cell_key],
+            set_=refreshed
         )
-        db.session.add(geo_entry)
+        db.session.execute(statement)
         db.session.commit()
-        print(f"Saved API data for location ({lat}, {lon}) to database")
+        # Sync rather than add the row alone: advancing the index's last_id past rows other
+        # workers inserted meanwhile would make later syncs skip them
+        _sync_geo_data_index(force=True)
+        print(f"Saved API data for location ({lat}, {lon}) to cache cell {cache_key}")
     except Exception as e:
         print(f"Error saving API data to database: {e}")
         db.session.rollback()
 
+# Location enrichment started speculatively from /submit_location, keyed by cache cell
+location_prefetch = PrefetchRegistry()
+# Concurrent lookups for the same cache cell share one enrichment run
+location_flight = SingleFlight()
+# Stale-while-revalidate refreshes of cached cells, one at a time per cell
+location_refresher = BackgroundRefresher()
+
+def prefetch_location_data(lat, lon):
+    """Start the location enrichment for (lat, lon) in the background so the results page finds it ready."""
+    try:
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        return
+    cache_key = location_cache.cell_key(lat, lon)
+    location_prefetch.submit(cache_key, _in_app_context(
+        location_flight.do, cache_key, partial(_compute_shared_location_data, lat, lon)))
+
+def _refresh_location_cache(lat, lon, cache_key):
+    """Background revalidation: refetch whichever groups of the cell are still stale."""
+    entry = GeoData.query.filter_by(cell_key=cache_key).first()
+    groups = location_cache.stale_groups(entry)
+    if not groups:
+        return  # Already refreshed by another request or worker
+    combined_data = _geo_data_to_location_data(entry, lat, lon) if entry else {"Runoff_Coefficient": 0.85}
+    combined_data.update(_fetch_location_groups(lat, lon, groups))
+    _save_location_cache(cache_key, lat, lon, combined_data, groups)
+
+def _compute_location_data(lat, lon):
+    """
+    Look up the cached GeoData row for the grid cell containing the location.
+    Groups past their soft TTL are served as cached and refreshed in the background;
+    groups past their hard TTL (or missing) are refetched now and stored.
+    """
+    cache_key = location_cache.cell_key(lat, lon)
+    existing_data = GeoData.query.filter_by(cell_key=cache_key).first()
+    revalidate, expired = location_cache.refresh_plan(existing_data)
+
+    if existing_data and not expired:
+        if revalidate:
+            location_cache.cache_stats.record('stale_hits')
+            print(f"Serving stale {', '.join(revalidate)} data for cell {cache_key} - refreshing in background")
+            location_refresher.submit(cache_key, _in_app_context(_refresh_location_cache, lat, lon, cache_key))
+        else:
+            location_cache.cache_stats.record('hits')
+            print(f"Using cached API data for location ({lat}, {lon}) from cell {cache_key}")
+        return _geo_data_to_location_data(existing_data, lat, lon)
+
+    # Already paying for a synchronous fetch, so bring soft-stale groups up to date too
+    groups = expired + revalidate
+    if existing_data:
+        location_cache.cache_stats.record('partial_hits')
+        print(f"Refreshing {', '.join(groups)} data for location ({lat}, {lon}) in cell {cache_key}")
+        combined_data = _geo_data_to_location_data(existing_data, lat, lon)
+    else:
+        location_cache.cache_stats.record('misses')
+        print(f"Fetching fresh API data for location ({lat}, {lon})")
+        combined_data = {"Runoff_Coefficient": 0.85}  # Default, can be adjusted based on roof type later
+
+    combined_data.update(_fetch_location_groups(lat, lon, groups))
+
+    # Save the API data to database for future use
+    _save_location_cache(cache_key, lat, lon, combined_data, groups)
+
     return combined_data
 
+def _compute_shared_location_data(lat, lon):
+    """
+    _compute_location_data for a prefetch or single-flight shared by everyone in the cell.
+    Returns ((lat, lon) it was computed for, location data); see _location_data_for_point.
+    """
+    return (lat, lon), _compute_location_data(lat, lon)
+
+def _location_data_for_point(shared, lat, lon):
+    """
+    Copy of a cell's shared location data for (lat, lon). Everything cached per cell is
+    reused; the aquifer material, which depends on the exact point, is looked up again
+    when the data was computed for another point in the cell.
+    """
+    computed_for, location_data = shared
+    location_data = dict(location_data)
+    if computed_for != (lat, lon):
+        location_data.update(_aquifer_material_fields(get_aquifer_material_at_location(lat, lon)))
+    return location_data
+
+def get_api_data(lat, lon):
+    """
+    Main function to fetch and combine data from all external APIs.
+    Uses the prefetched result for the location's cache cell when one was started
+    from /submit_location, otherwise computes it now (see _compute_location_data),
+    sharing one computation between concurrent requests for the same cell.
+    """
+    cache_key = location_cache.cell_key(lat, lon)
+    future = location_prefetch.claim(cache_key)
+    if future is not None and future.done():
+        try:
+            location_data = _location_data_for_point(future.result(), lat, lon)
+            print(f"Using prefetched API data for location ({lat}, {lon}) from cell {cache_key}")
+            return location_data
+        except Exception as e:
+            print(f"Prefetch for cell {cache_key} unavailable ({e or type(e).__name__}) - fetching now")
+    elif future is not None:
+        # Still queued: drop it and compute now. A prefetch that is already running is
+        # inside location_flight, so the call below waits for it instead of repeating it.
+        future.cancel()
+
+    # Joins an in-flight lookup for the same cell (including a running prefetch) if there is one
+    return _location_data_for_point(
+        location_flight.do(cache_key, partial(_compute_shared_location_data, lat, lon)), lat, lon)
+
 # def load_csv_to_db():
 #     """
 #     Loads data from the mock_location_data.csv file into the GeoData table.
@@ -1891,8 +2224,8 @@ def check_nearby_groundwater_stations(lat, lon, radius_km=200):
         point = func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
         count_query = db.session.query(func.count(GroundWaterLevelStation.id)).filter(
             func.ST_DWithin(
-                GroundWaterLevelStation.geometry.cast(db.text('geography')),
-                point.cast(db.text('geography')),
+                as_geography(GroundWaterLevelStation.geometry),
+                as_geography(point),
                 radius_km * 1000
             )
         )
@@ -1904,52 +2237,167 @@ def check_nearby_groundwater_stations(lat, lon, radius_km=200):
         print(f"Error checking nearby groundwater stations: {e}")
         return 0
 
-def get_nearest_geo_data_from_db(lat, lon):
+# Nearest-neighbour index over GeoData points, built at startup and synced incrementally.
+# This process syncs after each save; rows saved by other workers are picked up by a
+# sync at most every GEO_DATA_INDEX_SYNC_SECONDS.
+GEO_DATA_INDEX_SYNC_SECONDS = float(os.environ.get('GEO_DATA_INDEX_SYNC_SECONDS', 30))
+geo_data_index = GeoPointIndex()
+_geo_data_index_lock = threading.Lock()
+_geo_data_index_synced_at = None
+
+def _sync_geo_data_index(force=False):
+    """
+    Add GeoData rows inserted since the last sync to the index, unless a sync ran within
+    GEO_DATA_INDEX_SYNC_SECONDS (`force` always syncs). Only the first sync and forced
+    ones wait for the lock; otherwise lookups skip the sync while another thread runs one,
+    so they never queue behind the query.
+    """
+    global _geo_data_index_synced_at
+
+    def fresh():
+        synced_at = _geo_data_index_synced_at
+        return synced_at is not None and time.monotonic() - synced_at < GEO_DATA_INDEX_SYNC_SECONDS
+
+    if not force and fresh():
+        return
+    if not _geo_data_index_lock.acquire(blocking=force or _geo_data_index_synced_at is None):
+        return
+    try:
+        if not force and fresh():
+            return  # Another thread synced while this one waited
+        rows = db.session.query(GeoData.id, GeoData.latitude, GeoData.longitude).filter(
+            GeoData.id > geo_data_index.last_id
+        ).all()
+        if rows:
+            geo_data_index.add_many(rows)
+        _geo_data_index_synced_at = time.monotonic()
+    finally:
+        _geo_data_index_lock.release()
+
+def get_nearest_geo_data_from_db(lat, lon, max_km=None):
     """
     Finds the nearest geological data point from the GeoData table in the database.
+    Uses the in-memory spatial index; pass max_km to ignore points further away.
     """
-    # This is a simplified distance calculation. For production, consider using PostGIS for efficiency.
-    all_geo_data = GeoData.query.all()
-    if not all_geo_data:
-        return None
+    _sync_geo_data_index()
+    while True:
+        hit = geo_data_index.nearest(lat, lon, max_km=max_km)
+        if hit is None:
+            return None
+        geo_data_id, distance = hit
+        nearest_data = db.session.get(GeoData, geo_data_id)
+        if nearest_data is not None:
+            result = nearest_data.to_dict()
+            result['distance'] = distance
+            return result
+        # Row deleted since it was indexed
+        geo_data_index.discard(geo_data_id)
 
-    min_dist = float('inf')
-    nearest_data = None
+def _build_geo_data_index():
+    try:
+        with app.app_context():
+            _sync_geo_data_index()
+        print(f"GeoData spatial index built with {len(geo_data_index)} points")
+    except Exception as e:
+        # Built lazily by the first nearest lookup instead
+        print(f"GeoData spatial index not built at startup: {e}")
 
-    for location in all_geo_data:
-        dist = haversine(lat, lon, location.latitude, location.longitude)
-        if dist < min_dist:
-            min_dist = dist
-            nearest_data = location
+_build_geo_data_index()
 
-    if nearest_data:
-        result = nearest_data.to_dict()
-        result['distance'] = min_dist
-        return result
-    return None
+# Versions of the loaded spatial tables, bumped by the loader scripts
+dataset_versions = DatasetVersions()
+
+# In-memory point-in-polygon indexes over the aquifer layers, (re)loaded in the background
+POLYGON_INDEX_ENABLED = os.environ.get('POLYGON_INDEX_ENABLED', 'true').lower() == 'true'
+aquifer_material_index = PolygonIndex('aquifer_materials')
+major_aquifer_index = PolygonIndex('major_aquifers')
+
+def _aquifer_material_properties(row):
+    return {
+        'state_name': row.Name_of_St,
+        'aquifer_type': row.Type_of_Aq,
+        'area': row.st_area_sh,
+        'length': row.st_length_,
+    }
+
+def _major_aquifer_properties(row):
+    return {
+        'aquifer': row.aquifer,
+        'state': row.state,
+        'system': row.system,
+        'zone_m': row.zone_m,
+        'avg_mbgl': row.avg_mbgl,
+        'hydraulic_conductivity_m2_per_day': row.m2_perday,
+        'transmissivity_m3_per_day': row.m3_per_day,
+        'yield': row.yeild__,
+    }
+
+# table name -> (index, model, properties builder)
+POLYGON_INDEX_SOURCES = {
+    'aquifer_materials': (aquifer_material_index, AquiferMaterial, _aquifer_material_properties),
+    'major_aquifers': (major_aquifer_index, MajorAquifer, _major_aquifer_properties),
+}
+
+def _polygon_index_rows(table_name):
+    """Loader for a polygon index: (id, WKB, properties) for every row of the table."""
+    _, model, properties = POLYGON_INDEX_SOURCES[table_name]
+    from sqlalchemy.orm import defer
+    with app.app_context():
+        rows = db.session.query(model, func.ST_AsBinary(model.geometry).label('wkb')).options(
+            defer(model.geometry)
+        ).all()
+        return [(row[0].id, row.wkb, properties(row[0])) for row in rows]
+
+def _polygon_index_ready(table_name):
+    """
+    True if the table's polygon index is loaded and can answer lookups.
+    Starts a background (re)load when it is missing or older than the table's dataset version.
+    """
+    index = POLYGON_INDEX_SOURCES[table_name][0]
+    if not POLYGON_INDEX_ENABLED:
+        return False
+    version = dataset_versions.get(db.session, table_name)
+    return index.ensure_version(partial(_polygon_index_rows, table_name), version)
+
+def _load_polygon_indexes():
+    try:
+        with app.app_context():
+            for table_name in POLYGON_INDEX_SOURCES:
+                _polygon_index_ready(table_name)
+    except Exception as e:
+        # Loaded on the first lookup instead
+        print(f"Polygon indexes not loaded at startup: {e}")
+
+_load_polygon_indexes()
+
+def _polygon_at_location(table_name, lat, lon):
+    """Properties of the table's polygon containing (lat, lon), or None; PostGIS when the index is not loaded."""
+    if _polygon_index_ready(table_name):
+        return POLYGON_INDEX_SOURCES[table_name][0].find(lat, lon)
+
+    from sqlalchemy.orm import defer
+    _, model, properties = POLYGON_INDEX_SOURCES[table_name]
+    point = WKTElement(f'POINT({lon} {lat})', srid=4326)
+    result = db.session.query(model).options(defer(model.geometry)).filter(
+        func.ST_Contains(model.geometry, point)
+    ).order_by(model.id).first()
+    return properties(result) if result else None
+
+def get_polygons_at_locations(table_name, coords):
+    """Batch version of _polygon_at_location for a list of (lat, lon)."""
+    if _polygon_index_ready(table_name):
+        return POLYGON_INDEX_SOURCES[table_name][0].find_many(coords)
+    return [_polygon_at_location(table_name, lat, lon) for lat, lon in coords]
 
 def get_aquifer_material_at_location(lat, lon):
     """
-    Query the PostGIS database to find aquifer material data at a specific latitude and longitude.
-    Returns the aquifer material information if found, None otherwise.
+    Find the aquifer material polygon containing a specific latitude and longitude.
+    Uses the in-memory polygon index, or PostGIS while it is not loaded.
     """
     try:
-        # Create a point geometry from the lat/lon coordinates
-        point = WKTElement(f'POINT({lon} {lat})', srid=4326)
-        
-        # Query for aquifer material that contains this point
-        result = db.session.query(AquiferMaterial).filter(
-            func.ST_Contains(AquiferMaterial.geometry, point)
-        ).first()
-        
+        result = _polygon_at_location('aquifer_materials', lat, lon)
         if result:
-            return {
-                'state_name': result.name_of_st,
-                'aquifer_type': result.type_of_aq,
-                'area': result.st_area_sh,
-                'length': result.st_length_,
-                'found': True
-            }
+            return dict(result, found=True)
         else:
             return {'found': False, 'message': 'No aquifer material data found at this location'}
             
@@ -1957,6 +2405,150 @@ def get_aquifer_material_at_location(lat, lon):
         print(f"Error querying aquifer material data: {e}")
         return {'found': False, 'message': f'Database error: {str(e)}'}
 
+def get_major_aquifer_at_location(lat, lon):
+    """Find the major aquifer polygon containing a location, in the same format as the aquifer material lookup."""
+    try:
+        result = _polygon_at_location('major_aquifers', lat, lon)
+        if result:
+            return dict(result, found=True)
+        return {'found': False, 'message': 'No major aquifer data found at this location'}
+    except Exception as e:
+        print(f"Error querying major aquifer data: {e}")
+        return {'found': False, 'message': f'Database error: {str(e)}'}
+
+# Upper bound on coordinates per batch lookup request
+BATCH_LOOKUP_MAX_POINTS = int(os.environ.get('BATCH_LOOKUP_MAX_POINTS', 250))
+# Station count radius: default and upper bound (the count query's cost grows with the radius)
+BATCH_LOOKUP_DEFAULT_RADIUS_KM = float(os.environ.get('BATCH_LOOKUP_DEFAULT_RADIUS_KM', 50))
+BATCH_LOOKUP_MAX_RADIUS_KM = float(os.environ.get('BATCH_LOOKUP_MAX_RADIUS_KM', 100))
+# Per-statement time limit for the batch queries, so one request cannot hold the database for long
+BATCH_LOOKUP_STATEMENT_TIMEOUT_MS = int(os.environ.get('BATCH_LOOKUP_STATEMENT_TIMEOUT_MS', 10000))
+
+# Coordinates as two parallel arrays, numbered 1..N in input order
+_BATCH_POINTS_SQL = (
+    "unnest(CAST(:lats AS double precision[]), CAST(:lons AS double precision[])) "
+    "WITH ORDINALITY AS pts(lat, lon, ord)"
+)
+
+def _batch_polygon_lookup(table_name, coords):
+    """
+    Containing polygon properties (or None) for each coordinate.
+    Uses the polygon index if loaded, otherwise one set-based point-in-polygon join.
+    """
+    if _polygon_index_ready(table_name):
+        return POLYGON_INDEX_SOURCES[table_name][0].find_many(coords)
+
+    from sqlalchemy.orm import defer
+    _, model, properties = POLYGON_INDEX_SOURCES[table_name]
+    rows = db.session.execute(db.text(f"""
+        SELECT pts.ord, m.id
+        FROM {_BATCH_POINTS_SQL}
+        LEFT JOIN LATERAL (
+            SELECT t.id FROM {table_name} t
+            WHERE ST_Contains(t.geometry, ST_SetSRID(ST_MakePoint(pts.lon, pts.lat), 4326))
+            ORDER BY t.id LIMIT 1
+        ) m ON true
+    """), {'lats': [lat for lat, _ in coords], 'lons': [lon for _, lon in coords]}).all()
+
+    ids = {polygon_id for _, polygon_id in rows if polygon_id is not None}
+    polygons = {}
+    if ids:
+        polygons = {
+            polygon.id: properties(polygon)
+            for polygon in db.session.query(model).options(defer(model.geometry)).filter(model.id.in_(ids))
+        }
+    results = [None] * len(coords)
+    for ordinality, polygon_id in rows:
+        results[ordinality - 1] = polygons.get(polygon_id)
+    return results
+
+def _batch_station_counts(coords, radius_km):
+    """Groundwater level stations within radius_km of each coordinate, in one query."""
+    rows = db.session.execute(db.text(f"""
+        SELECT pts.ord, (
+            SELECT count(*) FROM ground_water_level_stations s
+            WHERE ST_DWithin(CAST(s.geometry AS geography),
+                             CAST(ST_SetSRID(ST_MakePoint(pts.lon, pts.lat), 4326) AS geography),
+                             :radius_m)
+        )
+        FROM {_BATCH_POINTS_SQL}
+    """), {'lats': [lat for lat, _ in coords], 'lons': [lon for _, lon in coords],
+           'radius_m': radius_km * 1000}).all()
+    counts = [0] * len(coords)
+    for ordinality, count in rows:
+        counts[ordinality - 1] = count or 0
+    return counts
+
+def _batch_nearest_geo_data(coords, max_km=None):
+    """Nearest GeoData record (with distance) for each coordinate: index lookups plus one fetch of the rows."""
+    _sync_geo_data_index()
+    hits = [geo_data_index.nearest(lat, lon, max_km=max_km) for lat, lon in coords]
+    ids = {hit[0] for hit in hits if hit is not None}
+    records = {row.id: row.to_dict() for row in GeoData.query.filter(GeoData.id.in_(ids))} if ids else {}
+
+    results = []
+    for (lat, lon), hit in zip(coords, hits):
+        if hit is None:
+            results.append(None)
+        elif hit[0] in records:
+            results.append(dict(records[hit[0]], distance=hit[1]))
+        else:
+            # Row deleted since it was indexed
+            results.append(get_nearest_geo_data_from_db(lat, lon, max_km=max_km))
+    return results
+
+def batch_location_lookup(coords, radius_km=BATCH_LOOKUP_DEFAULT_RADIUS_KM):
+    """
+    Aquifer material, major aquifer, nearby station count and nearest groundwater record
+    for every (lat, lon) in `coords`, using one set-based query per layer instead of
+    per-point lookups. Results are in input order. Each query is limited to
+    BATCH_LOOKUP_STATEMENT_TIMEOUT_MS for the rest of the current transaction.
+    """
+    coords = [(float(lat), float(lon)) for lat, lon in coords]
+    if not coords:
+        return []
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(db.text("SELECT set_config('statement_timeout', :timeout, true)"),
+                           {'timeout': str(BATCH_LOOKUP_STATEMENT_TIMEOUT_MS)})
+    aquifer_materials = _batch_polygon_lookup('aquifer_materials', coords)
+    major_aquifers = _batch_polygon_lookup('major_aquifers', coords)
+    station_counts = _batch_station_counts(coords, radius_km)
+    nearest_records = _batch_nearest_geo_data(coords)
+
+    return [
+        {
+            'lat': lat,
+            'lon': lon,
+            'aquifer_material': aquifer_material,
+            'major_aquifer': major_aquifer,
+            'nearby_stations_count': station_count,
+            'nearest_groundwater': nearest,
+        }
+        for (lat, lon), aquifer_material, major_aquifer, station_count, nearest
+        in zip(coords, aquifer_materials, major_aquifers, station_counts, nearest_records)
+    ]
+
+def _parse_batch_coordinates(points):
+    """[[lat, lon], ...] or [{"lat": ..., "lon": ...}, ...] -> list of validated (lat, lon)."""
+    if not isinstance(points, list):
+        raise ValueError('coordinates must be a list')
+    coords = []
+    for point in points:
+        if isinstance(point, dict):
+            lat, lon = point.get('lat'), point.get('lon')
+        elif isinstance(point, (list, tuple)) and len(point) == 2:
+            lat, lon = point
+        else:
+            raise ValueError('each coordinate must be [lat, lon] or {"lat": ..., "lon": ...}')
+        lat_valid, lat = validate_latitude(lat)
+        if not lat_valid:
+            raise ValueError(f"Invalid coordinate {point}: {lat}")
+        lon_valid, lon = validate_longitude(lon)
+        if not lon_valid:
+            raise ValueError(f"Invalid coordinate {point}: {lon}")
+        coords.append((lat, lon))
+    return coords
+
 if __name__ == '__main__':
     with app.app_context():
         # Create the database tables if they don't exist
@@ -1983,64 +2575,370 @@ if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
 
 # API Routes for Interactive Map
+# Upper bound on the page size of the paginated list endpoints
+PAGE_MAX_LIMIT = int(os.environ.get('PAGE_MAX_LIMIT', 5000))
+
+def _paginated_list(model, fields, default_limit, key, filters=()):
+    """
+    One keyset page of `model` rows as JSON, for the map list endpoints.
+
+    `fields` maps response field names to column expressions. Query parameters:
+    `fields` (comma-separated subset; id is always included), `limit`, `bbox`
+    (min_lon,min_lat,max_lon,max_lat) and `cursor` (the next_cursor of the previous
+    page). Rows are ordered by id and each page seeks past the cursor on the primary
+    key, so every page costs the same however deep the client pages.
+    """
+    requested = request.args.get('fields')
+    names = list(fields)
+    if requested:
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in fields]
+        if unknown:
+            return jsonify({'error': f"Unknown fields: {', '.join(unknown)}",
+                            'available_fields': list(fields)}), 400
+        if 'id' not in names:
+            names.insert(0, 'id')
+
+    limit = min(max(request.args.get('limit', default=default_limit, type=int), 1), PAGE_MAX_LIMIT)
+    cursor = request.args.get('cursor')
+    try:
+        cursor = int(cursor) if cursor else None
+    except ValueError:
+        return jsonify({'error': 'cursor must be a next_cursor value'}), 400
+    try:
+        bbox = _parse_bbox_param()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = db.session.query(*[fields[name].label(name) for name in names]).filter(*filters)
+    if bbox is not None:
+        query = query.filter(_envelope_overlaps(model.geometry, *bbox))
+    if cursor is not None:
+        query = query.filter(model.id > cursor)
+    # One extra row tells whether another page follows
+    rows = query.order_by(model.id).limit(limit + 1).all()
+
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return jsonify({key: [row._asdict() for row in rows[:limit]], 'next_cursor': next_cursor})
+
 @app.route('/api/groundwater-stations')
 def get_groundwater_stations():
-    """API endpoint to get ground water station data for the map."""
+    """API endpoint to get ground water station data for the map, in pages (see _paginated_list)."""
     try:
-        from models import GroundWaterLevelStation
-        stations = GroundWaterLevelStation.query.limit(1000).all()  # Limit for performance
-        
-        data = []
-        for station in stations:
-            if station.lat and station.long:
-                data.append({
-                    'id': station.id,
-                    'name': station.station_na or 'Unknown',
-                    'lat': station.lat,
-                    'lng': station.long,
-                    'state': station.state_name,
-                    'district': station.district_n,
-                    'agency': station.agency_nam,
-                    'basin': station.basin_name
-                })
-        
-        return jsonify({'stations': data})
+        from models import GroundWaterLevelStation as Station
+        return _paginated_list(Station, {
+            'id': Station.id,
+            'name': func.coalesce(Station.station_na, 'Unknown'),
+            'lat': Station.lat,
+            'lng': Station.long,
+            'state': Station.state_name,
+            'district': Station.district_n,
+            'agency': Station.agency_nam,
+            'basin': Station.basin_name,
+        }, default_limit=1000, key='stations', filters=(Station.lat.isnot(None), Station.long.isnot(None)))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/aquifers')
 def get_aquifers():
-    """API endpoint to get major aquifer data for the map."""
+    """API endpoint to get major aquifer data for the map, in pages (see _paginated_list)."""
     try:
         from models import MajorAquifer
-        aquifers = MajorAquifer.query.limit(500).all()  # Limit for performance
-        
-        data = []
-        for aquifer in aquifers:
-            # For polygon geometries, we'll need to extract coordinates
-            # For now, just return basic info
-            data.append({
-                'id': aquifer.id,
-                'name': aquifer.aquifer or 'Unknown',
-                'state': aquifer.state,
-                'system': aquifer.system,
-                'zone': aquifer.zone_m
-            })
-        
-        return jsonify({'aquifers': data})
+        return _paginated_list(MajorAquifer, {
+            'id': MajorAquifer.id,
+            'name': func.coalesce(MajorAquifer.aquifer, 'Unknown'),
+            'state': MajorAquifer.state,
+            'system': MajorAquifer.system,
+            'zone': MajorAquifer.zone_m,
+        }, default_limit=500, key='aquifers')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/nearest-stations')
+def api_nearest_stations():
+    """Nearest groundwater level stations to lat/lon, with distances in km. Use k for the count (max 50)."""
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    k = min(max(request.args.get('k', default=5, type=int), 1), 50)
+    if lat is None or lon is None:
+        return jsonify({'error': 'lat and lon are required'}), 400
+    try:
+        return jsonify({'stations': get_nearest_stations(lat, lon, k=k)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/batch-location-lookup', methods=['POST'])
+def api_batch_location_lookup():
+    """
+    Multi-layer lookup for many coordinates at once.
+    Body: {"coordinates": [[lat, lon], ...], "radius_km": 50}. Results are in input order.
+    At most BATCH_LOOKUP_MAX_POINTS coordinates and BATCH_LOOKUP_MAX_RADIUS_KM per request.
+    """
+    data = request.get_json(silent=True) or {}
+    points = data.get('coordinates')
+    if isinstance(points, list) and len(points) > BATCH_LOOKUP_MAX_POINTS:
+        return jsonify({'error': f'At most {BATCH_LOOKUP_MAX_POINTS} coordinates per request'}), 400
+    try:
+        coords = _parse_batch_coordinates(points)
+        radius_km = float(data.get('radius_km', BATCH_LOOKUP_DEFAULT_RADIUS_KM))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    if not 0 < radius_km <= BATCH_LOOKUP_MAX_RADIUS_KM:
+        return jsonify({'error': f'radius_km must be between 0 and {BATCH_LOOKUP_MAX_RADIUS_KM:g}'}), 400
+
+    try:
+        results = batch_location_lookup(coords, radius_km=radius_km)
+    except Exception as e:
+        print(f"Error in batch location lookup: {e}")
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+    return jsonify({'count': len(results), 'results': results})
+
+# Hard cap on the `limit` parameter of the GeoJSON layer endpoints
+GEO_MAX_FEATURES = int(os.environ.get('GEO_MAX_FEATURES', 50000))
+# Rows fetched per server-side cursor round-trip when streaming
+GEO_STREAM_BATCH_ROWS = int(os.environ.get('GEO_STREAM_BATCH_ROWS', 500))
+
+def _geo_limit(default):
+    """The request's `limit` parameter clamped to [1, GEO_MAX_FEATURES], or the endpoint default."""
+    limit = request.args.get('limit', type=int)
+    if limit is None:
+        return default
+    return min(max(limit, 1), GEO_MAX_FEATURES)
+
+def _geo_stream_requested():
+    return request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+
+def _feature_collection_response(query, properties):
+    """
+    Build a GeoJSON FeatureCollection for `query` entirely in PostGIS and return it as a response.
+
+    `query` must select a `geometry` column plus the columns used by `properties`, a list of
+    (property name, column name or callable taking the row subquery's columns) pairs. The
+    features are assembled with json_build_object/json_agg, so the whole collection comes
+    back as one text value in a single round-trip.
+
+    With ?stream=1 the features are instead read through a server-side cursor, one
+    GEO_STREAM_BATCH_ROWS batch at a time, and written out as they arrive, so memory stays
+    flat however many features the query returns. A database error mid-stream aborts the
+    response, leaving the client an incomplete (invalid) JSON body.
+    """
+    from sqlalchemy import cast, select, Text
+    from sqlalchemy.dialects.postgresql import JSON
+
+    rows = query.subquery()
+    property_args = []
+    for name, column in properties:
+        property_args.extend([name, column(rows.c) if callable(column) else rows.c[column]])
+
+    feature = func.json_build_object(
+        'type', 'Feature',
+        'geometry', cast(func.ST_AsGeoJSON(rows.c.geometry), JSON),
+        'properties', func.json_build_object(*property_args)
+    )
+
+    if _geo_stream_requested():
+        statement = select(cast(feature, Text)).where(rows.c.geometry.isnot(None)).execution_options(
+            yield_per=GEO_STREAM_BATCH_ROWS
+        )
+
+        def generate():
+            yield '{"type": "FeatureCollection", "features": ['
+            separator = ''
+            try:
+                for batch in db.session.execute(statement).scalars().partitions():
+                    yield separator + ','.join(batch)
+                    separator = ','
+            except Exception as e:
+                # Headers are already sent; re-raise so the chunked response is aborted and the
+                # client gets an unterminated body it can detect, not a silently shortened layer
+                print(f"Error streaming GeoJSON features: {e}")
+                db.session.rollback()
+                raise
+            yield ']}'
+
+        return Response(stream_with_context(generate()), mimetype='application/json')
+
+    collection = func.json_build_object(
+        'type', 'FeatureCollection',
+        'features', func.coalesce(func.json_agg(feature), db.text("'[]'::json"))
+    )
+    body = db.session.scalar(select(cast(collection, Text)).where(rows.c.geometry.isnot(None)))
+    return Response(body, mimetype='application/json')
+
+# Whether a <table>_simplified copy exists, per dataset version of the source table
+_simplified_table_checks = {}
+
+def _simplification_level_arg():
+    """Stored tolerance selected by the request's `tolerance` or `zoom` parameter, or None for full detail."""
+    tolerance = request.args.get('tolerance', type=float)
+    zoom = request.args.get('zoom', type=float)
+    if tolerance is not None:
+        return select_tolerance(tolerance)
+    if zoom is not None:
+        return tolerance_for_zoom(zoom)
+    return None
+
+def _simplification_tolerance(table_name):
+    """
+    Stored simplification level for the request's `tolerance` (degrees) or `zoom` parameter.
+    Returns None for full-resolution geometry, including when the loaders have not built the levels.
+    """
+    level = _simplification_level_arg()
+    if level is None:
+        return None
+
+    check_key = (table_name, dataset_versions.get(db.session, table_name))
+    if check_key not in _simplified_table_checks:
+        from sqlalchemy import inspect
+        _simplified_table_checks[check_key] = inspect(db.engine).has_table(simplified_table_name(table_name))
+    return level if _simplified_table_checks[check_key] else None
+
+def _parse_bbox_param():
+    """
+    Parse the `bbox` query parameter ("min_lon,min_lat,max_lon,max_lat", GeoJSON order).
+    Returns None when absent; raises ValueError when malformed.
+
+    Viewports that wrap past +-180 (as web maps report them after panning across the
+    antimeridian) are accepted, up to one full turn; boxes lying wholly beyond +-180 are
+    shifted back, and _bbox_envelopes splits the ones that cross it.
+    """
+    raw = request.args.get('bbox')
+    if not raw:
+        return None
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in raw.split(','))
+    except ValueError:
+        raise ValueError('bbox must be min_lon,min_lat,max_lon,max_lat')
+    if min_lat > max_lat or not (-90 <= min_lat <= 90 and -90 <= max_lat <= 90):
+        raise ValueError('bbox latitudes out of range')
+    if min_lon > max_lon:
+        raise ValueError('bbox min_lon must not exceed max_lon')
+    if not (-360 <= min_lon and max_lon <= 360) or max_lon - min_lon > 360:
+        raise ValueError('bbox longitudes out of range')
+    if max_lon < -180:
+        min_lon, max_lon = min_lon + 360, max_lon + 360
+    elif min_lon > 180:
+        min_lon, max_lon = min_lon - 360, max_lon - 360
+    return min_lon, min_lat, max_lon, max_lat
+
+def _bbox_envelopes(min_lon, min_lat, max_lon, max_lat):
+    """ST_MakeEnvelope(s) covering a bbox; boxes crossing the antimeridian are split in two."""
+    if min_lon < -180:
+        return [func.ST_MakeEnvelope(min_lon + 360, min_lat, 180, max_lat, 4326),
+                func.ST_MakeEnvelope(-180, min_lat, max_lon, max_lat, 4326)]
+    if max_lon > 180:
+        return [func.ST_MakeEnvelope(min_lon, min_lat, 180, max_lat, 4326),
+                func.ST_MakeEnvelope(-180, min_lat, max_lon - 360, max_lat, 4326)]
+    return [func.ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, 4326)]
+
+def _envelope_overlaps(geometry, min_lon, min_lat, max_lon, max_lat):
+    """Index-backed planar && prefilter against the bbox's envelopes (see _bbox_envelopes)."""
+    return db.or_(*[geometry.op('&&')(envelope)
+                    for envelope in _bbox_envelopes(min_lon, min_lat, max_lon, max_lat)])
+
+def _within_radius(geometry, lat, lon, radius_km):
+    """
+    Two-phase radius filter for polygon layers: an && envelope prefilter on the GIST index,
+    then an exact geodesic ST_DWithin evaluated only on the candidates it lets through.
+    """
+    min_lat, min_lon, max_lat, max_lon = bounding_box(lat, lon, radius_km)
+    point = func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
+    return db.and_(
+        _envelope_overlaps(geometry, min_lon, min_lat, max_lon, max_lat),
+        func.ST_DWithin(as_geography(geometry), as_geography(point), radius_km * 1000)
+    )
+
+def _in_viewport(geometry, bbox):
+    """
+    Polygons intersecting a bbox viewport, split at the antimeridian like _envelope_overlaps
+    (ST_Intersects applies the && index check itself).
+    """
+    return db.or_(*[func.ST_Intersects(geometry, envelope) for envelope in _bbox_envelopes(*bbox)])
+
+# --- GeoJSON layer response cache ---
+# Bodies are cached per normalized query and dataset version, so a loader run
+# invalidates them; clients revalidate with If-None-Match against a strong ETag.
+GEO_CACHE_MAX_BYTES = int(os.environ.get('GEO_CACHE_MAX_MB', 128)) * 1024 * 1024
+GEO_CACHE_MAX_AGE_SECONDS = int(os.environ.get('GEO_CACHE_MAX_AGE_SECONDS', 0))
+# lat/lon are snapped to this grid (degrees, ~1 km) so nearby map centres share entries
+GEO_CACHE_SNAP_DEGREES = float(os.environ.get('GEO_CACHE_SNAP_DEGREES', 0.01))
+# Query parameters that affect a layer response; anything else (e.g. cache busters) is ignored.
+# zoom and tolerance are keyed by what they select (see geo_response_cached's zoom_arg)
+GEO_CACHE_PARAMS = ('lat', 'lon', 'radius_km', 'bbox', 'limit')
+
+geo_response_cache = MemoryLRUCache(max_entries=512, max_bytes=GEO_CACHE_MAX_BYTES)
+
+def _geo_coordinate_arg(name):
+    """Float query parameter `name` snapped to GEO_CACHE_SNAP_DEGREES, or None."""
+    value = request.args.get(name, type=float)
+    if value is None or not GEO_CACHE_SNAP_DEGREES:
+        return value
+    return round(round(value / GEO_CACHE_SNAP_DEGREES) * GEO_CACHE_SNAP_DEGREES, 6)
+
+def _geo_cache_key(table_name, zoom_arg=_simplification_level_arg):
+    params = []
+    for name in GEO_CACHE_PARAMS:
+        if name in ('lat', 'lon'):
+            value = _geo_coordinate_arg(name)
+        elif name == 'bbox':
+            value = request.args.get(name)
+        elif name == 'limit':
+            value = _geo_limit(None)
+        else:
+            value = request.args.get(name, type=float)
+        if value is not None:
+            params.append((name, value))
+    zoom = zoom_arg()
+    if zoom is not None:
+        params.append(('zoom', zoom))
+    return (request.path, dataset_versions.get(db.session, table_name), tuple(params))
+
+def geo_response_cached(table_name, zoom_arg=_simplification_level_arg):
+    """
+    Cache a GeoJSON layer endpoint's successful responses, keyed on the normalized
+    query and the dataset version of `table_name`, and answer If-None-Match with 304.
+    `zoom_arg()` reduces the zoom/tolerance parameters to the value the endpoint renders,
+    so requests that produce the same body share one entry.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if _geo_stream_requested():
+                return f(*args, **kwargs)  # Streamed bodies are never held in memory
+            try:
+                key = _geo_cache_key(table_name, zoom_arg)
+            except Exception as e:
+                print(f"Geo response cache bypassed: {e}")
+                return f(*args, **kwargs)
+
+            cached = geo_response_cache.get(key)
+            if cached is None:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                cached = (body, hashlib.sha256(body).hexdigest()[:32])
+                geo_response_cache.set(key, cached, size=len(body))
+
+            body, etag = cached
+            response = Response(body, mimetype='application/json')
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = f'public, max-age={GEO_CACHE_MAX_AGE_SECONDS}, must-revalidate'
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
 @app.route('/api/geo/groundwater')
+@geo_response_cached('ground_water_level_stations')
 def api_geo_groundwater():
     """GeoJSON endpoint for Ground Water Level Stations, optionally filtered by lat/lon and radius_km."""
     try:
         from sqlalchemy import func
-        import json as _json
         from models import GroundWaterLevelStation
 
-        lat = request.args.get('lat', type=float)
-        lon = request.args.get('lon', type=float)
+        lat = _geo_coordinate_arg('lat')
+        lon = _geo_coordinate_arg('lon')
         radius_km = request.args.get('radius_km', default=200, type=float)
 
         query = db.session.query(
@@ -2057,46 +2955,45 @@ def api_geo_groundwater():
             point = func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
             query = query.filter(
                 func.ST_DWithin(
-                    GroundWaterLevelStation.geometry.cast(db.text('geography')),
-                    point.cast(db.text('geography')),
+                    as_geography(GroundWaterLevelStation.geometry),
+                    as_geography(point),
                     radius_km * 1000
                 )
             )
 
-        rows = query.limit(2000).all()
-        features = []
-        for r in rows:
-            geom_json = db.session.scalar(db.func.ST_AsGeoJSON(r.geometry))
-            if not geom_json:
-                continue
-            features.append({
-                'type': 'Feature',
-                'geometry': _json.loads(geom_json),
-                'properties': {
-                    'id': r.id,
-                    'name': r.station_na or 'Unknown',
-                    'state': r.state_name,
-                    'district': r.district_n,
-                    'agency': r.agency_nam,
-                    'basin': r.basin_name
-                }
-            })
-
-        return jsonify({'type': 'FeatureCollection', 'features': features})
+        return _feature_collection_response(query.limit(_geo_limit(2000)), [
+            ('id', 'id'),
+            ('name', lambda c: func.coalesce(c.station_na, 'Unknown')),
+            ('state', 'state_name'),
+            ('district', 'district_n'),
+            ('agency', 'agency_nam'),
+            ('basin', 'basin_name'),
+        ])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/geo/aquifers')
+@geo_response_cached('major_aquifers')
 def api_geo_aquifers():
-    """GeoJSON endpoint for Major Aquifers polygons, optionally filtered by lat/lon and radius_km."""
+    """GeoJSON endpoint for Major Aquifers polygons, optionally filtered by lat/lon and radius_km
+    or by a bbox viewport. Pass zoom (map zoom level) or tolerance (degrees) to get simplified geometry."""
     try:
         from sqlalchemy import func
-        import json as _json
-        from models import MajorAquifer
+        from models import MajorAquifer, MajorAquiferSimplified
 
-        lat = request.args.get('lat', type=float)
-        lon = request.args.get('lon', type=float)
+        lat = _geo_coordinate_arg('lat')
+        lon = _geo_coordinate_arg('lon')
         radius_km = request.args.get('radius_km', default=250, type=float)
+        try:
+            bbox = _parse_bbox_param()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Lower zooms get a precomputed simplified geometry instead of full resolution
+        tolerance = _simplification_tolerance('major_aquifers')
+        geometry = MajorAquifer.geometry
+        if tolerance is not None:
+            geometry = MajorAquiferSimplified.geometry.label('geometry')
 
         query = db.session.query(
             MajorAquifer.id,
@@ -2104,47 +3001,51 @@ def api_geo_aquifers():
             MajorAquifer.state,
             MajorAquifer.system,
             MajorAquifer.zone_m,
-            MajorAquifer.geometry
+            geometry
         )
-
-        if lat is not None and lon is not None:
-            point = func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
-            buffer = func.ST_Buffer(point.cast(db.text('geography')), radius_km * 1000)
-            query = query.filter(func.ST_Intersects(MajorAquifer.geometry.cast(db.text('geography')), buffer))
-
-        rows = query.limit(1500).all()
-        features = []
-        for r in rows:
-            geom_json = db.session.scalar(db.func.ST_AsGeoJSON(r.geometry))
-            if not geom_json:
-                continue
-            features.append({
-                'type': 'Feature',
-                'geometry': _json.loads(geom_json),
-                'properties': {
-                    'id': r.id,
-                    'name': r.aquifer or 'Unknown',
-                    'state': r.state,
-                    'system': r.system,
-                    'zone': r.zone_m
-                }
-            })
-
-        return jsonify({'type': 'FeatureCollection', 'features': features})
+        if tolerance is not None:
+            query = query.join(MajorAquiferSimplified, db.and_(
+                MajorAquiferSimplified.source_id == MajorAquifer.id,
+                MajorAquiferSimplified.tolerance == tolerance
+            ))
+
+        if bbox is not None:
+            query = query.filter(_in_viewport(MajorAquifer.geometry, bbox))
+        elif lat is not None and lon is not None:
+            query = query.filter(_within_radius(MajorAquifer.geometry, lat, lon, radius_km))
+
+        return _feature_collection_response(query.limit(_geo_limit(1500)), [
+            ('id', 'id'),
+            ('name', lambda c: func.coalesce(c.aquifer, 'Unknown')),
+            ('state', 'state'),
+            ('system', 'system'),
+            ('zone', 'zone_m'),
+        ])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/geo/aquifer-materials')
+@geo_response_cached('aquifer_materials')
 def api_geo_aquifer_materials():
-    """GeoJSON endpoint for Aquifer Materials polygons, optionally filtered by lat/lon and radius_km."""
+    """GeoJSON endpoint for Aquifer Materials polygons, optionally filtered by lat/lon and radius_km
+    or by a bbox viewport. Pass zoom (map zoom level) or tolerance (degrees) to get simplified geometry."""
     try:
         from sqlalchemy import func
-        import json as _json
-        from models import AquiferMaterial
+        from models import AquiferMaterial, AquiferMaterialSimplified
 
-        lat = request.args.get('lat', type=float)
-        lon = request.args.get('lon', type=float)
+        lat = _geo_coordinate_arg('lat')
+        lon = _geo_coordinate_arg('lon')
         radius_km = request.args.get('radius_km', default=250, type=float)
+        try:
+            bbox = _parse_bbox_param()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Lower zooms get a precomputed simplified geometry instead of full resolution
+        tolerance = _simplification_tolerance('aquifer_materials')
+        geometry = AquiferMaterial.geometry
+        if tolerance is not None:
+            geometry = AquiferMaterialSimplified.geometry.label('geometry')
 
         query = db.session.query(
             AquiferMaterial.id,
@@ -2152,46 +3053,39 @@ def api_geo_aquifer_materials():
             AquiferMaterial.Type_of_Aq,
             AquiferMaterial.st_area_sh,
             AquiferMaterial.st_length_,
-            AquiferMaterial.geometry
+            geometry
         )
-
-        if lat is not None and lon is not None:
-            point = func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
-            buffer = func.ST_Buffer(point.cast(db.text('geography')), radius_km * 1000)
-            query = query.filter(func.ST_Intersects(AquiferMaterial.geometry.cast(db.text('geography')), buffer))
-
-        rows = query.limit(1500).all()
-        features = []
-        for r in rows:
-            geom_json = db.session.scalar(db.func.ST_AsGeoJSON(r.geometry))
-            if not geom_json:
-                continue
-            features.append({
-                'type': 'Feature',
-                'geometry': _json.loads(geom_json),
-                'properties': {
-                    'id': r.id,
-                    'state': r.Name_of_St,
-                    'material_type': r.Type_of_Aq,
-                    'area': r.st_area_sh,
-                    'length': r.st_length_
-                }
-            })
-
-        return jsonify({'type': 'FeatureCollection', 'features': features})
+        if tolerance is not None:
+            query = query.join(AquiferMaterialSimplified, db.and_(
+                AquiferMaterialSimplified.source_id == AquiferMaterial.id,
+                AquiferMaterialSimplified.tolerance == tolerance
+            ))
+
+        if bbox is not None:
+            query = query.filter(_in_viewport(AquiferMaterial.geometry, bbox))
+        elif lat is not None and lon is not None:
+            query = query.filter(_within_radius(AquiferMaterial.geometry, lat, lon, radius_km))
+
+        return _feature_collection_response(query.limit(_geo_limit(1500)), [
+            ('id', 'id'),
+            ('state', 'Name_of_St'),
+            ('material_type', 'Type_of_Aq'),
+            ('area', 'st_area_sh'),
+            ('length', 'st_length_'),
+        ])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/geo/gw-quality')
+@geo_response_cached('ground_water_quality_stations')
 def api_geo_gw_quality():
     """GeoJSON endpoint for Ground Water Quality Stations, optionally filtered by lat/lon and radius_km."""
     try:
         from sqlalchemy import func
-        import json as _json
         from models import GroundWaterQualityStation
 
-        lat = request.args.get('lat', type=float)
-        lon = request.args.get('lon', type=float)
+        lat = _geo_coordinate_arg('lat')
+        lon = _geo_coordinate_arg('lon')
         radius_km = request.args.get('radius_km', default=200, type=float)
 
         query = db.session.query(
@@ -2208,34 +3102,196 @@ def api_geo_gw_quality():
             point = func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
             query = query.filter(
                 func.ST_DWithin(
-                    GroundWaterQualityStation.geometry.cast(db.text('geography')),
-                    point.cast(db.text('geography')),
+                    as_geography(GroundWaterQualityStation.geometry),
+                    as_geography(point),
                     radius_km * 1000
                 )
             )
 
-        rows = query.limit(2000).all()
-        features = []
-        for r in rows:
-            geom_json = db.session.scalar(db.func.ST_AsGeoJSON(r.geometry))
-            if not geom_json:
-                continue
-            features.append({
-                'type': 'Feature',
-                'geometry': _json.loads(geom_json),
-                'properties': {
-                    'id': r.id,
-                    'name': r.station_na or 'Unknown',
-                    'state': r.state_name,
-                    'district': r.district_n,
-                    'agency': r.agency_nam,
-                    'basin': r.basin_name
-                }
-            })
-
-        return jsonify({'type': 'FeatureCollection', 'features': features})
+        return _feature_collection_response(query.limit(_geo_limit(2000)), [
+            ('id', 'id'),
+            ('name', lambda c: func.coalesce(c.station_na, 'Unknown')),
+            ('state', 'state_name'),
+            ('district', 'district_n'),
+            ('agency', 'agency_nam'),
+            ('basin', 'basin_name'),
+        ])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+# --- Station clusters ---
+# Grid cell size in screen pixels: stations within one cell are drawn as one cluster
+STATION_CLUSTER_CELL_PX = float(os.environ.get('STATION_CLUSTER_CELL_PX', 60))
+STATION_CLUSTER_MAX_ZOOM = 22
+# Above this zoom most clusters are single stations, so a viewport bbox is required
+STATION_CLUSTER_BBOX_MIN_ZOOM = int(os.environ.get('STATION_CLUSTER_BBOX_MIN_ZOOM', 8))
+
+def _station_cluster_zoom():
+    """The request's `zoom` as the integer level the clusters are built for, or None when absent."""
+    zoom = request.args.get('zoom', type=float)
+    if zoom is None:
+        return None
+    return int(min(max(zoom, 0), STATION_CLUSTER_MAX_ZOOM))
+
+def _station_cluster_cell_degrees(zoom):
+    """Grid cell size in degrees for an integer zoom level."""
+    return 360.0 / (256 * 2 ** zoom) * STATION_CLUSTER_CELL_PX
+
+def _station_clusters_response(model):
+    """
+    Grid-clustered stations for a map zoom as a GeoJSON FeatureCollection of points.
+
+    Stations are grouped with ST_SnapToGrid on a grid of STATION_CLUSTER_CELL_PX screen
+    pixels at the requested zoom. Each feature sits at the centroid of its stations and
+    carries their count (plus the station id for single-station clusters). The grid is
+    anchored at 0,0, so a cluster looks the same in every viewport and caches well.
+    Query parameters: zoom (required), bbox (required above STATION_CLUSTER_BBOX_MIN_ZOOM)
+    and limit; when clusters are cut off by the limit the largest ones are kept.
+    """
+    zoom = _station_cluster_zoom()
+    if zoom is None:
+        return jsonify({'error': 'zoom is required'}), 400
+    try:
+        bbox = _parse_bbox_param()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if bbox is None and zoom > STATION_CLUSTER_BBOX_MIN_ZOOM:
+        return jsonify({'error': f'bbox is required above zoom {STATION_CLUSTER_BBOX_MIN_ZOOM}'}), 400
+
+    point_count = func.count(model.id)
+    query = db.session.query(
+        point_count.label('point_count'),
+        func.min(model.id).label('id'),
+        func.ST_Centroid(func.ST_Collect(model.geometry)).label('geometry')
+    )
+    if bbox is not None:
+        query = query.filter(_envelope_overlaps(model.geometry, *bbox))
+    query = query.group_by(func.ST_SnapToGrid(model.geometry, _station_cluster_cell_degrees(zoom)))
+
+    return _feature_collection_response(query.order_by(point_count.desc()).limit(_geo_limit(5000)), [
+        ('count', 'point_count'),
+        ('id', lambda c: db.case((c.point_count == 1, c.id), else_=None)),
+    ])
+
+@app.route('/api/geo/groundwater/clusters')
+@geo_response_cached('ground_water_level_stations', zoom_arg=_station_cluster_zoom)
+def api_geo_groundwater_clusters():
+    """Clustered Ground Water Level Stations for a map zoom (see _station_clusters_response)."""
+    try:
+        from models import GroundWaterLevelStation
+        return _station_clusters_response(GroundWaterLevelStation)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/geo/gw-quality/clusters')
+@geo_response_cached('ground_water_quality_stations', zoom_arg=_station_cluster_zoom)
+def api_geo_gw_quality_clusters():
+    """Clustered Ground Water Quality Stations for a map zoom (see _station_clusters_response)."""
+    try:
+        from models import GroundWaterQualityStation
+        return _station_clusters_response(GroundWaterQualityStation)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# --- Vector tiles ---
+# Layer name -> source table, geometry kind and properties carried in the tile
+TILE_LAYERS = {
+    'aquifers': {'table': 'major_aquifers', 'polygons': True,
+                 'properties': ['aquifer', 'state', 'system', 'zone_m']},
+    'aquifer-materials': {'table': 'aquifer_materials', 'polygons': True,
+                          'properties': ['Name_of_St', 'Type_of_Aq']},
+    'groundwater': {'table': 'ground_water_level_stations', 'polygons': False,
+                    'properties': ['station_na', 'state_name', 'district_n', 'agency_nam', 'basin_name']},
+    'gw-quality': {'table': 'ground_water_quality_stations', 'polygons': False,
+                   'properties': ['station_na', 'state_name', 'district_n', 'agency_nam', 'basin_name']},
+}
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+TILE_MAX_ZOOM = 22
+# Simplify polygons to this many tile pixels before clipping
+TILE_SIMPLIFY_PIXELS = float(os.environ.get('TILE_SIMPLIFY_PIXELS', 1.0))
+TILE_CACHE_MAX_BYTES = int(os.environ.get('TILE_CACHE_MAX_MB', 64)) * 1024 * 1024
+TILE_CACHE_MAX_AGE_SECONDS = int(os.environ.get('TILE_CACHE_MAX_AGE_SECONDS', 3600))
+
+tile_cache = MemoryLRUCache(max_entries=20000, max_bytes=TILE_CACHE_MAX_BYTES)
+
+def _render_tile(layer, z, x, y):
+    """Render one Mapbox Vector Tile for a layer with ST_AsMVT, clipped to the tile and simplified for the zoom."""
+    config = TILE_LAYERS[layer]
+    columns = ', '.join(f't."{column}"' for column in config['properties'])
+    geometry = 't.geometry'
+    if config['polygons']:
+        geometry = 'ST_SimplifyPreserveTopology(t.geometry, :tolerance)'
+    sql = db.text(f"""
+        WITH bounds AS (
+            SELECT ST_TileEnvelope(:z, :x, :y) AS merc, ST_Transform(ST_TileEnvelope(:z, :x, :y), 4326) AS wgs84
+        ),
+        mvtgeom AS (
+            SELECT ST_AsMVTGeom(ST_Transform({geometry}, 3857), bounds.merc, {TILE_EXTENT}, {TILE_BUFFER}, true) AS geom,
+                   t.id, {columns}
+            FROM {config['table']} t, bounds
+            WHERE t.geometry && bounds.wgs84
+        )
+        SELECT ST_AsMVT(mvtgeom, :layer, {TILE_EXTENT}, 'geom') FROM mvtgeom WHERE geom IS NOT NULL
+    """)
+    # One tile pixel in degrees at this zoom (at the equator), so sub-pixel detail is dropped
+    tolerance = 360.0 / ((2 ** z) * TILE_EXTENT) * TILE_SIMPLIFY_PIXELS
+    tile = db.session.scalar(sql, {'z': z, 'x': x, 'y': y, 'layer': layer, 'tolerance': tolerance})
+    return bytes(tile) if tile is not None else b''
+
+@app.route('/tiles/<layer>/<int:z>/<int:x>/<int:y>.mvt')
+def vector_tile(layer, z, x, y):
+    """
+    Mapbox Vector Tile for one map layer, cached in memory per dataset version.
+
+    Tiles carry a strong ETag. Requested with ?v=<current layer version> (see /tiles/metadata)
+    the URL changes whenever the layer is reloaded, so the tile is cacheable for
+    TILE_CACHE_MAX_AGE_SECONDS; without it, clients must revalidate on every use.
+    """
+    if layer not in TILE_LAYERS:
+        return jsonify({'error': f'Unknown layer: {layer}'}), 404
+    if z > TILE_MAX_ZOOM or x >= 2 ** z or y >= 2 ** z:
+        return jsonify({'error': 'Tile coordinates out of range'}), 400
+
+    try:
+        version = dataset_versions.get(db.session, TILE_LAYERS[layer]['table'])
+        cache_key = (layer, version, z, x, y)
+        cached = tile_cache.get(cache_key)
+        if cached is None:
+            tile = _render_tile(layer, z, x, y)
+            cached = (tile, hashlib.sha256(tile).hexdigest()[:32])
+            tile_cache.set(cache_key, cached, size=len(tile))
+    except Exception as e:
+        print(f"Error rendering tile {layer}/{z}/{x}/{y}: {e}")
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+    tile, etag = cached
+    response = Response(tile, mimetype='application/vnd.mapbox-vector-tile')
+    response.set_etag(etag)
+    if request.args.get('v') == str(version):
+        response.headers['Cache-Control'] = f'public, max-age={TILE_CACHE_MAX_AGE_SECONDS}, immutable'
+    else:
+        response.headers['Cache-Control'] = 'public, no-cache'
+    return response.make_conditional(request)
+
+@app.route('/tiles/metadata')
+def vector_tile_metadata():
+    """Current version and versioned tile URL template of every tile layer."""
+    try:
+        layers = {}
+        for layer, config in TILE_LAYERS.items():
+            version = dataset_versions.get(db.session, config['table'])
+            layers[layer] = {
+                'version': version,
+                'tiles': f"/tiles/{layer}/{{z}}/{{x}}/{{y}}.mvt?v={version}",
+            }
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    response = jsonify({'layers': layers})
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/api/recommend-category', methods=['POST'])
 def api_recommend_category():
     """Enhanced API endpoint for category recommendations with scoring and alternatives."""
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: scalar haversine in a Python loop vs the vectorized NumPy version.
+
+Usage: python bench_geo_distance.py [points] [repeats]
+"""
+
+import sys
+import random
+import timeit
+
+import numpy as np
+
+from geo_distance import haversine, haversine_one_to_many, haversine_many_to_many
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    rng = random.Random(0)
+    lats = [rng.uniform(8, 35) for _ in range(n)]
+    lons = [rng.uniform(68, 97) for _ in range(n)]
+    lat_arr, lon_arr = np.array(lats), np.array(lons)
+
+    def scalar():
+        return min(haversine(17.4, 78.5, la, lo) for la, lo in zip(lats, lons))
+
+    def vectorized():
+        return haversine_one_to_many(17.4, 78.5, lat_arr, lon_arr).min()
+
+    scalar_time = min(timeit.repeat(scalar, number=1, repeat=repeats))
+    vector_time = min(timeit.repeat(vectorized, number=1, repeat=repeats))
+    print(f"one-to-many, {n} points")
+    print(f"  scalar loop : {scalar_time * 1000:8.2f} ms")
+    print(f"  vectorized  : {vector_time * 1000:8.2f} ms  ({scalar_time / vector_time:.0f}x)")
+
+    m = min(n, 1000)
+    sources = list(zip(lats[:100], lons[:100]))
+
+    def scalar_matrix():
+        return [[haversine(a, b, la, lo) for la, lo in zip(lats[:m], lons[:m])] for a, b in sources]
+
+    def vectorized_matrix():
+        return haversine_many_to_many(lat_arr[:100], lon_arr[:100], lat_arr[:m], lon_arr[:m])
+
+    scalar_time = min(timeit.repeat(scalar_matrix, number=1, repeat=repeats))
+    vector_time = min(timeit.repeat(vectorized_matrix, number=1, repeat=repeats))
+    print(f"many-to-many, 100 x {m}")
+    print(f"  scalar loop : {scalar_time * 1000:8.2f} ms")
+    print(f"  vectorized  : {vector_time * 1000:8.2f} ms  ({scalar_time / vector_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Circuit breaker for upstream data providers.
+
+When a provider is degraded, waiting out the full timeout on every request ties
+up all gunicorn workers. A breaker tracks the outcome of the most recent calls
+and, once the failure rate crosses a threshold, opens: calls are rejected
+immediately with CircuitOpenError so callers go straight to their fallbacks.
+After a cool-down the breaker lets a trial call through (half-open) and closes
+again if it succeeds.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+
+CIRCUIT_WINDOW_SIZE = int(os.environ.get('CIRCUIT_WINDOW_SIZE', 20))
+CIRCUIT_MIN_CALLS = int(os.environ.get('CIRCUIT_MIN_CALLS', 5))
+CIRCUIT_FAILURE_RATE = float(os.environ.get('CIRCUIT_FAILURE_RATE', 0.5))
+CIRCUIT_COOLDOWN_SECONDS = float(os.environ.get('CIRCUIT_COOLDOWN_SECONDS', 30))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker over a sliding window of recent calls."""
+
+    def __init__(self, name, window_size=None, min_calls=None, failure_rate=None,
+                 cooldown_seconds=None, clock=time.monotonic):
+        self.name = name
+        self.window_size = window_size or CIRCUIT_WINDOW_SIZE
+        self.min_calls = min_calls or CIRCUIT_MIN_CALLS
+        self.failure_rate_threshold = failure_rate or CIRCUIT_FAILURE_RATE
+        self.cooldown_seconds = CIRCUIT_COOLDOWN_SECONDS if cooldown_seconds is None else cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._window = deque(maxlen=self.window_size)  # True for a failed call
+        self._state = CLOSED
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._times_opened = 0
+        self._short_circuited = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def allow_request(self):
+        """Return True if a call may go to the provider now."""
+        with self._lock:
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.cooldown_seconds:
+                    self._short_circuited += 1
+                    return False
+                self._state = HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == HALF_OPEN:
+                # Only one trial call at a time while the provider is being probed
+                if self._trial_in_flight:
+                    self._short_circuited += 1
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._close()
+            else:
+                self._window.append(False)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._open()
+                return
+            self._window.append(True)
+            if self._state == CLOSED and len(self._window) >= self.min_calls \
+                    and self._failure_rate() >= self.failure_rate_threshold:
+                self._open()
+
+    def _failure_rate(self):
+        return sum(self._window) / len(self._window) if self._window else 0.0
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._trial_in_flight = False
+        self._times_opened += 1
+
+    def _close(self):
+        self._state = CLOSED
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._window.clear()
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self._state == OPEN:
+                retry_in = max(0.0, self.cooldown_seconds - (self._clock() - self._opened_at))
+            return {
+                'state': self._state,
+                'failure_rate': round(self._failure_rate(), 3),
+                'window_calls': len(self._window),
+                'times_opened': self._times_opened,
+                'short_circuited': self._short_circuited,
+                'retry_in_seconds': round(retry_in, 1) if retry_in is not None else None,
+            }
@@ -0,0 +1,62 @@
+"""
+Version counters for the spatial tables loaded by the loader scripts.
+
+Every loader bumps the version of a table after (re)loading it. The app reads
+the versions (re-checking at most every DATASET_VERSION_CHECK_SECONDS) and puts
+them into the keys of anything cached from those tables, such as map tiles, so
+a reload invalidates the caches of every worker without an explicit purge.
+"""
+
+import os
+import time
+import threading
+
+from sqlalchemy import text
+
+DATASET_VERSION_CHECK_SECONDS = float(os.environ.get('DATASET_VERSION_CHECK_SECONDS', 30))
+
+DATASET_VERSIONS_DDL = (
+    "CREATE TABLE IF NOT EXISTS dataset_versions ("
+    "table_name VARCHAR(128) PRIMARY KEY, "
+    "version INTEGER NOT NULL DEFAULT 1, "
+    "updated_at TIMESTAMP NOT NULL DEFAULT now())"
+)
+
+
+def bump_dataset_version(conn, table_name):
+    """Increment the version of `table_name`. Call from loaders after a table is (re)loaded."""
+    conn.execute(text(DATASET_VERSIONS_DDL))
+    conn.execute(text(
+        "INSERT INTO dataset_versions (table_name, version, updated_at) VALUES (:table_name, 1, now()) "
+        "ON CONFLICT (table_name) DO UPDATE SET version = dataset_versions.version + 1, updated_at = now()"
+    ), {'table_name': table_name})
+
+
+class DatasetVersions:
+    """Per-process view of dataset_versions, refreshed at most every `check_seconds`."""
+
+    def __init__(self, check_seconds=None, clock=time.monotonic):
+        self.check_seconds = DATASET_VERSION_CHECK_SECONDS if check_seconds is None else check_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._checked_at = None
+
+    def get(self, session, table_name):
+        """Current version of `table_name` (0 if never bumped). `session` is a Session or Connection."""
+        with self._lock:
+            if self._checked_at is None or self._clock() - self._checked_at > self.check_seconds:
+                try:
+                    # A savepoint, so a failed read leaves the caller's transaction (and anything
+                    # it set, such as a transaction-local statement_timeout) intact
+                    with session.begin_nested():
+                        rows = session.execute(text("SELECT table_name, version FROM dataset_versions")).all()
+                    self._versions = {name: version for name, version in rows}
+                except Exception as e:
+                    print(f"Could not read dataset versions: {e}")
+                self._checked_at = self._clock()
+            return self._versions.get(table_name, 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._versions)
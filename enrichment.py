@@ -0,0 +1,239 @@
+"""
+Concurrent enrichment stage used by get_api_data.
+
+The external API calls and the PostGIS lookups for a location do not depend on
+each other, so they are submitted to one shared, bounded thread pool and
+collected under a single overall deadline. A task that raises or misses the
+deadline is replaced by its fallback value, so one slow provider cannot hold
+up the rest of the result.
+
+Location enrichment can also be started speculatively, as soon as a user picks
+a location, on a small separate pool (PrefetchRegistry). The results page then
+picks up the finished or in-flight result instead of starting from scratch.
+Concurrent lookups of the same location are coalesced by SingleFlight, so only
+one of them does the work. Stale cache entries are refreshed off the request
+path by BackgroundRefresher.
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+# Bounded so a burst of cold lookups cannot spawn unlimited threads per worker
+ENRICHMENT_MAX_WORKERS = int(os.environ.get('ENRICHMENT_MAX_WORKERS', 8))
+# Overall budget for one location, slightly above a single upstream timeout
+ENRICHMENT_DEADLINE_SECONDS = float(os.environ.get('ENRICHMENT_DEADLINE_SECONDS', 12))
+
+# Speculative prefetches run on their own small pool so they never starve request-time enrichment
+PREFETCH_MAX_WORKERS = int(os.environ.get('PREFETCH_MAX_WORKERS', 2))
+# How long an unclaimed prefetch result is kept for the results page
+PREFETCH_RESULT_TTL_SECONDS = float(os.environ.get('PREFETCH_RESULT_TTL_SECONDS', 600))
+# Prefetches tracked at once (queued, running or unclaimed); further submits are skipped
+PREFETCH_MAX_PENDING = int(os.environ.get('PREFETCH_MAX_PENDING', 64))
+# Background revalidation of stale cache entries
+REFRESH_MAX_WORKERS = int(os.environ.get('REFRESH_MAX_WORKERS', 2))
+
+_executor = ThreadPoolExecutor(max_workers=ENRICHMENT_MAX_WORKERS, thread_name_prefix='enrichment')
+
+# Absolute (time.monotonic) deadline of the enrichment task running on this thread
+_task_context = threading.local()
+
+
+def task_deadline():
+    """Deadline of the enrichment task running on the current thread, or None outside one."""
+    return getattr(_task_context, 'deadline', None)
+
+
+def _run_with_deadline(func, deadline_at):
+    _task_context.deadline = deadline_at
+    try:
+        return func()
+    finally:
+        _task_context.deadline = None
+
+
+def run_enrichment_tasks(tasks, deadline=None):
+    """
+    Run independent enrichment tasks in parallel and return their results by name.
+
+    `tasks` maps a name to a `(func, fallback)` pair of zero-argument callables.
+    `fallback` is called for any task that raises or is still running when the
+    deadline expires. Tasks that overrun keep running in the background, but
+    their result is discarded; upstream HTTP calls made from a task are bounded
+    by the same deadline (see task_deadline), so an overrun is short.
+    """
+    deadline = ENRICHMENT_DEADLINE_SECONDS if deadline is None else deadline
+    # Tasks see the deadline through task_deadline(), so upstream calls can stop in time
+    deadline_at = time.monotonic() + deadline
+    futures = {name: _executor.submit(_run_with_deadline, func, deadline_at) for name, (func, _) in tasks.items()}
+    wait(futures.values(), timeout=deadline)
+
+    results = {}
+    for name, future in futures.items():
+        fallback = tasks[name][1]
+        if not future.done():
+            future.cancel()
+            print(f"Enrichment task '{name}' exceeded {deadline}s deadline - using fallback")
+            results[name] = fallback()
+            continue
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            print(f"Enrichment task '{name}' failed: {e} - using fallback")
+            results[name] = fallback()
+    return results
+
+
+class PrefetchRegistry:
+    """
+    Background computations keyed by a cache key, claimed later by the request that needs them.
+
+    submit() starts `func` unless a live prefetch for the key already exists;
+    claim() hands the future (finished or still running) to the caller once.
+    At most `max_pending` entries are tracked, so a burst of distinct keys cannot
+    queue unbounded work; submits beyond that are skipped. Unclaimed entries are
+    dropped after `ttl` seconds, cancelling their task if it has not started yet,
+    and a task that only gets a worker after its TTL does not run.
+    """
+
+    def __init__(self, max_workers=None, ttl=None, max_pending=None, clock=time.monotonic):
+        self.ttl = PREFETCH_RESULT_TTL_SECONDS if ttl is None else ttl
+        self.max_pending = PREFETCH_MAX_PENDING if max_pending is None else max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or PREFETCH_MAX_WORKERS,
+                                            thread_name_prefix='prefetch')
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (future, started_at)
+        self._counts = {'started': 0, 'deduplicated': 0, 'rejected': 0, 'claimed_done': 0,
+                        'claimed_in_flight': 0, 'expired': 0, 'cancelled': 0}
+
+    def _purge(self):
+        now = self._clock()
+        for key in [k for k, (_, started_at) in self._entries.items() if now - started_at > self.ttl]:
+            future, _ = self._entries.pop(key)
+            self._counts['expired'] += 1
+            if future.cancel():
+                self._counts['cancelled'] += 1
+
+    def _run_unless_expired(self, func, submitted_at):
+        if self._clock() - submitted_at > self.ttl:
+            raise TimeoutError('prefetch expired before a worker picked it up')
+        return func()
+
+    def submit(self, key, func):
+        """Start `func` for `key`; returns its future, or None if too many prefetches are pending."""
+        with self._lock:
+            self._purge()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._counts['deduplicated'] += 1
+                return entry[0]
+            if len(self._entries) >= self.max_pending:
+                self._counts['rejected'] += 1
+                return None
+            now = self._clock()
+            future = self._executor.submit(self._run_unless_expired, func, now)
+            self._entries[key] = (future, now)
+            self._counts['started'] += 1
+            return future
+
+    def claim(self, key):
+        """Remove and return the prefetch future for `key`, or None if there is none."""
+        with self._lock:
+            self._purge()
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._counts['claimed_done' if entry[0].done() else 'claimed_in_flight'] += 1
+            return entry[0]
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts, pending=len(self._entries))
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution.
+
+    The first caller for a key (the leader) runs `func`; callers arriving while
+    it runs wait for and share its result or exception. Nothing is cached once
+    the call has finished.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future of the in-flight call
+        self._counts = {'leaders': 0, 'coalesced': 0}
+
+    def do(self, key, func):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self._counts['leaders'] += 1
+            else:
+                self._counts['coalesced'] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts, in_flight=len(self._calls))
+
+
+class BackgroundRefresher:
+    """
+    Runs at most one background refresh per key at a time.
+
+    submit() queues `func` unless a refresh for the key is already queued or
+    running, so a burst of requests for a stale entry triggers one refresh.
+    """
+
+    def __init__(self, max_workers=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or REFRESH_MAX_WORKERS,
+                                            thread_name_prefix='refresh')
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._counts = {'scheduled': 0, 'skipped': 0, 'completed': 0, 'failed': 0}
+
+    def submit(self, key, func):
+        """Queue a refresh for `key`; returns False if one is already pending."""
+        with self._lock:
+            if key in self._pending:
+                self._counts['skipped'] += 1
+                return False
+            self._pending.add(key)
+            self._counts['scheduled'] += 1
+        self._executor.submit(self._run, key, func)
+        return True
+
+    def _run(self, key, func):
+        try:
+            func()
+            outcome = 'completed'
+        except Exception as e:
+            print(f"Background refresh for '{key}' failed: {e}")
+            outcome = 'failed'
+        with self._lock:
+            self._pending.discard(key)
+            self._counts[outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts, pending=len(self._pending))
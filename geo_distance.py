@@ -0,0 +1,107 @@
+"""
+Vectorized great-circle distance and bearing over NumPy arrays.
+
+The scalar haversine is fine for a single pair of points, but ranking or
+filtering many candidates with it means a Python loop per point. These
+helpers compute one-to-many and many-to-many distances (km) and initial
+bearings (degrees clockwise from north) in one array operation. bounding_box
+gives a cheap lat/lon prefilter for a search radius.
+"""
+
+from math import radians, sin, cos, sqrt, asin
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Calculate the distance between two points on Earth using the Haversine formula."""
+    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+    c = 2 * asin(sqrt(a))
+    r = 6371  # Radius of Earth in kilometers
+    return c * r
+
+
+def _radians(*arrays):
+    return [np.radians(np.asarray(a, dtype='float64')) for a in arrays]
+
+
+def haversine_one_to_many(lat, lon, lats, lons):
+    """Distances (km) from one point to each of `lats`/`lons`; returns an array shaped like them."""
+    lat, lon, lats, lons = _radians(lat, lon, lats, lons)
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_many_to_many(lats1, lons1, lats2, lons2):
+    """Distance matrix (km) of shape (len(lats1), len(lats2))."""
+    lats1, lons1, lats2, lons2 = _radians(lats1, lons1, lats2, lons2)
+    lat1, lon1 = lats1[:, None], lons1[:, None]
+    a = np.sin((lats2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lats2) * np.sin((lons2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _bearing(lat1, lon1, lat2, lon2):
+    dlon = lon2 - lon1
+    x = np.sin(dlon) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return np.degrees(np.arctan2(x, y)) % 360
+
+
+def bearing_one_to_many(lat, lon, lats, lons):
+    """Initial bearings (degrees, 0 = north) from one point to each of `lats`/`lons`."""
+    lat, lon, lats, lons = _radians(lat, lon, lats, lons)
+    return _bearing(lat, lon, lats, lons)
+
+
+def bearing_many_to_many(lats1, lons1, lats2, lons2):
+    """Initial bearing matrix (degrees) of shape (len(lats1), len(lats2))."""
+    lats1, lons1, lats2, lons2 = _radians(lats1, lons1, lats2, lons2)
+    return _bearing(lats1[:, None], lons1[:, None], lats2, lons2)
+
+
+def bounding_box(lat, lon, radius_km):
+    """
+    (min_lat, min_lon, max_lat, max_lon) enclosing every point within radius_km of (lat, lon).
+    Near the poles the longitude range widens to the full [-180, 180].
+    """
+    dlat = float(np.degrees(radius_km / EARTH_RADIUS_KM))
+    min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return min_lat, -180.0, max_lat, 180.0
+    # Widest longitude span of the circle (at its tangent latitude, not at the centre)
+    dlon = float(np.degrees(np.arcsin(min(np.sin(radius_km / EARTH_RADIUS_KM) / np.cos(np.radians(lat)), 1.0))))
+    return min_lat, lon - dlon, max_lat, lon + dlon
+
+
+def within_bounding_box(lats, lons, bbox):
+    """Boolean mask of points inside bbox, handling boxes that cross the antimeridian."""
+    lats, lons = np.asarray(lats, dtype='float64'), np.asarray(lons, dtype='float64')
+    min_lat, min_lon, max_lat, max_lon = bbox
+    mask = (lats >= min_lat) & (lats <= max_lat)
+    if min_lon < -180.0:
+        return mask & ((lons >= min_lon + 360.0) | (lons <= max_lon))
+    if max_lon > 180.0:
+        return mask & ((lons >= min_lon) | (lons <= max_lon - 360.0))
+    return mask & (lons >= min_lon) & (lons <= max_lon)
+
+
+def nearest_within(lat, lon, lats, lons, k=1, max_km=None):
+    """
+    Indices and distances (km) of the k points nearest to (lat, lon), closest first.
+    With max_km, points outside the radius are excluded (bbox prefilter, then exact distance).
+    """
+    lats, lons = np.asarray(lats, dtype='float64'), np.asarray(lons, dtype='float64')
+    candidates = np.arange(len(lats))
+    if max_km is not None:
+        candidates = candidates[within_bounding_box(lats, lons, bounding_box(lat, lon, max_km))]
+    distances = haversine_one_to_many(lat, lon, lats[candidates], lons[candidates])
+    if max_km is not None:
+        keep = distances <= max_km
+        candidates, distances = candidates[keep], distances[keep]
+    order = np.argsort(distances, kind='stable')[:k]
+    return candidates[order], distances[order]
@@ -0,0 +1,31 @@
+"""
+Geography expression indexes for the point station tables.
+
+Radius filters on the stations use ST_DWithin on geography so the radius is in
+metres. A plain GIST index on the geometry column cannot serve a predicate on
+`geometry::geography`, so each station table gets a GIST index on exactly that
+expression. Queries must cast with as_geography(), which renders the same bare
+`::geography` cast (no typmod) so the planner can match the index.
+"""
+
+from geoalchemy2 import Geography
+from sqlalchemy import cast
+
+GEOGRAPHY_INDEXED_TABLES = ('ground_water_level_stations', 'ground_water_quality_stations')
+
+# Renders as CAST(... AS geography), the same expression the indexes are built on
+GEOGRAPHY = Geography(geometry_type=None)
+
+
+def geography_index_name(table_name, geom_col='geometry'):
+    return f"idx_{table_name}_{geom_col}_geog"
+
+
+def geography_index_ddl(table_name, geom_col='geometry'):
+    return (f"CREATE INDEX IF NOT EXISTS {geography_index_name(table_name, geom_col)} "
+            f"ON {table_name} USING GIST ((CAST({geom_col} AS geography)))")
+
+
+def as_geography(expr):
+    """Cast a geometry expression to geography in the index-matching form."""
+    return cast(expr, GEOGRAPHY)
@@ -0,0 +1,50 @@
+"""
+Multi-resolution simplified copies of the polygon map layers.
+
+For each polygon table the loaders build `<table>_simplified`, holding one
+topology-preserving simplification (ST_SimplifyPreserveTopology) of every
+feature per tolerance in SIMPLIFICATION_TOLERANCES, keyed by (source_id,
+tolerance). The GeoJSON endpoints pick a level from the map zoom or an explicit
+tolerance, so country- and state-level views send far fewer vertices.
+"""
+
+from sqlalchemy import text
+
+# Tolerances in degrees: ~100 m, ~500 m, ~2 km, ~5.5 km at the equator
+SIMPLIFICATION_TOLERANCES = (0.001, 0.005, 0.02, 0.05)
+
+# Polygon tables that get simplified copies
+SIMPLIFIED_TABLES = ('major_aquifers', 'aquifer_materials')
+
+# Web map tiles are 256 px wide; one pixel spans 360 / (256 * 2^zoom) degrees
+TILE_SIZE_PX = 256
+
+
+def simplified_table_name(table_name):
+    return f"{table_name}_simplified"
+
+
+def build_simplified_tables(conn, table_name, geom_col='geometry'):
+    """(Re)build the simplified copy of `table_name` at every tolerance level."""
+    target = simplified_table_name(table_name)
+    selects = ' UNION ALL '.join(
+        f"SELECT id AS source_id, CAST({tolerance} AS DOUBLE PRECISION) AS tolerance, "
+        f"ST_Multi(ST_SimplifyPreserveTopology({geom_col}, {tolerance})) AS geometry FROM {table_name}"
+        for tolerance in SIMPLIFICATION_TOLERANCES
+    )
+    conn.execute(text(f"DROP TABLE IF EXISTS {target}"))
+    conn.execute(text(f"CREATE TABLE {target} AS {selects}"))
+    conn.execute(text(f"ALTER TABLE {target} ADD PRIMARY KEY (source_id, tolerance)"))
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS idx_{target}_geometry ON {target} USING GIST (geometry)"))
+
+
+def tolerance_for_zoom(zoom):
+    """Coarsest stored tolerance that stays below one screen pixel at `zoom`, or None for full detail."""
+    pixel_deg = 360.0 / (TILE_SIZE_PX * 2 ** zoom)
+    return select_tolerance(pixel_deg)
+
+
+def select_tolerance(max_tolerance):
+    """Coarsest stored tolerance not exceeding `max_tolerance`, or None if every level is coarser."""
+    levels = [tolerance for tolerance in SIMPLIFICATION_TOLERANCES if tolerance <= max_tolerance]
+    return max(levels) if levels else None
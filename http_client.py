@@ -0,0 +1,199 @@
+"""
+Shared HTTP client for upstream data providers (OpenWeatherMap, SoilGrids).
+
+Each upstream host gets one long-lived requests.Session with a keep-alive
+connection pool sized to the enrichment worker count, so repeated lookups reuse
+TCP+TLS connections instead of opening a new one per call. Transient failures
+are retried a bounded number of times with jittered exponential backoff, and
+connect and read timeouts are set separately. Each host also has a circuit
+breaker, so a degraded provider is skipped instead of waited on. Per-host
+request, error, retry and latency counters and breaker states are kept for the
+admin metrics endpoint.
+
+Calls made from an enrichment task are bounded by the task's deadline instead:
+each attempt's timeouts are capped at the time remaining, read timeouts are not
+retried, and no retry or backoff is started that cannot finish in time. That
+way an overrunning task releases its shared worker about when the deadline
+passes.
+"""
+
+import os
+import time
+import random
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from enrichment import ENRICHMENT_MAX_WORKERS, task_deadline
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+# One pooled connection per enrichment thread that may call the same host at once
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', ENRICHMENT_MAX_WORKERS))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 8))
+HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 2))
+HTTP_BACKOFF_FACTOR = float(os.environ.get('HTTP_BACKOFF_FACTOR', 0.3))
+HTTP_BACKOFF_JITTER = float(os.environ.get('HTTP_BACKOFF_JITTER', 0.3))
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def _build_retry():
+    return Retry(
+        total=HTTP_MAX_RETRIES,
+        connect=HTTP_MAX_RETRIES,
+        read=1,  # A read timeout already cost HTTP_READ_TIMEOUT; retry it at most once
+        status=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        backoff_jitter=HTTP_BACKOFF_JITTER,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True,
+        raise_on_status=False  # Hand the last response back so callers can raise_for_status()
+    )
+
+
+class HostStats:
+    """Request, error, retry and latency counters for one upstream host."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'avg_latency_ms': round(self.total_latency / self.requests * 1000, 1) if self.requests else None,
+            'max_latency_ms': round(self.max_latency * 1000, 1),
+        }
+
+
+class UpstreamHTTPClient:
+    """Pooled, retrying GET client with one session and circuit breaker per upstream host."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._stats = {}
+        self._breakers = {}
+
+    @staticmethod
+    def _new_session(max_retries):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            max_retries=max_retries
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _session_for(self, host):
+        """(retrying session, single-attempt session for deadline-bound calls, breaker) for a host."""
+        with self._lock:
+            sessions = self._sessions.get(host)
+            if sessions is None:
+                sessions = self._sessions[host] = (self._new_session(_build_retry()), self._new_session(0))
+                self._stats[host] = HostStats()
+                self._breakers[host] = CircuitBreaker(host)
+            return sessions[0], sessions[1], self._breakers[host]
+
+    def _record(self, host, elapsed, error, retries=0):
+        with self._lock:
+            stats = self._stats[host]
+            stats.requests += 1
+            stats.retries += retries
+            stats.total_latency += elapsed
+            stats.max_latency = max(stats.max_latency, elapsed)
+            if error:
+                stats.errors += 1
+
+    def get(self, url, params=None, timeout=None, deadline=None):
+        """GET a URL through the pooled session for its host.
+
+        `timeout` defaults to (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT). `deadline` is an
+        absolute time.monotonic() value; it defaults to the enclosing enrichment task's
+        deadline, and when set bounds the whole call including retries. Raises the
+        usual requests exceptions once retries are exhausted, or CircuitOpenError
+        without calling the host while its circuit is open.
+        """
+        host = urlsplit(url).netloc
+        session, single_attempt_session, breaker = self._session_for(host)
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for {host} - skipping upstream call")
+        timeout = timeout or (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+        deadline = task_deadline() if deadline is None else deadline
+
+        start = time.monotonic()
+        try:
+            if deadline is None:
+                response = session.get(url, params=params, timeout=timeout)
+                retry_state = getattr(response.raw, 'retries', None)
+                retries = len(retry_state.history) if retry_state is not None else 0
+            else:
+                response, retries = self._get_before_deadline(
+                    single_attempt_session, host, url, params, timeout, deadline)
+        except Exception:
+            self._record(host, time.monotonic() - start, error=True)
+            breaker.record_failure()
+            raise
+
+        self._record(host, time.monotonic() - start, error=response.status_code >= 400, retries=retries)
+        # Client errors (bad key, bad params) say nothing about provider health
+        if response.status_code in RETRY_STATUS_CODES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def _get_before_deadline(self, session, host, url, params, timeout, deadline):
+        """
+        Attempts with timeouts capped at the time left before `deadline`; connection errors
+        and retryable statuses are retried while a backoff still fits, read timeouts are not.
+        Returns (response, retries).
+        """
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        retries = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise requests.Timeout(f"Deadline reached before calling {host}")
+            error = response = None
+            try:
+                response = session.get(url, params=params,
+                                       timeout=(min(connect_timeout, remaining), min(read_timeout, remaining)))
+            except requests.ConnectionError as e:
+                error = e  # Includes connect timeouts; a read timeout propagates without a retry
+            if error is None and response.status_code not in RETRY_STATUS_CODES:
+                return response, retries
+
+            backoff = HTTP_BACKOFF_FACTOR * 2 ** retries + random.uniform(0, HTTP_BACKOFF_JITTER)
+            if retries >= HTTP_MAX_RETRIES or time.monotonic() + backoff >= deadline:
+                if error is not None:
+                    raise error
+                return response, retries
+            if response is not None:
+                response.close()
+            retries += 1
+            time.sleep(backoff)
+
+    def stats_snapshot(self):
+        with self._lock:
+            return {host: stats.as_dict() for host, stats in self._stats.items()}
+
+    def breaker_snapshot(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: breaker.snapshot() for host, breaker in breakers.items()}
+
+
+http_client = UpstreamHTTPClient()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Script to build the offline rainfall climatology grid used by the app.
+
+Reads a CSV of gridded rainfall normals (e.g. the IMD 0.25 degree gridded
+normals exported to CSV) with one row per grid point:
+
+    lat, lon, jan, feb, mar, apr, may, jun, jul, aug, sep, oct, nov, dec[, annual]
+
+and writes data/Rainfall Climatology/rainfall_normals.npy + rainfall_normals.json.
+If no annual column is present the annual normal is the sum of the months.
+
+Usage: python load_rainfall_climatology.py path/to/normals.csv [cell_deg]
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from rainfall_climatology import RAINFALL_CLIMATOLOGY_DIR, write_climatology
+
+MONTH_COLUMNS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+
+def build_grid(df, cell_deg=None):
+    """Place the CSV rows on a regular grid. Returns (grid, lat_min, lon_min, cell_deg)."""
+    df = df.rename(columns=str.lower)
+    missing = [col for col in ['lat', 'lon'] + MONTH_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    if cell_deg is None:
+        # Smallest spacing between distinct grid latitudes / longitudes
+        steps = np.concatenate([np.diff(np.unique(df['lat'].round(6))),
+                                np.diff(np.unique(df['lon'].round(6)))])
+        cell_deg = float(steps.min()) if len(steps) else 1.0
+
+    lat_min = float(df['lat'].min())
+    lon_min = float(df['lon'].min())
+    rows = int(round((df['lat'].max() - lat_min) / cell_deg)) + 1
+    cols = int(round((df['lon'].max() - lon_min) / cell_deg)) + 1
+
+    grid = np.full((13, rows, cols), np.nan, dtype='float32')
+    i = np.rint((df['lat'].to_numpy() - lat_min) / cell_deg).astype(int)
+    j = np.rint((df['lon'].to_numpy() - lon_min) / cell_deg).astype(int)
+    monthly = df[MONTH_COLUMNS].to_numpy(dtype='float32')
+    annual = df['annual'].to_numpy(dtype='float32') if 'annual' in df.columns else monthly.sum(axis=1)
+
+    grid[0, i, j] = annual
+    for band in range(12):
+        grid[band + 1, i, j] = monthly[:, band]
+    return grid, lat_min, lon_min, cell_deg
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    csv_path = sys.argv[1]
+    cell_deg = float(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    print(f"Reading rainfall normals: {csv_path}")
+    df = pd.read_csv(csv_path)
+    grid, lat_min, lon_min, cell_deg = build_grid(df, cell_deg)
+    write_climatology(RAINFALL_CLIMATOLOGY_DIR, grid, lat_min, lon_min, cell_deg, source=csv_path)
+
+    filled = int((~np.isnan(grid[0])).sum())
+    print(f"Wrote {grid.shape[1]}x{grid.shape[2]} grid ({filled} cells with data, "
+          f"{cell_deg} deg) to {RAINFALL_CLIMATOLOGY_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Grid-snapped location cache policy for GeoData.
+
+Coordinates are quantized to a square cell of LOCATION_CACHE_CELL_DEG degrees
+(0.01 deg is roughly 1.1 km), so nearby lookups share one cached GeoData row
+instead of requiring an exact float match. Each field group (rainfall, soil,
+groundwater) carries its own timestamp and is refreshed independently.
+
+Freshness follows a stale-while-revalidate policy with two TTLs per group. Past
+the soft TTL the cached value is still served immediately and refreshed in the
+background; past the hard TTL it is refetched before responding. Setting a
+group's hard TTL equal to its soft TTL turns off serving it stale.
+"""
+
+import os
+import math
+import threading
+from datetime import datetime, timedelta
+
+LOCATION_CACHE_CELL_DEG = float(os.environ.get('LOCATION_CACHE_CELL_DEG', 0.01))
+
+# Soft TTLs: soil and aquifer properties change far more slowly than rainfall estimates
+FIELD_GROUP_TTLS = {
+    'rainfall': timedelta(days=int(os.environ.get('LOCATION_CACHE_TTL_RAINFALL_DAYS', 30))),
+    'soil': timedelta(days=int(os.environ.get('LOCATION_CACHE_TTL_SOIL_DAYS', 365))),
+    'groundwater': timedelta(days=int(os.environ.get('LOCATION_CACHE_TTL_GROUNDWATER_DAYS', 90))),
+}
+
+# Hard TTLs: beyond these a cached group is too old to serve while refreshing
+FIELD_GROUP_HARD_TTLS = {
+    'rainfall': timedelta(days=int(os.environ.get('LOCATION_CACHE_HARD_TTL_RAINFALL_DAYS', 90))),
+    'soil': timedelta(days=int(os.environ.get('LOCATION_CACHE_HARD_TTL_SOIL_DAYS', 730))),
+    'groundwater': timedelta(days=int(os.environ.get('LOCATION_CACHE_HARD_TTL_GROUNDWATER_DAYS', 365))),
+}
+
+FIELD_GROUPS = tuple(FIELD_GROUP_TTLS)
+
+
+def cell_key(lat, lon, cell_deg=None):
+    """Return the cache key of the grid cell containing (lat, lon).
+
+    The cell size is part of the key, so changing LOCATION_CACHE_CELL_DEG never
+    matches rows written under a different grid.
+    """
+    cell_deg = cell_deg or LOCATION_CACHE_CELL_DEG
+    # Small epsilon keeps values such as 17.4 / 0.01 = 1739.9999... in the right cell
+    row = math.floor(float(lat) / cell_deg + 1e-9)
+    col = math.floor(float(lon) / cell_deg + 1e-9)
+    return f"{cell_deg:g}:{row}:{col}"
+
+
+def stale_groups(entry, now=None):
+    """Return the field groups of a cached GeoData row that must be refetched.
+
+    A missing row, or a group that was never timestamped, counts as stale.
+    """
+    if entry is None:
+        return list(FIELD_GROUPS)
+    now = now or datetime.utcnow()
+    stale = []
+    for group, ttl in FIELD_GROUP_TTLS.items():
+        updated_at = getattr(entry, f'{group}_updated_at', None)
+        if updated_at is None or now - updated_at > ttl:
+            stale.append(group)
+    return stale
+
+
+def refresh_plan(entry, now=None):
+    """Split the stale field groups of a cached GeoData row by how old they are.
+
+    Returns (revalidate, expired): groups past their soft TTL that may still be
+    served while refreshing in the background, and groups past their hard TTL
+    (or never fetched) that must be refetched before the row is used.
+    """
+    if entry is None:
+        return [], list(FIELD_GROUPS)
+    now = now or datetime.utcnow()
+    revalidate, expired = [], []
+    for group in stale_groups(entry, now):
+        updated_at = getattr(entry, f'{group}_updated_at', None)
+        hard_ttl = max(FIELD_GROUP_HARD_TTLS[group], FIELD_GROUP_TTLS[group])
+        if updated_at is None or now - updated_at > hard_ttl:
+            expired.append(group)
+        else:
+            revalidate.append(group)
+    return revalidate, expired
+
+
+class LocationCacheStats:
+    """Thread-safe hit/miss counters for tuning the cell size against accuracy."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {'hits': 0, 'stale_hits': 0, 'partial_hits': 0, 'misses': 0}
+
+    def record(self, outcome):
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = sum(counts.values())
+        counts['lookups'] = lookups
+        # Stale hits are served from the cache too, so they count towards the hit ratio
+        counts['hit_ratio'] = round((counts['hits'] + counts['stale_hits']) / lookups, 4) if lookups else None
+        counts['cell_deg'] = LOCATION_CACHE_CELL_DEG
+        counts['ttl_days'] = {group: ttl.days for group, ttl in FIELD_GROUP_TTLS.items()}
+        counts['hard_ttl_days'] = {group: ttl.days for group, ttl in FIELD_GROUP_HARD_TTLS.items()}
+        return counts
+
+
+cache_stats = LocationCacheStats()
@@ -0,0 +1,79 @@
+"""
+Small in-process LRU cache for generated responses (map tiles, GeoJSON bodies).
+
+Entries are bounded both by count and by total size in bytes, and may carry a
+TTL. Keys should include whatever version makes a cached value obsolete (e.g.
+the dataset version of the table it was built from), so a reload never serves
+stale data and old entries simply age out of the LRU.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+
+class MemoryLRUCache:
+    """Thread-safe LRU cache bounded by entry count and total value size."""
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl_seconds=None, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, size, stored_at)
+        self._bytes = 0
+        self._counts = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def _size_of(value):
+        try:
+            return len(value)
+        except TypeError:
+            return 1
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None \
+                    and self._clock() - entry[2] > self.ttl_seconds:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._counts['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counts['hits'] += 1
+            return entry[0]
+
+    def set(self, key, value, size=None):
+        """Store `value`; pass `size` when len(value) does not reflect its size in bytes."""
+        size = self._size_of(value) if size is None else size
+        if size > self.max_bytes:
+            return  # Never worth evicting everything for one oversized value
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, self._clock())
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._counts['evictions'] += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self._counts['hits'] + self._counts['misses']
+            return dict(self._counts,
+                        entries=len(self._entries),
+                        bytes=self._bytes,
+                        hit_ratio=round(self._counts['hits'] / lookups, 4) if lookups else None)
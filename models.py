@@ -59,3 +59,17 @@ class GroundWaterQualityStation(db.Model):
     district_n = db.Column(db.String(255))
     basin_name = db.Column(db.String(255))
     geometry = db.Column(Geometry('POINT', srid=4326), nullable=False)
+
+class MajorAquiferSimplified(db.Model):
+    """Simplified major_aquifers geometry per tolerance level (built by the loaders)."""
+    __tablename__ = 'major_aquifers_simplified'
+    source_id = db.Column(db.Integer, primary_key=True)
+    tolerance = db.Column(db.Float, primary_key=True)
+    geometry = db.Column(Geometry('MULTIPOLYGON', srid=4326))
+
+class AquiferMaterialSimplified(db.Model):
+    """Simplified aquifer_materials geometry per tolerance level (built by the loaders)."""
+    __tablename__ = 'aquifer_materials_simplified'
+    source_id = db.Column(db.Integer, primary_key=True)
+    tolerance = db.Column(db.Float, primary_key=True)
+    geometry = db.Column(Geometry('MULTIPOLYGON', srid=4326))
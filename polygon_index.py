@@ -0,0 +1,140 @@
+"""
+In-process point-in-polygon index for the static aquifer polygon layers.
+
+The aquifer shapefiles are small and change only when a loader runs, so their
+geometries can be held in memory. PolygonIndex keeps them in a shapely STRtree
+with every geometry prepared. A lookup is then a bounding-box probe plus one or
+two prepared containment tests, with no database round trip, and a batch of
+points is answered in a single vectorized call.
+
+The index records the dataset version it was loaded from, so callers can
+reload it in the background after a loader bumps the version and use PostGIS
+while it is not loaded.
+"""
+
+import os
+import time
+import threading
+
+import numpy as np
+import shapely
+from shapely import STRtree
+
+# After a failed load, wait this long before trying again
+POLYGON_INDEX_RETRY_SECONDS = float(os.environ.get('POLYGON_INDEX_RETRY_SECONDS', 300))
+
+
+class PolygonIndex:
+    """Thread-safe STRtree of prepared polygons, each carrying a properties dict."""
+
+    def __init__(self, name, retry_seconds=None, clock=time.monotonic):
+        self.name = name
+        self.retry_seconds = POLYGON_INDEX_RETRY_SECONDS if retry_seconds is None else retry_seconds
+        self._clock = clock
+        self._failed_at = None
+        self._lock = threading.Lock()
+        self._tree = None
+        self._geometries = None
+        self._properties = []
+        self.version = None
+        self._loading = False
+        self._counts = {'lookups': 0, 'hits': 0, 'loads': 0, 'load_errors': 0}
+        self._load_seconds = None
+
+    @property
+    def loaded(self):
+        return self._tree is not None
+
+    def load(self, rows, version=None):
+        """
+        Replace the index contents with (key, wkb, properties) rows.
+        Rows are ordered by key so overlapping polygons resolve to the lowest key.
+        """
+        rows = sorted((row for row in rows if row[1] is not None), key=lambda row: row[0])
+        geometries = shapely.from_wkb([bytes(wkb) for _, wkb, _ in rows])
+        shapely.prepare(geometries)
+        tree = STRtree(geometries)
+        with self._lock:
+            self._geometries = geometries
+            self._properties = [properties for _, _, properties in rows]
+            self._tree = tree
+            self.version = version
+
+    def load_from(self, loader, version=None):
+        """Load from `loader()` (which returns rows for load); errors are logged and leave the index as it was."""
+        with self._lock:
+            if self._loading:
+                return False
+            self._loading = True
+        started = self._clock()
+        try:
+            self.load(loader(), version=version)
+        except Exception as e:
+            with self._lock:
+                self._counts['load_errors'] += 1
+                self._failed_at = self._clock()
+                self._loading = False
+            print(f"Could not load {self.name} polygon index: {e}")
+            return False
+        with self._lock:
+            self._counts['loads'] += 1
+            self._load_seconds = round(self._clock() - started, 3)
+            self._failed_at = None
+            self._loading = False
+        print(f"{self.name} polygon index loaded with {len(self._properties)} polygons")
+        return True
+
+    def load_in_background(self, loader, version=None):
+        """Start load_from on a daemon thread, unless a load is running or the last one failed recently."""
+        with self._lock:
+            if self._loading:
+                return
+            if self._failed_at is not None and self._clock() - self._failed_at < self.retry_seconds:
+                return
+        threading.Thread(target=self.load_from, args=(loader, version), daemon=True,
+                         name=f"{self.name}-polygon-index").start()
+
+    def ensure_version(self, loader, version):
+        """
+        Start a background reload when the index is missing or was loaded from another
+        dataset version. True if the index can answer lookups (possibly from the old version).
+        """
+        if not self.loaded or self.version != version:
+            self.load_in_background(loader, version)
+        return self.loaded
+
+    def find(self, lat, lon):
+        """Properties of the polygon containing (lat, lon), or None. Raises if the index is not loaded."""
+        return self.find_many([(lat, lon)])[0]
+
+    def find_many(self, coords):
+        """Properties of the containing polygon (or None) for each (lat, lon) in `coords`."""
+        with self._lock:
+            tree, geometries, properties = self._tree, self._geometries, self._properties
+        if tree is None:
+            raise RuntimeError(f"{self.name} polygon index is not loaded")
+
+        coords = np.asarray(coords, dtype='float64').reshape(-1, 2)
+        points = shapely.points(coords[:, 1], coords[:, 0])
+        # Bounding-box candidates from the tree, then an exact test against the prepared polygons
+        point_idx, polygon_idx = tree.query(points)
+        inside = shapely.contains(geometries[polygon_idx], points[point_idx])
+
+        results = [None] * len(points)
+        # Where polygons overlap, the lowest polygon index (lowest key) wins, as it is assigned last
+        for p, g in sorted(zip(point_idx[inside].tolist(), polygon_idx[inside].tolist()), reverse=True):
+            results[p] = properties[g]
+
+        hits = sum(result is not None for result in results)
+        with self._lock:
+            self._counts['lookups'] += len(results)
+            self._counts['hits'] += hits
+        return results
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts,
+                        loaded=self._tree is not None,
+                        polygons=len(self._properties),
+                        version=self.version,
+                        load_seconds=self._load_seconds)
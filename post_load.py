@@ -0,0 +1,70 @@
+"""
+Steps the loader scripts run after (re)loading a spatial table.
+
+Each step runs in its own transaction with its own error handling, so a failed
+geography index or simplification build cannot skip the dataset version bump
+that invalidates the app's caches for the table.
+"""
+
+from sqlalchemy import text
+
+from dataset_versions import bump_dataset_version
+from geometry_simplification import SIMPLIFIED_TABLES, build_simplified_tables, simplified_table_name
+from geography_indexes import GEOGRAPHY_INDEXED_TABLES, geography_index_ddl
+
+
+def finish_table_load(engine, table_name, geom_col='geometry'):
+    """
+    Run the post-load steps for a table just written by to_postgis(..., index_label='id');
+    returns the names of the steps that failed.
+    """
+    failed = []
+
+    # Primary key on the id column and spatial index for better query performance
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table_name} ADD PRIMARY KEY (id)"))
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{geom_col} ON {table_name} USING GIST ({geom_col})"))
+        print("Created primary key and spatial index.")
+    except Exception as e:
+        failed.append('spatial index')
+        print(f"ERROR creating indexes on {table_name}: {e}")
+
+    # Radius filters on station tables use geometry::geography; index that expression
+    if table_name in GEOGRAPHY_INDEXED_TABLES:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(geography_index_ddl(table_name, geom_col)))
+            print("Created geography expression index.")
+        except Exception as e:
+            failed.append('geography index')
+            print(f"ERROR creating geography index on {table_name}: {e}")
+
+    # Precompute simplified copies of polygon layers for low-zoom map views
+    if table_name in SIMPLIFIED_TABLES:
+        target = simplified_table_name(table_name)
+        try:
+            with engine.begin() as conn:
+                build_simplified_tables(conn, table_name, geom_col)
+            print(f"Built simplified geometry levels in {target}.")
+        except Exception as e:
+            failed.append('simplification')
+            print(f"ERROR building {target}: {e}")
+            # Levels from the previous load no longer match the new ids; without them the
+            # app serves full-resolution geometry
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(f"DROP TABLE IF EXISTS {target}"))
+            except Exception as e:
+                print(f"ERROR dropping stale {target}: {e}")
+
+    # Invalidate tiles and other app caches built from this table
+    try:
+        with engine.begin() as conn:
+            bump_dataset_version(conn, table_name)
+        print(f"Bumped dataset version for {table_name}.")
+    except Exception as e:
+        failed.append('dataset version')
+        print(f"ERROR bumping dataset version for {table_name}: {e}")
+
+    return failed
@@ -0,0 +1,116 @@
+"""
+Offline rainfall climatology store.
+
+Long-term annual and monthly rainfall normals on a regular lat/lon grid, kept
+in data/Rainfall Climatology/ as one .npy array of shape (13, rows, cols) plus a
+small JSON header. Band 0 is the annual normal, bands 1-12 are January-December.
+The array is memory-mapped, so a lookup reads only the 2x2 neighbourhood of grid
+nodes around the point (constant time, no network) and bilinearly interpolates
+between them. Build the files with load_rainfall_climatology.py.
+"""
+
+import os
+import json
+import math
+import threading
+
+import numpy as np
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+RAINFALL_CLIMATOLOGY_DIR = os.environ.get(
+    'RAINFALL_CLIMATOLOGY_DIR', os.path.join(BASE_DIR, 'data', 'Rainfall Climatology'))
+GRID_FILENAME = 'rainfall_normals.npy'
+HEADER_FILENAME = 'rainfall_normals.json'
+
+MONTHS = ['01', '02', '03', '04', '05', '06', '07', '08', '09', '10', '11', '12']
+
+
+def write_climatology(directory, grid, lat_min, lon_min, cell_deg, source=''):
+    """
+    Write a (13, rows, cols) normals grid and its header to `directory`.
+    Grid node (i, j) lies at (lat_min + i * cell_deg, lon_min + j * cell_deg);
+    cells without data hold NaN.
+    """
+    grid = np.asarray(grid, dtype='float32')
+    if grid.ndim != 3 or grid.shape[0] != 13:
+        raise ValueError(f"Expected a (13, rows, cols) grid, got {grid.shape}")
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, GRID_FILENAME), grid)
+    header = {
+        'lat_min': lat_min,
+        'lon_min': lon_min,
+        'cell_deg': cell_deg,
+        'rows': grid.shape[1],
+        'cols': grid.shape[2],
+        'bands': ['annual'] + MONTHS,
+        'source': source,
+    }
+    with open(os.path.join(directory, HEADER_FILENAME), 'w') as f:
+        json.dump(header, f, indent=2)
+
+
+class RainfallClimatology:
+    """Memory-mapped normals grid with bilinear lookup by lat/lon."""
+
+    def __init__(self, directory=None):
+        self.directory = directory or RAINFALL_CLIMATOLOGY_DIR
+        self._lock = threading.Lock()
+        self._grid = None
+        self._header = None
+
+    @property
+    def available(self):
+        return self._grid is not None or (
+            os.path.exists(os.path.join(self.directory, GRID_FILENAME))
+            and os.path.exists(os.path.join(self.directory, HEADER_FILENAME)))
+
+    def _load(self):
+        with self._lock:
+            if self._grid is None:
+                with open(os.path.join(self.directory, HEADER_FILENAME)) as f:
+                    self._header = json.load(f)
+                self._grid = np.load(os.path.join(self.directory, GRID_FILENAME), mmap_mode='r')
+        return self._grid, self._header
+
+    def lookup(self, lat, lon):
+        """
+        Annual and monthly rainfall normals (mm) at a point, or None outside the grid
+        or where all surrounding nodes lack data.
+        Returns {'annual': float, 'monthly': {'01': float, ..., '12': float}}.
+        """
+        grid, header = self._load()
+        rows, cols, cell = header['rows'], header['cols'], header['cell_deg']
+
+        fi = (lat - header['lat_min']) / cell
+        fj = (lon - header['lon_min']) / cell
+        # Points up to half a cell outside the outermost nodes snap to the edge
+        if not (-0.5 <= fi <= rows - 0.5 and -0.5 <= fj <= cols - 0.5):
+            return None
+        fi = min(max(fi, 0.0), rows - 1)
+        fj = min(max(fj, 0.0), cols - 1)
+
+        i0 = min(int(math.floor(fi)), max(rows - 2, 0))
+        j0 = min(int(math.floor(fj)), max(cols - 2, 0))
+        di, dj = fi - i0, fj - j0
+
+        window = np.array(grid[:, i0:i0 + 2, j0:j0 + 2], dtype='float64')
+        weights = np.array([[(1 - di) * (1 - dj), (1 - di) * dj],
+                            [di * (1 - dj), di * dj]])[:window.shape[1], :window.shape[2]]
+
+        # Drop nodes without data and renormalise over the rest (coastlines, borders)
+        valid = ~np.isnan(window[0])
+        if not valid.any() or weights[valid].sum() == 0:
+            return None
+        weights = np.where(valid, weights, 0.0)
+        weights /= weights.sum()
+        values = np.nansum(window * weights, axis=(1, 2))
+
+        return {
+            'annual': float(values[0]),
+            'monthly': {month: float(value) for month, value in zip(MONTHS, values[1:])},
+        }
+
+
+rainfall_climatology = RainfallClimatology()
@@ -0,0 +1,209 @@
+"""
+In-process raster sampling for the soil rasters shipped in data/.
+
+Each RasterSampler keeps its GeoTIFF open for the life of the worker process and
+reads single pixels through windowed reads of whole internal blocks, which are
+kept in a small LRU cache. Nearby lookups therefore hit memory instead of disk,
+and no lookup ever reads the full band. Coordinates are given in WGS84 and
+reprojected to the raster CRS (the NBSS&LUP soil rasters use a Lambert
+Conformal Conic projection).
+
+The soil texture class codes from SOILTEXTURE.tif.vat.dbf are mapped to the
+Soil_Type / Infiltration_Rate_mm_per_hr values that
+calculate_comprehensive_feasibility consumes, so soil data no longer needs a
+SoilGrids round-trip when the raster is available.
+"""
+
+import os
+import math
+import threading
+from collections import OrderedDict
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+SOIL_TEXTURE_RASTER_PATH = os.environ.get(
+    'SOIL_TEXTURE_RASTER_PATH', os.path.join(BASE_DIR, 'data', 'Soil Texture', 'SOILTEXTURE.tif'))
+SOIL_DEPTH_RASTER_PATH = os.environ.get(
+    'SOIL_DEPTH_RASTER_PATH', os.path.join(BASE_DIR, 'data', 'Soil Depth', 'SOILDEPTH.tif'))
+SOIL_SLOPE_RASTER_PATH = os.environ.get(
+    'SOIL_SLOPE_RASTER_PATH', os.path.join(BASE_DIR, 'data', 'Soil Slope', 'SOILSLOPE.tif'))
+
+# Number of raster blocks kept in memory per sampler
+RASTER_BLOCK_CACHE_SIZE = int(os.environ.get('RASTER_BLOCK_CACHE_SIZE', 256))
+
+# SOILTEXTURE.tif.vat.dbf: value -> descr. Values follow the SoilGrids mapping in
+# get_soil_data_from_api for the texture classes it can produce.
+SOIL_TEXTURE_CLASSES = {
+    1: {"Soil_Type": "Clayey", "Infiltration_Rate_mm_per_hr": 5, "Soil_Permability_Class": "Medium"},  # 1. Fine texture
+    2: {"Soil_Type": "Loamy", "Infiltration_Rate_mm_per_hr": 15, "Soil_Permability_Class": "Medium"},  # 2. Medium texture
+    3: {"Soil_Type": "Sandy", "Infiltration_Rate_mm_per_hr": 20, "Soil_Permability_Class": "High"},    # 3. Coarse texture
+    # 4 = Rocky, other non-soil categories (builtup, waterbody): no meaningful infiltration
+    #     rate, so it is treated like 0 = DATA NOT AVAILABLE and falls back to SoilGrids
+}
+
+# SOILDEPTH.tif.vat.dbf: value -> class
+SOIL_DEPTH_CLASSES = {
+    1: 'Deep (>50 cm)',
+    2: 'Shallow (25-50 cm)',
+    3: 'Extremely shallow (<10 cm)',
+    4: 'Very shallow (10-25 cm)',
+    # 0 = DATA NOT AVAILABLE
+}
+
+
+class RasterSampler:
+    """Samples one band of a raster at WGS84 coordinates through a block cache."""
+
+    def __init__(self, path, band=1, cache_blocks=None):
+        self.path = path
+        self.band = band
+        self.cache_blocks = cache_blocks or RASTER_BLOCK_CACHE_SIZE
+        self._lock = threading.Lock()
+        self._dataset = None
+        self._project = False
+        self._blocks = OrderedDict()
+        self.block_hits = 0
+        self.block_reads = 0
+
+    @property
+    def available(self):
+        return self._dataset is not None or os.path.exists(self.path)
+
+    def _open(self):
+        # Opened lazily so each gunicorn worker gets its own file handle after fork
+        if self._dataset is None:
+            import rasterio
+
+            self._dataset = rasterio.open(self.path)
+            self.block_height, self.block_width = self._dataset.block_shapes[self.band - 1]
+            self._project = bool(self._dataset.crs) and not self._dataset.crs.is_geographic
+            # Inverse geotransform, computed once: world (x, y) -> fractional (col, row)
+            gt = self._dataset.transform
+            a, b, c, d, e, f = gt.a, gt.b, gt.c, gt.d, gt.e, gt.f
+            det = a * e - b * d
+            self._inverse = (e / det, -b / det, (b * f - e * c) / det,
+                             -d / det, a / det, (d * c - a * f) / det)
+        return self._dataset
+
+    def _read_block(self, dataset, block_row, block_col):
+        from rasterio.windows import Window
+
+        key = (block_row, block_col)
+        block = self._blocks.get(key)
+        if block is not None:
+            self._blocks.move_to_end(key)
+            self.block_hits += 1
+            return block
+
+        row_off = block_row * self.block_height
+        col_off = block_col * self.block_width
+        window = Window(col_off, row_off,
+                        min(self.block_width, dataset.width - col_off),
+                        min(self.block_height, dataset.height - row_off))
+        block = dataset.read(self.band, window=window)
+        self.block_reads += 1
+
+        self._blocks[key] = block
+        if len(self._blocks) > self.cache_blocks:
+            self._blocks.popitem(last=False)
+        return block
+
+    def sample(self, coords):
+        """Return the pixel value at each (lat, lon), or None outside the raster / on nodata."""
+        from rasterio.warp import transform
+
+        coords = list(coords)
+        if not coords:
+            return []
+
+        # rasterio datasets are not safe for concurrent reads from several threads
+        with self._lock:
+            dataset = self._open()
+            lats = [float(lat) for lat, _ in coords]
+            lons = [float(lon) for _, lon in coords]
+            if self._project:
+                xs, ys = transform('EPSG:4326', dataset.crs, lons, lats)
+            else:
+                xs, ys = lons, lats
+            ia, ib, ic, id_, ie, if_ = self._inverse
+            nodata = dataset.nodata
+
+            values = []
+            for x, y in zip(xs, ys):
+                col = math.floor(ia * x + ib * y + ic)
+                row = math.floor(id_ * x + ie * y + if_)
+                if not (0 <= row < dataset.height and 0 <= col < dataset.width):
+                    values.append(None)
+                    continue
+                block = self._read_block(dataset, row // self.block_height, col // self.block_width)
+                value = block[row % self.block_height, col % self.block_width].item()
+                values.append(None if nodata is not None and value == nodata else value)
+            return values
+
+    def sample_one(self, lat, lon):
+        return self.sample([(lat, lon)])[0]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'path': self.path,
+                'open': self._dataset is not None,
+                'cached_blocks': len(self._blocks),
+                'block_hits': self.block_hits,
+                'block_reads': self.block_reads,
+            }
+
+
+_samplers = {}
+_samplers_lock = threading.Lock()
+
+
+def get_sampler(path, band=1):
+    """Return the shared sampler for a raster file, creating it on first use."""
+    key = (os.path.abspath(str(path)), band)
+    with _samplers_lock:
+        sampler = _samplers.get(key)
+        if sampler is None:
+            sampler = _samplers[key] = RasterSampler(key[0], band=band)
+        return sampler
+
+
+def sample_soil_properties(coords):
+    """
+    Batch soil lookup from the local rasters.
+
+    Returns one dict per (lat, lon) with Soil_Type, Infiltration_Rate_mm_per_hr and
+    Soil_Permability_Class, plus Soil_Depth_Class and Soil_Slope_Class when those
+    rasters are present. Entries are None where the texture raster has no data or
+    a non-soil class (rock, built-up, water).
+    """
+    coords = list(coords)
+    texture_sampler = get_sampler(SOIL_TEXTURE_RASTER_PATH)
+    if not texture_sampler.available:
+        return [None] * len(coords)
+
+    textures = texture_sampler.sample(coords)
+    depth_sampler = get_sampler(SOIL_DEPTH_RASTER_PATH)
+    depths = depth_sampler.sample(coords) if depth_sampler.available else [None] * len(coords)
+    slope_sampler = get_sampler(SOIL_SLOPE_RASTER_PATH)
+    slopes = slope_sampler.sample(coords) if slope_sampler.available else [None] * len(coords)
+
+    results = []
+    for texture, depth, slope in zip(textures, depths, slopes):
+        soil = SOIL_TEXTURE_CLASSES.get(texture)
+        if soil is None:
+            results.append(None)
+            continue
+        soil = dict(soil)
+        if depth in SOIL_DEPTH_CLASSES:
+            soil['Soil_Depth_Class'] = SOIL_DEPTH_CLASSES[depth]
+        if slope is not None:
+            soil['Soil_Slope_Class'] = slope
+        results.append(soil)
+    return results
+
+
+def raster_stats():
+    with _samplers_lock:
+        samplers = list(_samplers.values())
+    return [sampler.stats() for sampler in samplers]
@@ -0,0 +1,151 @@
+"""
+In-process nearest-neighbour index for lat/lon points.
+
+Points are stored as 3-D unit vectors on the sphere, where straight-line (chord)
+distance increases monotonically with great-circle distance. A KD-tree over those
+vectors therefore finds the geodesically nearest point in O(log N) without
+special cases at the antimeridian or poles.
+
+New points are appended to a small unindexed buffer that is scanned linearly
+and folded into a rebuilt tree once it grows past a threshold. This keeps each
+insert cheap while queries stay logarithmic. GeoPointIndex tracks the highest id
+seen, so callers can sync incrementally with `WHERE id > last_id`.
+"""
+
+import math
+import threading
+
+EARTH_RADIUS_KM = 6371.0
+
+# Pending points are folded into the tree once the buffer reaches this size
+# (or sqrt(N), whichever is larger)
+MIN_REBUILD_THRESHOLD = 64
+
+
+def to_unit_vector(lat, lon):
+    lat, lon = math.radians(lat), math.radians(lon)
+    cos_lat = math.cos(lat)
+    return (cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat))
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+def km_to_chord(km):
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def _dist2(a, b):
+    dx, dy, dz = a[0] - b[0], a[1] - b[1], a[2] - b[2]
+    return dx * dx + dy * dy + dz * dz
+
+
+class _Node:
+    __slots__ = ('point', 'key', 'axis', 'left', 'right')
+
+    def __init__(self, point, key, axis, left, right):
+        self.point = point
+        self.key = key
+        self.axis = axis
+        self.left = left
+        self.right = right
+
+
+def _build(entries, depth=0):
+    """Balanced KD-tree from a list of (point, key) by median split."""
+    if not entries:
+        return None
+    axis = depth % 3
+    entries.sort(key=lambda entry: entry[0][axis])
+    mid = len(entries) // 2
+    point, key = entries[mid]
+    return _Node(point, key, axis,
+                 _build(entries[:mid], depth + 1),
+                 _build(entries[mid + 1:], depth + 1))
+
+
+def _nearest(node, target, best, skip):
+    """Depth-first KD search; `best` is a [dist2, key] list updated in place."""
+    while node is not None:
+        if node.key not in skip:
+            d2 = _dist2(node.point, target)
+            if d2 < best[0]:
+                best[0], best[1] = d2, node.key
+        diff = target[node.axis] - node.point[node.axis]
+        near, far = (node.left, node.right) if diff < 0 else (node.right, node.left)
+        if far is not None and diff * diff < best[0]:
+            _nearest(far, target, best, skip)
+        node = near
+
+
+class GeoPointIndex:
+    """Thread-safe nearest-neighbour index of keyed (lat, lon) points."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._points = {}   # key -> unit vector, including pending ones
+        self._tree = None
+        self._pending = []  # keys not yet in the tree
+        self._removed = set()  # keys still in the tree but no longer valid
+        self.last_id = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._points)
+
+    def rebuild(self, rows):
+        """Replace the index contents with (key, lat, lon) rows."""
+        points = {key: to_unit_vector(lat, lon) for key, lat, lon in rows
+                  if lat is not None and lon is not None}
+        tree = _build([(point, key) for key, point in points.items()])
+        with self._lock:
+            self._points = points
+            self._tree = tree
+            self._pending = []
+            self._removed = set()
+            self.last_id = max([key for key in points if isinstance(key, int)], default=0)
+
+    def add_many(self, rows):
+        """Add (key, lat, lon) rows; keys already indexed are ignored."""
+        with self._lock:
+            for key, lat, lon in rows:
+                if isinstance(key, int):
+                    self.last_id = max(self.last_id, key)
+                if key in self._points or lat is None or lon is None:
+                    continue
+                self._points[key] = to_unit_vector(lat, lon)
+                self._pending.append(key)
+                self._removed.discard(key)
+            if len(self._pending) >= max(MIN_REBUILD_THRESHOLD, int(math.sqrt(len(self._points)))):
+                self._tree = _build([(point, key) for key, point in self._points.items()])
+                self._pending = []
+                self._removed = set()
+
+    def add(self, key, lat, lon):
+        self.add_many([(key, lat, lon)])
+
+    def discard(self, key):
+        """Stop returning `key`, e.g. after its database row was deleted."""
+        with self._lock:
+            if self._points.pop(key, None) is not None:
+                if key in self._pending:
+                    self._pending.remove(key)
+                else:
+                    self._removed.add(key)
+
+    def nearest(self, lat, lon, max_km=None):
+        """Return (key, distance_km) of the nearest point, or None if none lies within max_km."""
+        target = to_unit_vector(lat, lon)
+        limit = km_to_chord(max_km) ** 2 if max_km is not None else float('inf')
+        # Strictly-less comparisons: nudge the bound so a point exactly at max_km still qualifies
+        best = [limit * (1 + 1e-12) if max_km is not None else limit, None]
+        with self._lock:
+            _nearest(self._tree, target, best, self._removed)
+            for key in self._pending:
+                d2 = _dist2(self._points[key], target)
+                if d2 < best[0]:
+                    best[0], best[1] = d2, key
+        if best[1] is None:
+            return None
+        return best[1], chord_to_km(math.sqrt(best[0]))
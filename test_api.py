@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import json
+import time
+import threading
+from types import SimpleNamespace
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# The API tests run against an in-memory database; PostGIS queries are compiled, not run
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['POLYGON_INDEX_ENABLED'] = 'false'
+
+from sqlalchemy.dialects import postgresql
+from models import MajorAquifer
+
+import app as webapp
+
+client = webapp.app.test_client()
+
+EMPTY_COLLECTION = '{"type": "FeatureCollection", "features": []}'
+
+def _sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}))
+
+def _get_captured(path):
+    """GET `path` with the GeoJSON query compiled for PostgreSQL instead of run; returns (response, SQL)."""
+    captured = []
+
+    def scalar(statement, *args, **kwargs):
+        captured.append(_sql(statement))
+        return EMPTY_COLLECTION
+
+    webapp.geo_response_cache.clear()
+    with mock.patch.object(webapp.db.session, 'scalar', scalar):
+        response = client.get(path)
+    return response, (captured[0] if captured else None)
+
+def test_station_clusters_cell_size_and_singleton_ids():
+    """Cells span STATION_CLUSTER_CELL_PX pixels at the zoom; only single-station clusters carry an id"""
+    assert webapp._station_cluster_cell_degrees(0) == 360.0 / 256 * webapp.STATION_CLUSTER_CELL_PX
+    assert webapp._station_cluster_cell_degrees(5) == webapp._station_cluster_cell_degrees(4) / 2
+
+    response, sql = _get_captured('/api/geo/groundwater/clusters?zoom=4')
+    assert response.status_code == 200
+    assert f"ST_SnapToGrid(ground_water_level_stations.geometry, {webapp._station_cluster_cell_degrees(4)!r})" in sql
+    assert 'CASE WHEN (anon_1.point_count = 1) THEN anon_1.id END' in sql
+    assert 'ORDER BY count(ground_water_level_stations.id) DESC' in sql
+    assert 'LIMIT 5000' in sql
+
+    # Fractional zooms use the cells of their integer level
+    _, fractional_sql = _get_captured('/api/geo/groundwater/clusters?zoom=4.6')
+    assert fractional_sql == sql
+
+def test_station_clusters_bounded():
+    """Missing zoom is a 400; above the bbox threshold the viewport is required"""
+    response, sql = _get_captured('/api/geo/gw-quality/clusters')
+    assert response.status_code == 400 and sql is None
+
+    high_zoom = webapp.STATION_CLUSTER_BBOX_MIN_ZOOM + 1
+    response, sql = _get_captured(f'/api/geo/gw-quality/clusters?zoom={high_zoom}')
+    assert response.status_code == 400 and sql is None
+    assert 'bbox' in response.get_json()['error']
+
+    response, sql = _get_captured(f'/api/geo/gw-quality/clusters?zoom={high_zoom}&bbox=77,12,78,13&limit=100')
+    assert response.status_code == 200
+    assert json.loads(response.get_data()) == json.loads(EMPTY_COLLECTION)
+    assert 'ground_water_quality_stations.geometry && ST_MakeEnvelope(77.0, 12.0, 78.0, 13.0, 4326)' in sql
+    assert 'LIMIT 100' in sql
+
+def test_geo_cache_key_normalizes_zoom():
+    """Zooms that render the same body share one cache entry"""
+    def key(path, zoom_arg=webapp._simplification_level_arg):
+        with webapp.app.test_request_context(path):
+            return webapp._geo_cache_key('ground_water_level_stations', zoom_arg)
+
+    cluster_keys = {key(f'/api/geo/groundwater/clusters?zoom={zoom}', webapp._station_cluster_zoom)
+                    for zoom in ('7', '7.0', '7.4')}
+    assert len(cluster_keys) == 1
+    assert key('/api/geo/groundwater/clusters?zoom=99', webapp._station_cluster_zoom) == \
+        key(f'/api/geo/groundwater/clusters?zoom={webapp.STATION_CLUSTER_MAX_ZOOM}', webapp._station_cluster_zoom)
+
+    # Polygon layers are keyed by the simplification level the zoom or tolerance selects
+    assert key('/api/geo/aquifers?zoom=7') == key('/api/geo/aquifers?zoom=7.4') == key('/api/geo/aquifers?tolerance=0.006')
+    assert key('/api/geo/aquifers?zoom=16') == key('/api/geo/aquifers')
+    assert key('/api/geo/aquifers?zoom=3') != key('/api/geo/aquifers?zoom=7')
+
+def test_batch_lookup_limits():
+    """Oversized batches, oversized radii and malformed coordinates are rejected with 400"""
+    def post(body):
+        with mock.patch.object(webapp, 'batch_location_lookup', side_effect=lambda coords, radius_km: [
+            {'lat': lat, 'lon': lon, 'radius_km': radius_km} for lat, lon in coords
+        ]):
+            return client.post('/api/batch-location-lookup', json=body)
+
+    max_points = webapp.BATCH_LOOKUP_MAX_POINTS
+    assert max_points == 250 and webapp.BATCH_LOOKUP_MAX_RADIUS_KM == 100
+
+    response = post({'coordinates': [[12.9, 77.6]] * max_points, 'radius_km': 100})
+    assert response.status_code == 200 and response.get_json()['count'] == max_points
+    response = post({'coordinates': [{'lat': 12.9, 'lon': 77.6}]})
+    assert response.get_json()['results'][0]['radius_km'] == webapp.BATCH_LOOKUP_DEFAULT_RADIUS_KM
+
+    for body in (
+        {'coordinates': [[12.9, 77.6]] * (max_points + 1)},
+        {'coordinates': [[12.9, 77.6]], 'radius_km': 150},
+        {'coordinates': [[12.9, 77.6]], 'radius_km': 0},
+        {'coordinates': [[12.9, 77.6]], 'radius_km': 'far'},
+        {},
+        {'coordinates': '12.9,77.6'},
+        {'coordinates': [[12.9]]},
+        {'coordinates': [[95, 77.6]]},
+        {'coordinates': [{'lat': 12.9, 'lon': 190}]},
+    ):
+        response = post(body)
+        assert response.status_code == 400, body
+        assert 'error' in response.get_json()
+
+def test_location_cache_upsert_on_cell_key():
+    """Saving a cell upserts on cell_key and only overwrites the refreshed groups"""
+    statements = []
+
+    def execute(statement, *args, **kwargs):
+        statements.append(_sql(statement))
+
+    combined = {'Rainfall_mm': 800.0, 'Region_Name': 'Hyderabad'}
+    with webapp.app.app_context(), mock.patch.object(webapp.db.session, 'execute', execute):
+        webapp._save_location_cache('0.01:1740:7850', 17.4, 78.5, combined, ['rainfall'])
+
+    [sql] = statements
+    assert "'0.01:1740:7850'" in sql and "'Hyderabad'" in sql
+    insert, update = sql.split('ON CONFLICT (cell_key) DO UPDATE SET')
+    assert 'rainfall_mm = 800.0' in update and 'rainfall_updated_at = ' in update
+    assert 'region_name' not in update and 'soil_updated_at' not in update
+
+def _get_streamed(path, batches):
+    """GET `path` with the streaming cursor stubbed to return `batches` of feature JSON strings."""
+    def execute(statement, *args, **kwargs):
+        def partitions():
+            for batch in batches:
+                if isinstance(batch, Exception):
+                    raise batch
+                yield batch
+        return mock.Mock(scalars=lambda: mock.Mock(partitions=partitions))
+
+    with mock.patch.object(webapp.db.session, 'execute', execute):
+        response = client.get(path)
+        return response, response.get_data(as_text=True)
+
+def test_streamed_feature_collection_is_valid_json():
+    """Streamed batches join into one FeatureCollection; empty results stream an empty one"""
+    features = [json.dumps({'type': 'Feature', 'geometry': None, 'properties': {'id': i}}) for i in range(5)]
+    response, body = _get_streamed('/api/geo/groundwater?stream=1', [features[:2], features[2:4], features[4:]])
+    assert response.status_code == 200 and response.mimetype == 'application/json'
+    assert 'ETag' not in response.headers  # Streamed bodies bypass the response cache
+    collection = json.loads(body)
+    assert collection['type'] == 'FeatureCollection'
+    assert [feature['properties']['id'] for feature in collection['features']] == list(range(5))
+
+    _, body = _get_streamed('/api/geo/aquifers?stream=1', [])
+    assert json.loads(body) == json.loads(EMPTY_COLLECTION)
+
+    _, body = _get_streamed('/api/geo/gw-quality?stream=true', [features[:1]])
+    assert len(json.loads(body)['features']) == 1
+
+def test_streamed_feature_collection_aborts_on_error():
+    """A database error mid-stream aborts the body instead of closing it as valid JSON"""
+    features = [json.dumps({'type': 'Feature', 'geometry': None, 'properties': {'id': 1}})]
+    try:
+        _get_streamed('/api/geo/groundwater?stream=1', [features, RuntimeError('connection lost')])
+        assert False, 'expected the stream to abort'
+    except RuntimeError as e:
+        assert str(e) == 'connection lost'
+
+def test_aquifer_list_pages_without_gaps():
+    """Keyset pages cover every row once; next_cursor is None on the last page"""
+    with webapp.app.app_context():
+        session = webapp.db.session
+        session.execute(webapp.db.text(
+            'CREATE TABLE major_aquifers (id INTEGER PRIMARY KEY, aquifer VARCHAR(255), state VARCHAR(100), '
+            'system VARCHAR(100), zone_m VARCHAR(50), geometry BLOB)'))
+        for i in (3, 1, 7, 4, 9, 2, 8):  # Gaps and insertion order must not matter
+            session.execute(webapp.db.text(
+                'INSERT INTO major_aquifers (id, aquifer, state) VALUES (:id, :aquifer, :state)'
+            ), {'id': i, 'aquifer': None if i == 4 else f'Aquifer {i}', 'state': 'Karnataka'})
+        session.commit()
+    try:
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = client.get('/api/aquifers?limit=3' + (f'&cursor={cursor}' if cursor else '')).get_json()
+            seen.extend(aquifer['id'] for aquifer in page['aquifers'])
+            pages += 1
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+            assert cursor == seen[-1]
+        assert seen == [1, 2, 3, 4, 7, 8, 9] and pages == 3
+
+        # A page that ends exactly on the last row has no next page
+        page = client.get('/api/aquifers?limit=7').get_json()
+        assert len(page['aquifers']) == 7 and page['next_cursor'] is None
+
+        page = client.get('/api/aquifers?fields=name,state&limit=2&cursor=3').get_json()
+        assert page['aquifers'] == [{'id': 4, 'name': 'Unknown', 'state': 'Karnataka'},
+                                    {'id': 7, 'name': 'Aquifer 7', 'state': 'Karnataka'}]
+        assert page['next_cursor'] == 7
+
+        response = client.get('/api/aquifers?fields=name,depth')
+        assert response.status_code == 400
+        assert 'depth' in response.get_json()['error'] and 'zone' in response.get_json()['available_fields']
+        assert client.get('/api/aquifers?cursor=abc').status_code == 400
+        assert client.get('/api/aquifers?bbox=1,2,3').status_code == 400
+    finally:
+        with webapp.app.app_context():
+            webapp.db.session.execute(webapp.db.text('DROP TABLE major_aquifers'))
+            webapp.db.session.commit()
+
+def test_analysis_snapshot_reused_until_inputs_change():
+    """An entry's analysis is computed once, then recomputed only for new inputs or a new engine version"""
+    tables = [webapp.UserInput.__table__, webapp.AnalysisSnapshot.__table__]
+    calls = []
+
+    def analysis(location_data, user_input):
+        calls.append(user_input.rooftop_area)
+        return {'rooftop_area': user_input.rooftop_area, 'category': webapp.RecommendationCategory(
+            category_id=1, name='Recharge', description='Recharge pit', recommended_structures=['pit'],
+            recharge_feasible=True, criteria={'rainfall': lambda value: value > 500})}
+
+    with webapp.app.app_context(), \
+            mock.patch.object(webapp, 'get_api_data', return_value={'Rainfall_mm': 800.0}), \
+            mock.patch.object(webapp, 'calculate_comprehensive_feasibility', side_effect=analysis):
+        webapp.db.metadata.create_all(webapp.db.engine, tables=tables)
+        try:
+            entry = webapp.UserInput(name='Asha', location_name='Hyderabad', user_lat=17.4, user_lon=78.5,
+                                     rooftop_area=100.0)
+            webapp.db.session.add(entry)
+            webapp.db.session.commit()
+
+            location_data, first = webapp.get_analysis_snapshot(entry)
+            assert location_data == {'Rainfall_mm': 800.0}
+            assert first['category'] == {'category_id': 1, 'name': 'Recharge', 'description': 'Recharge pit',
+                                         'recommended_structures': ['pit'], 'recharge_feasible': True}
+            assert webapp.get_analysis_snapshot(entry) == (location_data, first)
+            assert calls == [100.0]
+
+            entry.rooftop_area = 150.0
+            webapp.db.session.commit()
+            assert webapp.get_analysis_snapshot(entry)[1]['rooftop_area'] == 150.0
+            with mock.patch.object(webapp, 'ANALYSIS_ENGINE_VERSION', 'test'):
+                webapp.get_analysis_snapshot(entry)
+            assert calls == [100.0, 150.0, 150.0]
+            assert webapp.AnalysisSnapshot.query.count() == 1
+        finally:
+            webapp.db.session.rollback()
+            webapp.db.metadata.drop_all(webapp.db.engine, tables=tables)
+
+def _station(name, lat, lon):
+    return SimpleNamespace(station_na=name, state_name='Test', lat=lat, long=lon, station_co=name,
+                           agency_nam=None, district_n=None, basin_name=None)
+
+def test_nearest_stations_knn_then_great_circle_rerank():
+    """Candidates come from an index-assisted <-> ORDER BY and are re-ranked by great-circle distance"""
+    from models import GroundWaterLevelStation
+    # In KNN (planar degree) order; at 60N the station 0.9 deg east is nearer than the one 0.6 deg north
+    candidates = [_station('north', 60.6, 10.0), _station('east', 60.0, 10.9), _station('far', 62.0, 10.0)]
+    query = mock.Mock()
+    query.filter.return_value = query.order_by.return_value = query.limit.return_value = query
+    query.all.return_value = candidates
+
+    with webapp.app.app_context(), mock.patch.object(GroundWaterLevelStation, 'query', query):
+        stations = webapp.get_nearest_stations(60.0, 10.0, k=2)
+        response = client.get('/api/nearest-stations?lat=60&lon=10&k=500')
+
+    assert [station['Region_Name'] for station in stations] == ['east', 'north']
+    assert 49 < stations[0]['distance'] < 51 and 66 < stations[1]['distance'] < 68
+    order_by = _sql(query.order_by.call_args_list[0].args[0])
+    assert order_by == 'ground_water_level_stations.geometry <-> ST_SetSRID(ST_MakePoint(10.0, 60.0), 4326)'
+    assert query.limit.call_args_list[0].args == (webapp.NEAREST_STATION_CANDIDATES,)
+
+    # k is capped at 50, so the pool grows to 200 candidates
+    assert query.limit.call_args_list[1].args == (200,)
+    assert [station['Region_Name'] for station in response.get_json()['stations']] == ['east', 'north', 'far']
+    assert client.get('/api/nearest-stations?lat=60').status_code == 400
+
+def test_geojson_properties_match_per_row_serializer():
+    """The single-query FeatureCollections carry the same properties the per-row serializer built"""
+    station_properties = ("json_build_object('id', anon_1.id, 'name', coalesce(anon_1.station_na, 'Unknown'), "
+                          "'state', anon_1.state_name, 'district', anon_1.district_n, "
+                          "'agency', anon_1.agency_nam, 'basin', anon_1.basin_name)")
+    expected = {
+        '/api/geo/groundwater': station_properties,
+        '/api/geo/gw-quality': station_properties,
+        '/api/geo/aquifers': ("json_build_object('id', anon_1.id, 'name', coalesce(anon_1.aquifer, 'Unknown'), "
+                              "'state', anon_1.state, 'system', anon_1.system, 'zone', anon_1.zone_m)"),
+        '/api/geo/aquifer-materials': ("json_build_object('id', anon_1.id, 'state', anon_1.\"Name_of_St\", "
+                                       "'material_type', anon_1.\"Type_of_Aq\", 'area', anon_1.st_area_sh, "
+                                       "'length', anon_1.st_length_)"),
+    }
+    for path, properties in expected.items():
+        response, sql = _get_captured(path)
+        assert response.status_code == 200, path
+        assert f"'geometry', CAST(ST_AsGeoJSON(anon_1.geometry) AS JSON), 'properties', {properties}" in sql, path
+        # Empty results are an empty array, and rows without geometry are skipped as before
+        assert "coalesce(json_agg(" in sql and "'[]'::json)" in sql, path
+        assert sql.rstrip().endswith('WHERE anon_1.geometry IS NOT NULL'), path
+
+def test_station_radius_filters_use_indexed_geography_cast():
+    """Station radius filters cast with the bare ::geography expression the geography indexes cover"""
+    for path, table in (('/api/geo/groundwater', 'ground_water_level_stations'),
+                        ('/api/geo/gw-quality', 'ground_water_quality_stations')):
+        _, sql = _get_captured(f'{path}?lat=12.97&lon=77.59&radius_km=25')
+        assert (f"ST_DWithin(CAST({table}.geometry AS geography), "
+                "CAST(ST_SetSRID(ST_MakePoint(77.59, 12.97), 4326) AS geography), 25000.0)") in sql, path
+
+def test_envelope_prefilter_splits_at_antimeridian():
+    """Boxes crossing +-180 become two && envelopes; others stay one"""
+    geometry = MajorAquifer.geometry
+    assert _sql(webapp._envelope_overlaps(geometry, 77.0, 12.0, 78.0, 13.0)) == \
+        'major_aquifers.geometry && ST_MakeEnvelope(77.0, 12.0, 78.0, 13.0, 4326)'
+    split = ('(major_aquifers.geometry && ST_MakeEnvelope(179.0, -18.0, 180, -17.0, 4326)) OR '
+             '(major_aquifers.geometry && ST_MakeEnvelope(-180, -18.0, -179.0, -17.0, 4326))')
+    assert _sql(webapp._envelope_overlaps(geometry, 179.0, -18.0, 181.0, -17.0)) == split
+    assert _sql(webapp._envelope_overlaps(geometry, -181.0, -18.0, -179.0, -17.0)) == split
+
+def test_radius_filter_prefilters_then_checks_geodesic_distance():
+    """_within_radius is an && prefilter (split at the antimeridian) ANDed with a geography ST_DWithin"""
+    geometry = MajorAquifer.geometry
+    sql = _sql(webapp._within_radius(geometry, 12.0, 77.0, 100))
+    prefilter, exact = sql.split(' AND ')
+    assert prefilter.startswith('(major_aquifers.geometry && ST_MakeEnvelope(76.08') and ' OR ' not in prefilter
+    assert exact == ('ST_DWithin(CAST(major_aquifers.geometry AS geography), '
+                     'CAST(ST_SetSRID(ST_MakePoint(77.0, 12.0), 4326) AS geography), 100000)')
+
+    # Fiji: a 100 km circle around 179.9E reaches past the antimeridian
+    sql = _sql(webapp._within_radius(geometry, -17.7, 179.9, 100))
+    assert sql.count('ST_MakeEnvelope') == 2 and ', 180, ' in sql and 'ST_MakeEnvelope(-180, ' in sql
+
+def test_bbox_validation_and_wrapped_viewports():
+    """Inverted or out-of-range longitudes are 400s; wrapped viewports filter polygons like stations"""
+    for bbox in ('78,12,77,13', '-400,12,77,13', '77,12,400,13', '-200,12,170,13', '77,13,78,12', '77,12,78'):
+        response, sql = _get_captured(f'/api/geo/aquifers?bbox={bbox}')
+        assert response.status_code == 400 and sql is None, bbox
+
+    _, sql = _get_captured('/api/geo/aquifer-materials?bbox=170,-20,190,-10')
+    assert ('ST_Intersects(aquifer_materials.geometry, ST_MakeEnvelope(170.0, -20.0, 180, -10.0, 4326)) OR '
+            'ST_Intersects(aquifer_materials.geometry, ST_MakeEnvelope(-180, -20.0, -170.0, -10.0, 4326))') in sql
+    _, station_sql = _get_captured('/api/geo/groundwater/clusters?zoom=5&bbox=170,-20,190,-10')
+    assert 'ST_MakeEnvelope(170.0, -20.0, 180, -10.0, 4326)' in station_sql
+    assert 'ST_MakeEnvelope(-180, -20.0, -170.0, -10.0, 4326)' in station_sql
+
+    # A viewport wholly past the antimeridian is shifted back rather than split
+    _, sql = _get_captured('/api/geo/aquifers?bbox=190,-20,200,-10')
+    assert 'ST_Intersects(major_aquifers.geometry, ST_MakeEnvelope(-170.0, -20.0, -160.0, -10.0, 4326))' in sql
+
+def test_geo_data_index_sync_is_throttled():
+    """Nearest lookups look for new GeoData rows at most every GEO_DATA_INDEX_SYNC_SECONDS, never behind a running sync"""
+    def add_row(lat, lon):
+        webapp.db.session.add(webapp.GeoData(region_name=f'{lat},{lon}', state='Telangana', latitude=lat, longitude=lon))
+        webapp.db.session.commit()
+
+    with webapp.app.app_context(), mock.patch.object(webapp, 'GEO_DATA_INDEX_SYNC_SECONDS', 3600):
+        webapp.GeoData.__table__.create(webapp.db.engine)
+        webapp.geo_data_index.rebuild([])
+        webapp._geo_data_index_synced_at = None
+        try:
+            add_row(17.0, 78.0)
+            assert webapp.get_nearest_geo_data_from_db(17.4, 78.5)['latitude'] == 17.0
+
+            add_row(17.4, 78.5)  # Inserted by "another worker": not seen until the next sync
+            assert webapp.get_nearest_geo_data_from_db(17.4, 78.5)['latitude'] == 17.0
+
+            # A due sync is skipped, not waited for, while another thread holds the lock
+            webapp._geo_data_index_synced_at -= 7200
+            with webapp._geo_data_index_lock:
+                assert webapp.get_nearest_geo_data_from_db(17.4, 78.5)['latitude'] == 17.0
+            assert webapp.get_nearest_geo_data_from_db(17.4, 78.5)['latitude'] == 17.4
+        finally:
+            webapp.db.session.rollback()
+            webapp.GeoData.__table__.drop(webapp.db.engine)
+            webapp.geo_data_index.rebuild([])
+            webapp._geo_data_index_synced_at = None
+
+def test_coalesced_lookups_get_their_own_aquifer_material():
+    """Lookups coalesced into another point's flight share the cell data but not its point-specific fields"""
+    computed = []
+
+    def compute(lat, lon):
+        computed.append((lat, lon))
+        time.sleep(0.3)
+        return {'Rainfall_mm': 800.0, **webapp._aquifer_material_fields(aquifer(lat, lon))}
+
+    def aquifer(lat, lon):
+        # Two polygons meeting at 78.505E, inside one 0.01-degree cache cell
+        return {'found': True, 'state_name': 'West' if lon < 78.505 else 'East', 'aquifer_type': 'Granite', 'area': 1}
+
+    points = [(17.401, 78.501), (17.401, 78.509)]
+    assert len({webapp.location_cache.cell_key(lat, lon) for lat, lon in points}) == 1
+    results = {}
+    with mock.patch.object(webapp, '_compute_location_data', side_effect=compute), \
+            mock.patch.object(webapp, 'get_aquifer_material_at_location', side_effect=aquifer):
+        threads = [threading.Thread(target=lambda p=point: results.__setitem__(p, webapp.get_api_data(*p)))
+                   for point in points]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)  # The first point leads the flight
+        for thread in threads:
+            thread.join()
+
+    assert computed == [points[0]]
+    assert results[points[0]]['Aquifer_Material_State'] == 'West'
+    assert results[points[1]]['Aquifer_Material_State'] == 'East'
+    assert results[points[1]]['Rainfall_mm'] == 800.0
+
+if __name__ == "__main__":
+    test_station_clusters_cell_size_and_singleton_ids()
+    test_station_clusters_bounded()
+    test_geo_cache_key_normalizes_zoom()
+    test_batch_lookup_limits()
+    test_location_cache_upsert_on_cell_key()
+    test_streamed_feature_collection_is_valid_json()
+    test_streamed_feature_collection_aborts_on_error()
+    test_aquifer_list_pages_without_gaps()
+    test_analysis_snapshot_reused_until_inputs_change()
+    test_nearest_stations_knn_then_great_circle_rerank()
+    test_geojson_properties_match_per_row_serializer()
+    test_station_radius_filters_use_indexed_geography_cast()
+    test_envelope_prefilter_splits_at_antimeridian()
+    test_radius_filter_prefilters_then_checks_geodesic_distance()
+    test_bbox_validation_and_wrapped_viewports()
+    test_geo_data_index_sync_is_throttled()
+    test_coalesced_lookups_get_their_own_aquifer_material()
+    print("API tests passed.")
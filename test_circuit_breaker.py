@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_breaker_opens_on_failure_rate():
+    """The circuit opens once enough calls in the window have failed"""
+    breaker = CircuitBreaker('test', window_size=10, min_calls=4, failure_rate=0.5, cooldown_seconds=30, clock=FakeClock())
+
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED  # Below min_calls
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.allow_request() is False
+    assert breaker.snapshot()['short_circuited'] == 1
+
+def test_breaker_half_open_probe():
+    """After the cool-down one trial call is allowed; its outcome closes or reopens the circuit"""
+    clock = FakeClock()
+    breaker = CircuitBreaker('test', window_size=10, min_calls=2, failure_rate=0.5, cooldown_seconds=30, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now = 31
+    assert breaker.allow_request() is True
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request() is False  # Only one probe at a time
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.allow_request() is False
+
+    clock.now = 62
+    assert breaker.allow_request() is True
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request() is True
+
+if __name__ == "__main__":
+    test_breaker_opens_on_failure_rate()
+    test_breaker_half_open_probe()
+    print("Circuit breaker tests passed.")
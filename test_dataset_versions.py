@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from dataset_versions import DatasetVersions
+
+def test_failed_read_keeps_callers_transaction():
+    """A failed version read falls back to 0 without rolling back the caller's pending work"""
+    engine = create_engine('sqlite://')
+    with Session(engine) as session:
+        session.execute(text('CREATE TABLE pending (x INTEGER)'))
+        session.execute(text('INSERT INTO pending VALUES (1)'))
+
+        versions = DatasetVersions(check_seconds=0)
+        assert versions.get(session, 'aquifer_materials') == 0  # No dataset_versions table yet
+        assert session.execute(text('SELECT count(*) FROM pending')).scalar() == 1
+
+        session.execute(text('CREATE TABLE dataset_versions (table_name VARCHAR(128) PRIMARY KEY, version INTEGER)'))
+        session.execute(text("INSERT INTO dataset_versions VALUES ('aquifer_materials', 3)"))
+        assert versions.get(session, 'aquifer_materials') == 3
+        assert versions.snapshot() == {'aquifer_materials': 3}
+
+if __name__ == "__main__":
+    test_failed_read_keeps_callers_transaction()
+    print("Dataset version tests passed.")
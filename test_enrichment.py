@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import threading
+from enrichment import run_enrichment_tasks, SingleFlight, PrefetchRegistry
+
+def test_enrichment_tasks_run_in_parallel():
+    """Independent tasks should finish in roughly the time of the slowest one"""
+    def slow(value):
+        def task():
+            time.sleep(0.3)
+            return value
+        return task
+
+    start = time.monotonic()
+    results = run_enrichment_tasks({
+        'a': (slow(1), lambda: None),
+        'b': (slow(2), lambda: None),
+        'c': (slow(3), lambda: None),
+    }, deadline=5)
+    elapsed = time.monotonic() - start
+
+    assert results == {'a': 1, 'b': 2, 'c': 3}
+    assert elapsed < 0.8
+
+def test_enrichment_fallback_per_field():
+    """A failing or overrunning task falls back without affecting the others"""
+    def failing():
+        raise RuntimeError("provider down")
+
+    def hanging():
+        time.sleep(2)
+        return 'late'
+
+    results = run_enrichment_tasks({
+        'ok': (lambda: 'fresh', lambda: 'default'),
+        'failed': (failing, lambda: 'failed-default'),
+        'timed_out': (hanging, lambda: 'timeout-default'),
+    }, deadline=0.5)
+
+    assert results['ok'] == 'fresh'
+    assert results['failed'] == 'failed-default'
+    assert results['timed_out'] == 'timeout-default'
+
+def test_single_flight_coalesces_concurrent_calls():
+    """Concurrent calls for one key run the function once and share its result"""
+    flight = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.3)
+        return {'value': 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('cell', compute))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{'value': 42}] * 5
+    assert flight.snapshot() == {'leaders': 1, 'coalesced': 4, 'in_flight': 0}
+
+def test_prefetch_registry_bounded_and_cancels_expired():
+    """Submits beyond max_pending are skipped and expired queued prefetches never run"""
+    now = [0.0]
+    registry = PrefetchRegistry(max_workers=1, ttl=10, max_pending=2, clock=lambda: now[0])
+    release = threading.Event()
+    ran = []
+
+    blocker = registry.submit('a', release.wait)  # Occupies the only worker
+    queued = registry.submit('b', lambda: ran.append('b'))
+    assert registry.submit('c', lambda: ran.append('c')) is None
+
+    now[0] = 11  # Both entries expire; the queued one is cancelled before it starts
+    assert registry.claim('a') is None
+    release.set()
+    blocker.result(timeout=5)
+    assert queued.cancelled()
+    assert ran == []
+    snapshot = registry.snapshot()
+    assert snapshot['rejected'] == 1 and snapshot['cancelled'] == 1 and snapshot['pending'] == 0
+
+if __name__ == "__main__":
+    test_enrichment_tasks_run_in_parallel()
+    test_enrichment_fallback_per_field()
+    test_single_flight_coalesces_concurrent_calls()
+    test_prefetch_registry_bounded_and_cancels_expired()
+    print("Enrichment tests passed.")
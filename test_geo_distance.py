@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from geo_distance import (haversine, haversine_one_to_many, haversine_many_to_many,
+                          bearing_one_to_many, bounding_box, within_bounding_box, nearest_within)
+
+def test_vectorized_matches_scalar():
+    """One-to-many and many-to-many distances agree with the scalar haversine"""
+    rng = random.Random(1)
+    lats = [rng.uniform(8, 35) for _ in range(20)]
+    lons = [rng.uniform(68, 97) for _ in range(20)]
+
+    one = haversine_one_to_many(17.4, 78.5, lats, lons)
+    matrix = haversine_many_to_many(lats[:5], lons[:5], lats, lons)
+    for j in range(20):
+        assert abs(one[j] - haversine(17.4, 78.5, lats[j], lons[j])) < 1e-9
+        for i in range(5):
+            assert abs(matrix[i, j] - haversine(lats[i], lons[i], lats[j], lons[j])) < 1e-9
+
+def test_bearing_cardinal_directions():
+    """Bearings are measured clockwise from north"""
+    bearings = bearing_one_to_many(0, 0, [1, 0, -1, 0], [0, 1, 0, -1])
+    assert np.allclose(bearings, [0, 90, 180, 270])
+
+def test_bounding_box_prefilter():
+    """The bbox never excludes a point inside the radius"""
+    rng = random.Random(2)
+    lats = np.array([rng.uniform(10, 30) for _ in range(2000)])
+    lons = np.array([rng.uniform(70, 90) for _ in range(2000)])
+    inside = haversine_one_to_many(20, 80, lats, lons) <= 300
+    mask = within_bounding_box(lats, lons, bounding_box(20, 80, 300))
+    assert not np.any(inside & ~mask)
+    assert mask.sum() < len(lats)
+
+    order, distances = nearest_within(20, 80, lats, lons, k=3, max_km=300)
+    assert list(distances) == sorted(distances)
+    assert order[0] == int(np.argmin(haversine_one_to_many(20, 80, lats, lons)))
+
+if __name__ == "__main__":
+    test_vectorized_matches_scalar()
+    test_bearing_cardinal_directions()
+    test_bounding_box_prefilter()
+    print("Geo distance tests passed.")
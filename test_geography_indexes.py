@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from geoalchemy2 import Geometry
+from sqlalchemy import Column, Integer, MetaData, Table
+from sqlalchemy.dialects import postgresql
+
+from geography_indexes import as_geography, geography_index_ddl
+
+def test_cast_matches_index_expression():
+    """as_geography renders exactly the expression the geography index is built on"""
+    stations = Table('ground_water_level_stations', MetaData(),
+                     Column('id', Integer, primary_key=True), Column('geometry', Geometry('POINT', srid=4326)))
+    cast = str(as_geography(stations.c.geometry).compile(dialect=postgresql.dialect()))
+    assert cast == 'CAST(ground_water_level_stations.geometry AS geography)'
+
+    ddl = geography_index_ddl('ground_water_level_stations')
+    assert ddl == ('CREATE INDEX IF NOT EXISTS idx_ground_water_level_stations_geometry_geog '
+                   'ON ground_water_level_stations USING GIST ((CAST(geometry AS geography)))')
+    # Same expression once the column is unqualified, with no typmod such as geography(POINT,4326)
+    assert cast.replace('ground_water_level_stations.', '') in ddl
+
+if __name__ == "__main__":
+    test_cast_matches_index_expression()
+    print("Geography index tests passed.")
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from geometry_simplification import tolerance_for_zoom, select_tolerance
+
+def test_level_selection():
+    """Zoom levels map to the coarsest stored tolerance under one pixel; high zooms get full detail"""
+    assert tolerance_for_zoom(3) == 0.05
+    assert tolerance_for_zoom(5) == 0.02
+    assert tolerance_for_zoom(8) == 0.005
+    assert tolerance_for_zoom(10) == 0.001
+    assert tolerance_for_zoom(14) is None
+
+    assert select_tolerance(0.01) == 0.005
+    assert select_tolerance(0.0001) is None
+
+if __name__ == "__main__":
+    test_level_selection()
+    print("Geometry simplification tests passed.")
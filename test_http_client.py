@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+
+from http_client import UpstreamHTTPClient
+from enrichment import run_enrichment_tasks
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Answers 503 to /busy and sleeps before answering /slow."""
+    calls = []
+
+    def do_GET(self):
+        SlowHandler.calls.append(self.path)
+        if self.path.startswith('/slow'):
+            time.sleep(1.5)
+        self.send_response(503 if self.path.startswith('/busy') else 200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args):
+        pass
+
+def _serve():
+    server = HTTPServer(('127.0.0.1', 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def test_deadline_bounds_slow_read():
+    """A read that outlasts the deadline fails at the deadline and is not retried"""
+    server, base = _serve()
+    try:
+        client = UpstreamHTTPClient()
+        SlowHandler.calls.clear()
+        start = time.monotonic()
+        try:
+            client.get(f"{base}/slow", deadline=time.monotonic() + 0.5)
+            assert False, 'expected a timeout'
+        except requests.Timeout:
+            pass
+        assert time.monotonic() - start < 1.2
+        assert SlowHandler.calls == ['/slow']
+    finally:
+        server.shutdown()
+
+def test_enrichment_task_deadline_applies_to_retries():
+    """Retries of a failing upstream stop once the enclosing task's deadline is near"""
+    server, base = _serve()
+    try:
+        client = UpstreamHTTPClient()
+        start = time.monotonic()
+        results = run_enrichment_tasks({
+            'busy': (lambda: client.get(f"{base}/busy").status_code, lambda: None),
+        }, deadline=0.2)
+        assert results['busy'] in (503, None)
+        # The task's own HTTP call is bounded too, not just the wait for it
+        time.sleep(0.3)
+        assert client.stats_snapshot()[base.split('//')[1]]['requests'] == 1
+        assert time.monotonic() - start < 1.0
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_deadline_bounds_slow_read()
+    test_enrichment_task_deadline_applies_to_retries()
+    print("HTTP client tests passed.")
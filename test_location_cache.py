@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import location_cache
+
+def test_refresh_plan_soft_and_hard_ttl():
+    """Groups past the soft TTL are revalidated in the background, past the hard TTL refetched"""
+    now = datetime(2025, 6, 1)
+    entry = SimpleNamespace(
+        rainfall_updated_at=now - location_cache.FIELD_GROUP_TTLS['rainfall'] - timedelta(days=1),
+        soil_updated_at=now - location_cache.FIELD_GROUP_HARD_TTLS['soil'] - timedelta(days=1),
+        groundwater_updated_at=now,
+    )
+    revalidate, expired = location_cache.refresh_plan(entry, now)
+    assert revalidate == ['rainfall']
+    assert expired == ['soil']
+
+    assert location_cache.refresh_plan(None, now) == ([], list(location_cache.FIELD_GROUPS))
+
+def test_cell_key_boundaries():
+    """Cells are half-open [k, k+1) * cell_deg on both axes, negative coordinates included"""
+    key = location_cache.cell_key
+    assert key(17.4, 78.5) == '0.01:1740:7850'  # 17.4 / 0.01 is 1739.9999... in floating point
+    assert key(17.40999, 78.50999) == key(17.4, 78.5)
+    assert key(17.41, 78.5) == '0.01:1741:7850'
+
+    # Negative coordinates floor away from zero, so cells do not straddle the equator or meridian
+    assert key(-0.001, -0.001) == '0.01:-1:-1'
+    assert key(0.0, 0.0) == '0.01:0:0'
+    assert key(-33.87, 151.21) == '0.01:-3387:15121'
+    assert key(-33.8701, 151.21) == '0.01:-3388:15121'
+
+    # String inputs (as in request args) and other grids
+    assert key('17.4', '78.5') == key(17.4, 78.5)
+    assert key(17.4, 78.5, cell_deg=0.05) == '0.05:348:1570'
+
+if __name__ == "__main__":
+    test_refresh_plan_soft_and_hard_ttl()
+    test_cell_key_boundaries()
+    print("Location cache tests passed.")
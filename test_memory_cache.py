@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from memory_cache import MemoryLRUCache
+
+def test_lru_bounded_by_bytes():
+    """Least recently used entries are evicted once the byte budget is exceeded"""
+    cache = MemoryLRUCache(max_entries=10, max_bytes=10)
+    cache.set('a', b'1234')
+    cache.set('b', b'1234')
+    assert cache.get('a') == b'1234'  # 'a' is now most recently used
+    cache.set('c', b'1234')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1234'
+    assert cache.get('c') == b'1234'
+    assert cache.snapshot()['bytes'] == 8
+
+def test_explicit_size():
+    """An explicit size is used for values whose len() is not their byte size"""
+    cache = MemoryLRUCache(max_entries=10, max_bytes=10)
+    cache.set('a', (b'123456', 'etag'), size=6)
+    assert cache.snapshot()['bytes'] == 6
+    cache.set('b', (b'123456', 'etag'), size=6)
+    assert cache.get('a') is None
+
+def test_ttl_expiry():
+    """Entries older than the TTL are treated as misses"""
+    now = [0.0]
+    cache = MemoryLRUCache(ttl_seconds=5, clock=lambda: now[0])
+    cache.set('tile', b'x')
+    now[0] = 4
+    assert cache.get('tile') == b'x'
+    now[0] = 6
+    assert cache.get('tile') is None
+
+if __name__ == "__main__":
+    test_lru_bounded_by_bytes()
+    test_explicit_size()
+    test_ttl_expiry()
+    print("Memory cache tests passed.")
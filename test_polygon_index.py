@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import random
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from shapely.geometry import box, Point, MultiPolygon
+
+from polygon_index import PolygonIndex
+
+def _grid_rows():
+    """A 10x10 grid of 1-degree cells over India plus one cell-sized overlap at key 1000."""
+    rows = []
+    for i in range(10):
+        for j in range(10):
+            key = i * 10 + j + 1
+            cell = MultiPolygon([box(70 + j, 10 + i, 71 + j, 11 + i)])
+            rows.append((key, cell.wkb, {'key': key}))
+    rows.append((1000, box(72.5, 12.5, 73.5, 13.5).wkb, {'key': 1000}))
+    return rows
+
+def test_find_matches_brute_force():
+    """Batch lookups agree with a shapely containment scan; overlaps resolve to the lowest key"""
+    rows = _grid_rows()
+    index = PolygonIndex('test')
+    index.load(rows, version=3)
+    assert index.loaded and index.version == 3
+
+    from shapely import from_wkb
+    polygons = [(key, from_wkb(wkb)) for key, wkb, _ in rows]
+    rng = random.Random(11)
+    coords = [(rng.uniform(9, 21), rng.uniform(69, 81)) for _ in range(500)]
+    results = index.find_many(coords)
+
+    for (lat, lon), result in zip(coords, results):
+        containing = [key for key, polygon in polygons if polygon.contains(Point(lon, lat))]
+        expected = min(containing) if containing else None
+        assert (result['key'] if result else None) == expected
+
+    assert index.find(13.2, 73.2) == {'key': 34}  # Inside the overlap
+    assert index.find(5.0, 60.0) is None
+    assert index.snapshot()['lookups'] == 502
+
+def test_failed_load_keeps_index_unloaded():
+    """A failing loader leaves the index unloaded and lookups raise"""
+    index = PolygonIndex('test')
+
+    def broken_loader():
+        raise RuntimeError('no database')
+
+    assert index.load_from(broken_loader) is False
+    assert not index.loaded
+    assert index.snapshot()['load_errors'] == 1
+    try:
+        index.find(12.0, 75.0)
+        assert False, 'expected RuntimeError'
+    except RuntimeError:
+        pass
+
+def test_version_change_rebuilds_index():
+    """A new dataset version triggers a background reload; the old polygons answer until it lands"""
+    index = PolygonIndex('test')
+    index.load([(1, box(70, 10, 80, 20).wkb, {'key': 'old'})], version=1)
+    calls = []
+
+    def reloaded_rows():
+        calls.append(1)
+        return [(1, box(70, 10, 80, 20).wkb, {'key': 'new'})]
+
+    assert index.ensure_version(reloaded_rows, 1) is True
+    assert calls == []  # Same version, no reload
+
+    assert index.ensure_version(reloaded_rows, 2) is True
+    deadline = time.monotonic() + 5
+    while index.version != 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert index.version == 2 and calls == [1]
+    assert index.find(15.0, 75.0) == {'key': 'new'}
+
+if __name__ == "__main__":
+    test_find_matches_brute_force()
+    test_failed_load_keeps_index_unloaded()
+    test_version_change_rebuilds_index()
+    print("All polygon index tests passed")
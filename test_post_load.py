@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+from contextlib import contextmanager
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from post_load import finish_table_load
+
+class RecordingEngine:
+    """Records the SQL of committed statements; statements containing `fail_on` raise."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.statements = []
+
+    @contextmanager
+    def begin(self):
+        start = len(self.statements)
+        try:
+            yield self
+        except Exception:
+            del self.statements[start:]  # Rolled back
+            raise
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError(f"failed: {sql}")
+        self.statements.append(sql)
+
+def test_reload_rebuilds_levels_and_bumps_version():
+    """Reloading a polygon layer rebuilds its simplified levels and bumps its dataset version"""
+    engine = RecordingEngine()
+    assert finish_table_load(engine, 'aquifer_materials') == []
+    sql = '\n'.join(engine.statements)
+    assert 'ADD PRIMARY KEY (id)' in sql
+    assert 'CREATE TABLE aquifer_materials_simplified AS' in sql
+    assert 'INSERT INTO dataset_versions' in sql
+    # Point layers only
+    assert '_geog' not in sql
+
+def test_failed_simplification_still_bumps_version():
+    """A failed level build drops the stale levels and the version is bumped anyway"""
+    engine = RecordingEngine(fail_on='CREATE TABLE aquifer_materials_simplified')
+    assert finish_table_load(engine, 'aquifer_materials') == ['simplification']
+    assert engine.statements.count('DROP TABLE IF EXISTS aquifer_materials_simplified') == 1
+    assert not any('CREATE TABLE aquifer_materials_simplified' in sql for sql in engine.statements)
+    assert any('INSERT INTO dataset_versions' in sql for sql in engine.statements)
+
+if __name__ == "__main__":
+    test_reload_rebuilds_levels_and_bumps_version()
+    test_failed_simplification_still_bumps_version()
+    print("Post-load tests passed.")
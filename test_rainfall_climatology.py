@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from rainfall_climatology import RainfallClimatology, write_climatology
+from load_rainfall_climatology import build_grid, MONTH_COLUMNS
+
+def _normals_frame():
+    # 2x2 grid at 0.25 degree spacing; monthly values are 1/12 of the annual total
+    rows = []
+    for lat, lon, annual in [(17.0, 78.0, 600), (17.0, 78.25, 1200), (17.25, 78.0, 600), (17.25, 78.25, 1200)]:
+        row = {'lat': lat, 'lon': lon}
+        row.update({month: annual / 12 for month in MONTH_COLUMNS})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def test_bilinear_lookup():
+    """Lookups interpolate between grid nodes and return None outside the grid"""
+    with tempfile.TemporaryDirectory() as tmp:
+        grid, lat_min, lon_min, cell_deg = build_grid(_normals_frame())
+        assert grid.shape == (13, 2, 2)
+        assert cell_deg == 0.25
+        write_climatology(tmp, grid, lat_min, lon_min, cell_deg)
+
+        climatology = RainfallClimatology(tmp)
+        assert climatology.available
+
+        normals = climatology.lookup(17.1, 78.125)  # Halfway between the 600mm and 1200mm columns
+        assert abs(normals['annual'] - 900) < 1e-3
+        assert abs(normals['monthly']['07'] - 75) < 1e-3
+        assert abs(sum(normals['monthly'].values()) - normals['annual']) < 1e-2
+
+        assert abs(climatology.lookup(17.0, 78.0)['annual'] - 600) < 1e-3
+        assert climatology.lookup(20.0, 78.0) is None
+
+if __name__ == "__main__":
+    test_bilinear_lookup()
+    print("Rainfall climatology tests passed.")
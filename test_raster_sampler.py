@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import rasterio
+from affine import Affine
+
+import raster_sampler
+from raster_sampler import RasterSampler
+
+def _write_raster(path):
+    # 64x64 pixels of 0.01 degrees starting at (lon 78.0, lat 18.0), tiled in 16x16 blocks
+    data = np.zeros((64, 64), dtype='uint8')
+    data[:, 32:] = 3
+    data[:, 48:] = 4
+    data[0, 0] = 255
+    profile = dict(driver='GTiff', width=64, height=64, count=1, dtype='uint8', crs='EPSG:4326',
+                   transform=Affine(0.01, 0.0, 78.0, 0.0, -0.01, 18.0), nodata=255,
+                   tiled=True, blockxsize=16, blockysize=16)
+    with rasterio.open(path, 'w', **profile) as dst:
+        dst.write(data, 1)
+
+def test_sampler_batch_and_block_cache():
+    """Batched samples return pixel values, nodata/out-of-bounds as None, and reuse cached blocks"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'texture.tif')
+        _write_raster(path)
+        sampler = RasterSampler(path)
+
+        values = sampler.sample([
+            (17.995, 78.005),  # nodata pixel
+            (17.985, 78.015),
+            (17.985, 78.405),
+            (19.5, 78.1),      # outside the raster
+        ])
+        assert values == [None, 0, 3, None]
+
+        # Same block as the first two samples: served from the cache
+        reads = sampler.block_reads
+        assert sampler.sample_one(17.975, 78.025) == 0
+        assert sampler.block_reads == reads
+        assert sampler.block_hits >= 1
+
+def test_non_soil_class_falls_back():
+    """Texture class 4 (rock, built-up, water) yields no soil properties, like nodata"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'texture.tif')
+        _write_raster(path)
+        saved = (raster_sampler.SOIL_TEXTURE_RASTER_PATH, raster_sampler.SOIL_DEPTH_RASTER_PATH,
+                 raster_sampler.SOIL_SLOPE_RASTER_PATH)
+        raster_sampler.SOIL_TEXTURE_RASTER_PATH = path
+        raster_sampler.SOIL_DEPTH_RASTER_PATH = raster_sampler.SOIL_SLOPE_RASTER_PATH = os.path.join(tmp, 'missing.tif')
+        try:
+            sandy, non_soil = raster_sampler.sample_soil_properties([(17.985, 78.405), (17.985, 78.505)])
+        finally:
+            (raster_sampler.SOIL_TEXTURE_RASTER_PATH, raster_sampler.SOIL_DEPTH_RASTER_PATH,
+             raster_sampler.SOIL_SLOPE_RASTER_PATH) = saved
+        assert sandy['Soil_Type'] == 'Sandy'
+        assert non_soil is None
+
+if __name__ == "__main__":
+    test_sampler_batch_and_block_cache()
+    test_non_soil_class_falls_back()
+    print("Raster sampler tests passed.")
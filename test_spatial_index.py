@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from spatial_index import GeoPointIndex
+from geo_distance import haversine as _haversine_km
+
+def test_nearest_matches_brute_force():
+    """Index results match a brute-force haversine scan, including points added after the build"""
+    rng = random.Random(7)
+    points = [(i, rng.uniform(8, 35), rng.uniform(68, 97)) for i in range(1, 501)]
+    index = GeoPointIndex()
+    index.rebuild(points[:400])
+    for row in points[400:]:
+        index.add(*row)  # Mix of tree and pending-buffer points
+    assert index.last_id == 500
+
+    for _ in range(50):
+        lat, lon = rng.uniform(8, 35), rng.uniform(68, 97)
+        key, distance = index.nearest(lat, lon)
+        expected = min(points, key=lambda p: _haversine_km(lat, lon, p[1], p[2]))
+        assert key == expected[0]
+        assert abs(distance - _haversine_km(lat, lon, expected[1], expected[2])) < 1e-6
+
+def test_max_radius_and_discard():
+    """Lookups respect max_km and skip discarded points"""
+    index = GeoPointIndex()
+    index.rebuild([(1, 17.0, 78.0), (2, 17.5, 78.0)])
+    assert index.nearest(17.01, 78.0, max_km=0.5) is None
+    assert index.nearest(17.01, 78.0, max_km=5)[0] == 1
+
+    index.discard(1)
+    assert index.nearest(17.01, 78.0)[0] == 2
+
+if __name__ == "__main__":
+    test_nearest_matches_brute_force()
+    test_max_radius_and_discard()
+    print("Spatial index tests passed.")
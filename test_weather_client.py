@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import time
+import threading
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+
+import weather_client
+from weather_client import WeatherClient
+
+class StubResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+    def json(self):
+        return self._payload
+
+class StubHTTPClient:
+    """Slow upstream returning `status_code`; records the URL of every call."""
+
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.urls = []
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        time.sleep(0.2)
+        return StubResponse(self.status_code, {'url': url})
+
+def _call_concurrently(fn, count=5):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+def test_concurrent_requests_share_one_upstream_call():
+    """Identical concurrent requests issue one upstream call per resource and share its payload"""
+    stub = StubHTTPClient()
+    client = WeatherClient(12.9, 77.6, 'key')
+    with mock.patch.object(weather_client, 'http_client', stub):
+        results, errors = _call_concurrently(client.forecast)
+        assert client.current_weather()['url'].startswith(f"{weather_client.OPENWEATHERMAP_BASE_URL}/weather?")
+
+    assert errors == []
+    assert len(stub.urls) == 2
+    assert results == [{'url': stub.urls[0]}] * 5
+    assert '/forecast?lat=12.9&lon=77.6&appid=key' in stub.urls[0]
+
+def test_failure_propagates_to_every_waiter():
+    """A failed fetch raises in every concurrent caller, and later callers, without retrying"""
+    stub = StubHTTPClient(status_code=503)
+    client = WeatherClient(12.9, 77.6, 'key')
+    with mock.patch.object(weather_client, 'http_client', stub):
+        results, errors = _call_concurrently(client.current_weather)
+        try:
+            client.current_weather()
+            assert False, 'expected HTTPError'
+        except requests.HTTPError:
+            pass
+
+    assert results == []
+    assert len(errors) == 5 and all(isinstance(e, requests.HTTPError) for e in errors)
+    assert len(stub.urls) == 1
+
+if __name__ == "__main__":
+    test_concurrent_requests_share_one_upstream_call()
+    test_failure_propagates_to_every_waiter()
+    print("Weather client tests passed.")
@@ -0,0 +1,56 @@
+"""
+Request-scoped OpenWeatherMap client.
+
+Several derived values for one location (annual rainfall estimate, monthly
+breakdown, live conditions) are computed from the same two upstream resources.
+A WeatherClient is created once per lookup and handed to every computation so
+that /forecast and /weather are each downloaded at most once per (lat, lon),
+even when the computations run concurrently.
+"""
+
+import threading
+
+from http_client import http_client
+
+OPENWEATHERMAP_BASE_URL = "https://api.openweathermap.org/data/2.5"
+
+
+class WeatherClient:
+    """Fetches and memoizes OpenWeatherMap payloads for a single location."""
+
+    RESOURCES = ('forecast', 'weather')
+
+    def __init__(self, lat, lon, api_key, timeout=None):
+        self.lat = lat
+        self.lon = lon
+        self.api_key = api_key
+        self.timeout = timeout
+        self._results = {}
+        self._locks = {resource: threading.Lock() for resource in self.RESOURCES}
+
+    def forecast(self):
+        """Parsed /data/2.5/forecast payload (5-day, 3-hourly)."""
+        return self._fetch('forecast')
+
+    def current_weather(self):
+        """Parsed /data/2.5/weather payload (current conditions)."""
+        return self._fetch('weather')
+
+    def _fetch(self, resource):
+        # Per-resource lock: concurrent callers wait for the first download
+        # instead of issuing their own request. Failures are memoized too, so
+        # a broken upstream is only hit once per lookup.
+        with self._locks[resource]:
+            if resource not in self._results:
+                url = f"{OPENWEATHERMAP_BASE_URL}/{resource}?lat={self.lat}&lon={self.lon}&appid={self.api_key}&units=metric"
+                try:
+                    response = http_client.get(url, timeout=self.timeout)
+                    response.raise_for_status()
+                    self._results[resource] = (response.json(), None)
+                except Exception as e:
+                    self._results[resource] = (None, e)
+            data, error = self._results[resource]
+
+        if error is not None:
+            raise error
+        return data